@@ -1,9 +1,36 @@
-"""Init package"""
+"""Init package
+
+Module attributes are resolved lazily (PEP 562) so that importing the package
+does not pull in slims, pydantic or the settings until they are needed.
+"""
 
 __version__ = "0.1.2"
 
-from aind_slims_api.configuration import AindSlimsApiSettings
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:  # pragma: no cover
+    from aind_slims_api.configuration import AindSlimsApiSettings
+    from aind_slims_api.core import SlimsClient
+
+    config: AindSlimsApiSettings
+
+__all__ = ["SlimsClient", "config"]
+
+
+def __getattr__(name: str) -> Any:
+    """Build or import module attributes on first access"""
+    if name == "config":
+        from aind_slims_api.configuration import AindSlimsApiSettings
+
+        value = AindSlimsApiSettings()
+    elif name == "SlimsClient":
+        from aind_slims_api.core import SlimsClient as value
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
 
-config = AindSlimsApiSettings()
 
-from aind_slims_api.core import SlimsClient  # noqa
+def __dir__() -> list[str]:
+    """Include lazy attributes in dir()"""
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,140 @@
+"""Streaming of attachment contents to SLIMS.
+
+SLIMS takes new attachments as a json body with base64 encoded contents.
+attachment_body produces that body as a stream of chunks, so that files are
+uploaded without being read into memory, see SlimsClient.add_attachment.
+
+SLIMS stores the MD5 hash of attachment contents. content_hash computes it
+for a source, so that contents a record already has are not uploaded again,
+and ContentCache keeps downloaded contents by hash, so that attachments with
+identical contents are downloaded once.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Optional
+
+from requests import Response
+
+# a file path, a binary file object, bytes, or an iterable of bytes
+AttachmentSource = str | os.PathLike | IO[bytes] | bytes | Iterable[bytes]
+
+# bytes read from files at a time, a multiple of 3 so that each chunk encodes
+# to base64 without padding
+DEFAULT_CHUNK_SIZE = 3 * 2**20
+
+
+def attachment_name(source: AttachmentSource) -> Optional[str]:
+    """File name of a source, None if it has none"""
+    if isinstance(source, (str, os.PathLike)):
+        return Path(source).name
+    name = getattr(source, "name", None)
+    return Path(name).name if isinstance(name, str) else None
+
+
+def read_chunks(
+    source: AttachmentSource, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Contents of a source, chunk_size bytes at a time for files"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            yield from iter(lambda: f.read(chunk_size), b"")
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        yield bytes(source)
+    elif hasattr(source, "read"):
+        yield from iter(lambda: source.read(chunk_size), b"")
+    else:
+        yield from source
+
+
+def base64_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Base64 encoding of the concatenated chunks, one encoded chunk at a
+    time. Bytes beyond a multiple of 3 are carried to the next chunk"""
+    remainder = b""
+    for chunk in chunks:
+        data = remainder + chunk
+        end = len(data) - len(data) % 3
+        remainder = data[end:]
+        if end:
+            yield base64.b64encode(data[:end])
+    if remainder:
+        yield base64.b64encode(remainder)
+
+
+def attachment_body(
+    name: str,
+    table: str,
+    pk: int,
+    source: AttachmentSource,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """json body adding source as an attachment named name, of the record
+    pk of table, as the body of Record.add_attachment in slims-python-api"""
+    fields = json.dumps(
+        {"attm_name": name, "atln_recordPk": pk, "atln_recordTable": table}
+    )
+    yield fields[:-1].encode() + b', "contents": "'
+    yield from base64_chunks(read_chunks(source, chunk_size))
+    yield b'"}'
+
+
+def content_hash(
+    source: AttachmentSource, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Optional[str]:
+    """MD5 hex digest of the contents of a source, as SLIMS stores in
+    attm_hash. None for sources that can only be read once, e.g. generators.
+    Seekable file objects are read to the end, then rewound"""
+    position = None
+    if hasattr(source, "read"):
+        if not (hasattr(source, "seekable") and source.seekable()):
+            return None
+        position = source.tell()
+    elif not isinstance(source, (str, os.PathLike, bytes, bytearray, memoryview)):
+        return None
+    digest = hashlib.md5(usedforsecurity=False)
+    for chunk in read_chunks(source, chunk_size):
+        digest.update(chunk)
+    if position is not None:
+        source.seek(position)
+    return digest.hexdigest()
+
+
+class ContentCache:
+    """Downloaded attachment contents, by hash. The least recently used are
+    evicted once they total more than max_bytes"""
+
+    def __init__(self, max_bytes: int):
+        """Cache of up to max_bytes of contents"""
+        self.max_bytes = max_bytes
+        self._responses: OrderedDict[str, Response] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, digest: str) -> Optional[Response]:
+        """The cached response of contents with hash digest, if any"""
+        with self._lock:
+            response = self._responses.get(digest)
+            if response is not None:
+                self._responses.move_to_end(digest)
+            return response
+
+    def put(self, digest: str, response: Response):
+        """Cache a response, reading its contents, unless they are larger
+        than max_bytes"""
+        size = len(response.content)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._responses.pop(digest, None)
+            if previous is not None:
+                self._size -= len(previous.content)
+            self._responses[digest] = response
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._responses.popitem(last=False)
+                self._size -= len(evicted.content)
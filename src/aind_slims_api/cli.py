@@ -0,0 +1,291 @@
+"""Command line interface, installed as the `aind-slims` console script.
+
+Examples
+--------
+Export every mouse to a newline delimited json file, 500 rows per request
+and 4 requests in flight:
+
+    aind-slims export mouse --page-size 500 --concurrency 4 -o mice.ndjson
+
+Export the behavior sessions of a mouse as csv to stdout:
+
+    aind-slims export behavior-session --filter mouse_pk=3038 --format csv
+
+Credentials are read from the SLIMS_URL, SLIMS_USERNAME and SLIMS_PASSWORD
+environment variables, see AindSlimsApiSettings.
+"""
+
+import argparse
+import csv
+import json
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from typing import IO, Any, Iterator, Optional, Sequence, Type
+
+from pydantic import TypeAdapter, ValidationError
+
+from aind_slims_api.core import SlimsClient
+from aind_slims_api.models import MODELS
+from aind_slims_api.models.base import SlimsBaseModel
+
+FORMATS = ("ndjson", "csv", "parquet")
+
+
+def _export_fields(model: Type[SlimsBaseModel]) -> list[str]:
+    """Fields of a model that are written by the exporter"""
+    return [name for name in model.model_fields if name != "json_entity"]
+
+
+def _json_default(value: Any) -> Any:
+    """json.dumps fallback for values json cannot encode natively"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+class NdjsonWriter:
+    """Writes one json object per line"""
+
+    binary = False
+
+    def __init__(self, stream: IO[str], model: Type[SlimsBaseModel]):
+        """Write to stream, rows of the given model type"""
+        self.stream = stream
+        self.fields = _export_fields(model)
+
+    def write_page(self, page: list[SlimsBaseModel]):
+        """Write a page of models"""
+        self.stream.writelines(
+            json.dumps(
+                {name: getattr(item, name) for name in self.fields},
+                default=_json_default,
+            )
+            + "\n"
+            for item in page
+        )
+
+    def close(self):
+        """Flush the output"""
+        self.stream.flush()
+
+
+class CsvWriter(NdjsonWriter):
+    """Writes comma separated values with a header row. Lists are written
+    as json arrays and datetimes in ISO 8601 format"""
+
+    def __init__(self, stream: IO[str], model: Type[SlimsBaseModel]):
+        """Write to stream, rows of the given model type"""
+        super().__init__(stream, model)
+        self.writer = csv.writer(stream)
+        self.writer.writerow(self.fields)
+
+    @staticmethod
+    def _cell(value: Any) -> Any:
+        """Convert a field value to a csv cell"""
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if isinstance(value, (list, dict)):
+            return json.dumps(value)
+        return value
+
+    def write_page(self, page: list[SlimsBaseModel]):
+        """Write a page of models"""
+        self.writer.writerows(
+            [self._cell(getattr(item, name)) for name in self.fields] for item in page
+        )
+
+
+class ParquetWriter:
+    """Writes a parquet file, one row group per page. Requires pyarrow"""
+
+    binary = True
+
+    def __init__(self, stream: IO[bytes], model: Type[SlimsBaseModel]):
+        """Write to stream, rows of the given model type"""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError(
+                "Parquet export requires pyarrow, "
+                "install with `pip install aind-slims-api[export]`"
+            ) from e
+        self.pa = pa
+        self.fields = _export_fields(model)
+        self.schema = pa.schema(
+            [
+                (name, self._arrow_type(model.model_fields[name].annotation))
+                for name in self.fields
+            ]
+        )
+        self.writer = pq.ParquetWriter(stream, self.schema)
+
+    def _arrow_type(self, annotation: Any):
+        """Map a (possibly optional) field annotation to an arrow type"""
+        pa = self.pa
+        args = [a for a in getattr(annotation, "__args__", ()) if a is not type(None)]
+        if getattr(annotation, "__origin__", None) is list:
+            return pa.list_(self._arrow_type(args[0]))
+        if len(args) == 1:
+            return self._arrow_type(args[0])
+        types = {
+            bool: pa.bool_(),
+            int: pa.int64(),
+            float: pa.float64(),
+            str: pa.string(),
+            datetime: pa.timestamp("ms", tz="UTC"),
+        }
+        return types.get(annotation, pa.string())
+
+    def write_page(self, page: list[SlimsBaseModel]):
+        """Write a page of models"""
+        columns = {name: [getattr(item, name) for item in page] for name in self.fields}
+        for field in self.schema:
+            if field.type == self.pa.string():
+                columns[field.name] = [
+                    v if v is None or isinstance(v, str) else json.dumps(v)
+                    for v in columns[field.name]
+                ]
+        self.writer.write_table(self.pa.Table.from_pydict(columns, schema=self.schema))
+
+    def close(self):
+        """Write the parquet footer"""
+        self.writer.close()
+
+
+WRITERS = {
+    "ndjson": NdjsonWriter,
+    "csv": CsvWriter,
+    "parquet": ParquetWriter,
+}
+
+
+def parse_filters(
+    model: Type[SlimsBaseModel], filters: Sequence[str]
+) -> dict[str, Any]:
+    """Parse "field=value" filters, coercing values to the field's type"""
+    parsed = {}
+    for item in filters:
+        name, sep, value = item.partition("=")
+        if not sep or name not in model.model_fields:
+            raise ValueError(f'Invalid filter "{item}" for {model.__name__}')
+        try:
+            parsed[name] = TypeAdapter(
+                model.model_fields[name].annotation
+            ).validate_python(value)
+        except ValidationError:
+            raise ValueError(f'Invalid value for filter "{item}"')
+    return parsed
+
+
+@contextmanager
+def _open_output(path: Optional[str], binary: bool) -> Iterator[IO]:
+    """Open the output file, or stdout when path is None or "-" """
+    if path is None or path == "-":
+        yield sys.stdout.buffer if binary else sys.stdout
+    else:
+        with open(path, "wb" if binary else "w", newline=None if binary else "") as f:
+            yield f
+
+
+def export(
+    client: SlimsClient,
+    model: Type[SlimsBaseModel],
+    output: Optional[str] = None,
+    fmt: str = "ndjson",
+    page_size: int = 100,
+    concurrency: int = 1,
+    sort: Optional[list[str]] = None,
+    **filters,
+) -> int:
+    """Stream records of a model to output, page by page.
+
+    Returns
+    -------
+    int:
+        Number of records written
+    """
+    writer_type = WRITERS[fmt]
+    count = 0
+    with _open_output(output, writer_type.binary) as stream:
+        writer = writer_type(stream, model)
+        for page in client.fetch_model_pages(
+            model,
+            page_size=page_size,
+            max_workers=concurrency,
+            sort=sort,
+            **filters,
+        ):
+            writer.write_page(page)
+            count += len(page)
+        writer.close()
+    return count
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Argument parser for the aind-slims command"""
+    parser = argparse.ArgumentParser(
+        prog="aind-slims", description="Access the AIND SLIMS instance"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser(
+        "export", help="Export records of a model page by page"
+    )
+    export_parser.add_argument("model", choices=sorted(MODELS))
+    export_parser.add_argument(
+        "-f",
+        "--filter",
+        action="append",
+        default=[],
+        metavar="FIELD=VALUE",
+        help="Only export records where FIELD equals VALUE, repeatable",
+    )
+    export_parser.add_argument(
+        "--sort",
+        action="append",
+        metavar="FIELD",
+        help="Sort by FIELD, repeatable. Prefix it with - for descending "
+        "order, as in --sort=-FIELD",
+    )
+    export_parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    export_parser.add_argument("-o", "--output", help="Output file, defaults to stdout")
+    export_parser.add_argument("--page-size", type=int, default=100)
+    export_parser.add_argument(
+        "--concurrency", type=int, default=1, help="Pages requested concurrently"
+    )
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Entry point of the aind-slims console script"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    model = MODELS[args.model]
+    try:
+        filters = parse_filters(model, args.filter)
+        for name in args.sort or []:
+            if name.removeprefix("-") not in model.model_fields:
+                raise ValueError(f'Invalid sort field "{name}" for {model.__name__}')
+    except ValueError as e:
+        parser.error(str(e))
+    if args.page_size < 1:
+        parser.error("--page-size must be positive")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be positive")
+    count = export(
+        SlimsClient(),
+        model,
+        output=args.output,
+        fmt=args.format,
+        page_size=args.page_size,
+        concurrency=args.concurrency,
+        sort=args.sort,
+        **filters,
+    )
+    print(f"Exported {count} {args.model} records", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""Utilities for making concurrent requests to SLIMS.
+
+SingleFlight - coalesces concurrent identical calls into a single call
+AdaptiveLimiter - caps requests in flight and per second, adapting the cap to
+    how the server responds
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Hashable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """An in-flight call and the number of callers waiting on it"""
+
+    def __init__(self):
+        """Create a pending call"""
+        self.future: Future = Future()
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key: while a call is in
+    flight, other callers with the same key wait for it and share its result
+    (or exception) instead of making their own call.
+
+    Thread-safe. Coroutines can join calls with do_async, sharing in-flight
+    calls with threads.
+
+    Examples
+    --------
+    >>> single_flight = SingleFlight()
+    >>> single_flight.do(("Content", "barcode=000000"), fetch_mouse)
+    """
+
+    def __init__(self):
+        """Create with no calls in flight"""
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+
+    def _join(self, key: Hashable) -> tuple[_Call, bool]:
+        """Join the call in flight for key, or start one. Returns the call and
+        whether the caller must run it"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                logger.debug("Joined in-flight call %s", key)
+                return call, False
+            call = self._calls[key] = _Call()
+            return call, True
+
+    def _run(self, key: Hashable, call: _Call, fn: Callable, args: tuple, kwargs: dict):
+        """Run fn and resolve the call with its result"""
+        error = None
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            result, error = None, e
+        with self._lock:
+            del self._calls[key]
+        if error is None:
+            call.future.set_result(result)
+        else:
+            call.future.set_exception(error)
+
+    def in_flight(self, key: Hashable) -> int:
+        """Number of callers sharing the call in flight for key, 0 if none"""
+        with self._lock:
+            call = self._calls.get(key)
+            return 0 if call is None else call.waiters + 1
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """Call fn(*args, **kwargs), unless a call with key is already in
+        flight, in which case wait for and return its result"""
+        call, leader = self._join(key)
+        if leader:
+            self._run(key, call, fn, args, kwargs)
+        return call.future.result()
+
+    async def do_async(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """Like do, for coroutines: fn is run in the event loop's default
+        executor, and callers wait without blocking the event loop"""
+        call, leader = self._join(key)
+        if leader:
+            asyncio.get_running_loop().run_in_executor(
+                None, self._run, key, call, fn, args, kwargs
+            )
+        return await asyncio.wrap_future(call.future)
+
+
+class _Slot:
+    """A request admitted by an AdaptiveLimiter"""
+
+    overloaded = False  # set if the server was overloaded
+
+
+class AdaptiveLimiter:
+    """Caps the number of requests in flight, and optionally requests per
+    second, across every thread that shares it.
+
+    The cap on requests in flight adapts with AIMD (additive increase,
+    multiplicative decrease): it grows by about one for every cap's worth of
+    requests that succeed, and is multiplied by decrease_factor when a
+    request reports the server overloaded (e.g. 429 or 5xx responses) or
+    exceeds latency_target. Requests that started before the last decrease
+    do not decrease it again, so a burst of failures backs off once.
+
+    Examples
+    --------
+    >>> limiter = AdaptiveLimiter(max_concurrency=16, rate=50)
+    >>> with limiter.slot() as slot:
+    ...     response = session.get(url)
+    ...     slot.overloaded = response.status_code in (429, 503)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        latency_target: Optional[float] = None,
+        decrease_factor: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Start at max_concurrency requests in flight
+
+        Args:
+            max_concurrency (int): most requests in flight
+            min_concurrency (int): fewest requests in flight the cap is
+                decreased to
+            rate (float, optional): most requests started per second
+            burst (int, optional): requests that can start at once after
+                being idle, defaults to max(1, rate)
+            latency_target (float, optional): seconds after which a request
+                is treated as a sign of overload
+            decrease_factor (float): cap multiplier on overload
+            clock (Callable): monotonic time in seconds
+        """
+        if not 1 <= min_concurrency <= max_concurrency:
+            raise ValueError("Expected 1 <= min_concurrency <= max_concurrency")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1")
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive")
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.rate = rate
+        self.burst = burst or max(1, int(rate or 1))
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._limit = float(max_concurrency)
+        self._in_flight = 0
+        self._tokens = float(self.burst)
+        self._refilled = clock()
+        self._last_decrease = float("-inf")
+
+    @property
+    def limit(self) -> int:
+        """Current cap on requests in flight"""
+        with self._condition:
+            return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests in flight"""
+        with self._condition:
+            return self._in_flight
+
+    def _token_wait(self) -> float:
+        """Take a token if one is available and return 0, otherwise return
+        the seconds until one is"""
+        if self.rate is None:
+            return 0
+        now = self._clock()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._refilled) * self.rate
+        )
+        self._refilled = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0
+        return (1 - self._tokens) / self.rate
+
+    def acquire(self) -> float:
+        """Wait until a request may start. Returns its start time, to pass
+        to release"""
+        with self._condition:
+            while True:
+                wait = None
+                if self._in_flight < int(self._limit):
+                    wait = self._token_wait()
+                    if not wait:
+                        self._in_flight += 1
+                        return self._clock()
+                self._condition.wait(wait)
+
+    def release(self, started: float, overloaded: bool = False):
+        """Record the end of a request started at started, adapting the cap"""
+        now = self._clock()
+        if self.latency_target is not None and now - started > self.latency_target:
+            overloaded = True
+        with self._condition:
+            self._in_flight -= 1
+            if not overloaded:
+                self._limit = min(self.max_concurrency, self._limit + 1 / self._limit)
+            elif started >= self._last_decrease:
+                self._limit = max(
+                    self.min_concurrency, self._limit * self.decrease_factor
+                )
+                self._last_decrease = now
+                logger.debug("SLIMS overloaded, limit %d", self._limit)
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self) -> Iterator[_Slot]:
+        """Context manager admitting one request. Set overloaded on the slot
+        if the server was overloaded; exceptions count as overloaded"""
+        started = self.acquire()
+        slot = _Slot()
+        try:
+            yield slot
+        except Exception:
+            slot.overloaded = True
+            raise
+        finally:
+            self.release(started, slot.overloaded)
@@ -8,10 +8,17 @@ SlimsClient - Basic wrapper around slims-python-api client with convenience
     methods and integration with SlimsBaseModel subtypes
 """
 
+import json
 import logging
-from copy import deepcopy
+import os
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from copy import copy, deepcopy
+from datetime import datetime, timezone
 from functools import lru_cache
-from typing import Optional, Type, TypeVar
+from typing import Callable, Iterable, Iterator, Optional, Type, TypeVar
 
 from pydantic import ValidationError
 from requests import Response
@@ -20,10 +27,27 @@ from slims.internal import Record as SlimsRecord
 from slims.slims import Slims, _SlimsApiException
 
 from aind_slims_api import config
+from aind_slims_api.attachments import (
+    DEFAULT_CHUNK_SIZE,
+    AttachmentSource,
+    ContentCache,
+    attachment_body,
+    attachment_name,
+    content_hash,
+)
+from aind_slims_api.concurrency import AdaptiveLimiter, SingleFlight
 from aind_slims_api.exceptions import SlimsRecordNotFound
 from aind_slims_api.models.attachment import SlimsAttachment
 from aind_slims_api.models.base import SlimsBaseModel
+from aind_slims_api.models.expressions import FieldExpression, ModelField
+from aind_slims_api.models.serialization import ADD_EXCLUDE, serialization_plan
+from aind_slims_api.queryset import QuerySet
+from aind_slims_api.reference_data import ReferenceDataRegistry
+from aind_slims_api.references import KnownPks
+from aind_slims_api.schema import SchemaCache
+from aind_slims_api.transport import SlimsTransport
 from aind_slims_api.types import SLIMS_TABLES
+from aind_slims_api.validation import ValidationReport
 
 logger = logging.getLogger(__name__)
 
@@ -31,29 +55,162 @@ logger = logging.getLogger(__name__)
 SlimsBaseModelTypeVar = TypeVar("SlimsBaseModelTypeVar", bound=SlimsBaseModel)
 
 
+def _column_value(row: SlimsRecord | dict, name: str):
+    """Value of column name of a slims Record or json entity"""
+    if isinstance(row, dict):
+        return next(c["value"] for c in row["columns"] if c["name"] == name)
+    return row.column(name).value
+
+
+def _natural_key(model: SlimsBaseModel, key: tuple[str, ...]) -> str:
+    """Serialized values of the key fields of a model, comparable between
+    local models and records fetched from SLIMS"""
+    values = model.model_dump(include=set(key))
+    return json.dumps([values[name] for name in key], default=str)
+
+
+def _in_or_null(field: ModelField, values: list) -> FieldExpression:
+    """Field is one of values, any of which may be None"""
+    present = []
+    for value in values:
+        if value is not None and value not in present:
+            present.append(value)
+    if not present:
+        return field.is_null()
+    if None in values:
+        return field.in_(present) | field.is_null()
+    return field.in_(present)
+
+
+def _changed_fields(model: SlimsBaseModel, record: SlimsBaseModel) -> list[str]:
+    """Fields of model that differ from those of record fetched from SLIMS"""
+    fields = set(type(model).model_fields) - {"pk", "json_entity", "attachments"}
+    new, current = model.model_dump(include=fields), record.model_dump(include=fields)
+    return sorted(name for name in fields if new[name] != current[name])
+
+
 class SlimsClient:
     """Wrapper around slims-python-api client with convenience methods"""
 
-    db: Slims
+    def __init__(
+        self,
+        url=None,
+        username=None,
+        password=None,
+        coalesce_requests: bool = True,
+        compress_responses: bool = True,
+        json_loads: Optional[Callable] = None,
+        raw_entities: bool = False,
+        limiter: Optional[AdaptiveLimiter] = None,
+        check_schema: bool = False,
+        schema_cache_path: Optional[str | os.PathLike] = None,
+        preload_reference_data: bool = False,
+        check_references: bool = False,
+        attachment_cache_bytes: int = 64 * 2**20,
+    ):
+        """Create object. The connection to the database is deferred until
+        it is first used, see SlimsClient.db
 
-    def __init__(self, url=None, username=None, password=None):
-        """Create object and try to connect to database"""
+        Args:
+            coalesce_requests (bool): concurrent fetches with the same table,
+                criteria, sort and range share a single request
+            compress_responses (bool): ask SLIMS for gzip or deflate encoded
+                responses
+            json_loads (Callable, optional): decodes response bodies, defaults
+                to orjson.loads if orjson is installed, else json.loads
+            raw_entities (bool): model fetches validate json entities directly,
+                see SlimsClient.fetch_entities, instead of slims Records
+            limiter (AdaptiveLimiter, optional): caps requests in flight and
+                per second, across every thread using the client. Share one
+                between clients to cap them together
+            check_schema (bool): on connecting, check the aliases and units
+                of every model against the SLIMS table schemas, raising
+                SlimsSchemaMismatch if they differ. With raw_entities, fetched
+                models are then decoded with their checked schema
+            schema_cache_path (str | PathLike, optional): file table schemas
+                are cached in, see aind_slims_api.schema.SchemaCache
+            preload_reference_data (bool): on connecting, load every
+                instrument, user and unit, and answer fetches of them locally,
+                see aind_slims_api.reference_data
+            check_references (bool): add_model and add_models check the
+                records that models reference exist before writing them,
+                raising SlimsReferenceNotFound if not. Existing pks are
+                cached, see aind_slims_api.references.KnownPks
+            attachment_cache_bytes (int): downloaded attachment contents
+                are cached by hash, up to this many bytes, so that
+                attachments with identical contents are downloaded once. 0
+                disables the cache
+        """
         self.url = url or config.slims_url
-
-        self.connect(
-            self.url,
-            username or config.slims_username,
-            password or config.slims_password.get_secret_value(),
+        self.username = username or config.slims_username
+        self._password = password or config.slims_password.get_secret_value()
+        self._db: Optional[Slims] = None
+        self._connect_lock = threading.Lock()
+        self._single_flight = SingleFlight() if coalesce_requests else None
+        self._compress_responses = compress_responses
+        self._json_loads = json_loads
+        self._raw_entities = raw_entities
+        self.limiter = limiter
+        self._check_schema = check_schema
+        self._schema_cache_path = schema_cache_path
+        self._schema: Optional[SchemaCache] = None
+        self.reference_data = (
+            ReferenceDataRegistry(self) if preload_reference_data else None
         )
+        self.known_pks = KnownPks(self) if check_references else None
+        self._attachment_cache = (
+            ContentCache(attachment_cache_bytes) if attachment_cache_bytes else None
+        )
+
+    @property
+    def db(self) -> Slims:
+        """The underlying slims-python-api client, connected on first use"""
+        if self._db is None:
+            with self._connect_lock:
+                if self._db is None:
+                    self.connect(self.url, self.username, self._password)
+        return self._db
 
     def connect(self, url: str, username: str, password: str):
-        """Connect to the database"""
-        self.db = Slims(
+        """Connect to the database, through a SlimsTransport"""
+        self._db = Slims(
             "slims",
             url,
             username,
             password,
         )
+        self._db.slims_api = SlimsTransport(
+            url,
+            username,
+            password,
+            json_loads=self._json_loads,
+            limiter=self.limiter,
+            accept_encoding=(
+                "gzip, deflate" if self._compress_responses else "identity"
+            ),
+        )
+        try:
+            if self._check_schema:
+                self.schema.check_models()
+            if self.reference_data is not None:
+                self.reference_data.load()
+        except BaseException:
+            self._db = None
+            raise
+
+    @property
+    def schema(self) -> SchemaCache:
+        """Cache of the SLIMS table schemas behind models"""
+        if self._schema is None:
+            self._schema = SchemaCache(self, self._schema_cache_path)
+        return self._schema
+
+    def _decoder(self, model: Type[SlimsBaseModel]) -> Optional[Callable]:
+        """Decoder of json entities of model, if fetching raw entities and
+        the model was checked against its schema"""
+        if not self._raw_entities or self._schema is None:
+            return None
+        return self._schema.decoder(model)
 
     def fetch(
         self,
@@ -76,7 +233,66 @@ class SlimsClient:
 
         Returns:
             records (list[SlimsRecord] | None): Matching records, if any
+
+        Notes:
+            Unless coalesce_requests is disabled, concurrent calls with the
+            same arguments share a single request and its records
         """
+        criteria = self._criteria(args, kwargs)
+        try:
+            records = self._coalesced(
+                "records", self.db.fetch, table, criteria, sort, start, end
+            )
+        except _SlimsApiException as e:
+            # TODO: Add better error handling
+            #  Let's just raise error for the time being
+            raise e
+
+        # coalesced callers share records, but not the list
+        return list(records)
+
+    def fetch_entities(
+        self,
+        table: SLIMS_TABLES,
+        *args,
+        sort: Optional[str | list[str]] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        **kwargs,
+    ) -> list[dict]:
+        """SlimsClient.fetch, but returns the json entities of the matching
+        records, as returned by the SLIMS rest api, rather than slims Record
+        objects, which wrap every column in a Column object
+
+        Returns:
+            entities (list[dict]): Matching records, if any
+        """
+        criteria = self._criteria(args, kwargs)
+        entities = self._coalesced(
+            "entities", self._get_entities, table, criteria, sort, start, end
+        )
+        return list(entities)
+
+    def _get_entities(
+        self,
+        table: SLIMS_TABLES,
+        criteria: Criterion,
+        sort: Optional[str | list[str]] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> list[dict]:
+        """Slims.fetch, returning json entities"""
+        body = {
+            "sortBy": sort or [],
+            "startRow": start,
+            "endRow": end,
+            "criteria": criteria.to_dict(),
+        }
+        return self.db.slims_api.get_json(f"{table}/advanced", body)["entities"]
+
+    @staticmethod
+    def _criteria(args: tuple, kwargs: dict) -> Criterion:
+        """Conjunction of the criteria in args and "field=value" filters"""
         criteria = conjunction()
         for arg in args:
             if isinstance(arg, Criterion):
@@ -84,20 +300,40 @@ class SlimsClient:
 
         for k, v in kwargs.items():
             criteria.add(equals(k, v))
-        try:
-            records = self.db.fetch(
-                table,
-                criteria,
-                sort=sort,
-                start=start,
-                end=end,
-            )
-        except _SlimsApiException as e:
-            # TODO: Add better error handling
-            #  Let's just raise error for the time being
-            raise e
+        return criteria
 
-        return records
+    def _coalesced(
+        self,
+        kind: str,
+        fn: Callable,
+        table: SLIMS_TABLES,
+        criteria: Criterion,
+        sort: Optional[str | list[str]],
+        start: Optional[int],
+        end: Optional[int],
+    ) -> list:
+        """Call fn(table, criteria, ...), sharing the call with concurrent
+        identical requests of the same kind unless coalescing is disabled"""
+        if self._single_flight is None:
+            return fn(table, criteria, sort=sort, start=start, end=end)
+        key = (
+            kind,
+            table,
+            json.dumps(criteria.to_dict(), sort_keys=True, default=str),
+            json.dumps(sort),
+            start,
+            end,
+        )
+        return self._single_flight.do(
+            key, fn, table, criteria, sort=sort, start=start, end=end
+        )
+
+    def _fetch_rows(self, table: SLIMS_TABLES, *args, **kwargs) -> list:
+        """Fetch rows to validate as models: json entities if raw_entities is
+        enabled, else slims Records"""
+        if self._raw_entities:
+            return self.fetch_entities(table, *args, **kwargs)
+        return self.fetch(table, *args, **kwargs)
 
     @staticmethod
     def resolve_model_alias(
@@ -111,20 +347,92 @@ class SlimsClient:
         else:
             raise ValueError(f"Cannot resolve alias for {attr_name} on {model}")
 
+    def _resolve_sort_key(self, model: Type[SlimsBaseModel], key: str) -> str:
+        """Alias of a sort field, keeping a "-" prefix for descending order"""
+        if key.startswith("-"):
+            return "-" + self.resolve_model_alias(model, key[1:])
+        return self.resolve_model_alias(model, key)
+
+    def _remember(
+        self, models: list[SlimsBaseModelTypeVar]
+    ) -> list[SlimsBaseModelTypeVar]:
+        """Remember the pks of models read from SLIMS, if checking
+        references"""
+        if self.known_pks is not None:
+            self.known_pks.add_models(models)
+        return models
+
     @staticmethod
     def _validate_models(
-        model_type: Type[SlimsBaseModelTypeVar], records: list[SlimsRecord]
+        model_type: Type[SlimsBaseModelTypeVar],
+        records: list[SlimsRecord | dict],
+        report: Optional[ValidationReport] = None,
+        decoder: Optional[Callable] = None,
     ) -> list[SlimsBaseModelTypeVar]:
-        """Validate a list of SlimsBaseModel objects. Logs errors for records
-        that fail pydantic validation."""
+        """Validate a list of SlimsBaseModel objects, from slims Records or
+        json entities, which are validated with decoder if given. Records
+        that fail pydantic validation are counted in report, or if no report
+        is given, summarized in one logged error."""
+        decode = decoder or model_type.from_json_entity
+        call_report = ValidationReport(model_type) if report is None else report
         validated = []
         for record in records:
             try:
-                validated.append(model_type.model_validate(record))
+                if isinstance(record, dict):
+                    validated.append(decode(record))
+                else:
+                    validated.append(model_type.model_validate(record))
             except ValidationError as e:
-                logger.error(f"SLIMS data validation failed, {repr(e)}")
+                json_entity = record if isinstance(record, dict) else record.json_entity
+                call_report.add_failure(json_entity.get("pk"), e)
+        call_report.add_validated(len(validated))
+        if report is None:
+            call_report.log(logger)
         return validated
 
+    @staticmethod
+    @contextmanager
+    def _validation_report(
+        model: Type[SlimsBaseModel], report: Optional[ValidationReport]
+    ) -> Iterator[ValidationReport]:
+        """Report for the validations of one call, logged once it ends and
+        added to report, if given"""
+        call_report = ValidationReport(model)
+        try:
+            yield call_report
+        finally:
+            call_report.log(logger)
+            if report is not None:
+                report.update(call_report)
+
+    def _resolve_fetch_args(
+        self,
+        model: Type[SlimsBaseModelTypeVar],
+        args: tuple,
+        sort: Optional[str | list[str]],
+        kwargs: dict,
+    ) -> tuple[Optional[str | list[str]], dict]:
+        """Map sort fields and "field=value" filters of a model fetch to
+        their SLIMS aliases, adding the model's base fetch filters. Checks
+        field expressions in args are on fields of model"""
+        for arg in args:
+            if isinstance(arg, FieldExpression) and not arg.applies_to(model):
+                raise ValueError(f"{arg!r} is not an expression on {model}")
+        resolved_kwargs = deepcopy(model._base_fetch_filters)
+        for name, value in kwargs.items():
+            resolved_kwargs[self.resolve_model_alias(model, name)] = value
+        logger.debug("Resolved kwargs: %s", resolved_kwargs)
+        resolved_sort: Optional[str | list[str]] = None
+        if sort is not None:
+            if isinstance(sort, str):
+                resolved_sort = self._resolve_sort_key(model, sort)
+            else:
+                resolved_sort = [
+                    self._resolve_sort_key(model, sort_key) for sort_key in sort
+                ]
+        logger.debug("Resolved sort: %s", resolved_sort)
+        return resolved_sort, resolved_kwargs
+
     def fetch_models(
         self,
         model: Type[SlimsBaseModelTypeVar],
@@ -132,6 +440,7 @@ class SlimsClient:
         sort: Optional[str | list[str]] = None,
         start: Optional[int] = None,
         end: Optional[int] = None,
+        report: Optional[ValidationReport] = None,
         **kwargs,
     ) -> list[SlimsBaseModelTypeVar]:
         """Fetch records from SLIMS and return them as SlimsBaseModel objects
@@ -145,21 +454,42 @@ class SlimsClient:
         Notes
         -----
         - kwargs are mapped to field alias values
+        - sort fields may be prefixed with "-" for descending order
+        - args may be field expressions, e.g. model.field >= value, see
+          aind_slims_api.models.expressions
+        - records that fail validation are left out, and counted in report
+        - with preload_reference_data, fetches of reference models by key
+          fields are answered locally if loaded records match, see
+          aind_slims_api.reference_data
         """
-        resolved_kwargs = deepcopy(model._base_fetch_filters)
-        for name, value in kwargs.items():
-            resolved_kwargs[self.resolve_model_alias(model, name)] = value
-        logger.debug("Resolved kwargs: %s", resolved_kwargs)
-        resolved_sort: Optional[str | list[str]] = None
-        if sort is not None:
-            if isinstance(sort, str):
-                resolved_sort = self.resolve_model_alias(model, sort)
-            else:
-                resolved_sort = [
-                    self.resolve_model_alias(model, sort_key) for sort_key in sort
-                ]
-        logger.debug("Resolved sort: %s", resolved_sort)
-        response = self.fetch(
+        return self._fetch_models(model, args, kwargs, sort, start, end, report)
+
+    def _fetch_models(
+        self,
+        model: Type[SlimsBaseModelTypeVar],
+        args: tuple,
+        kwargs: dict,
+        sort: Optional[str | list[str]] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        report: Optional[ValidationReport] = None,
+        local: bool = True,
+    ) -> list[SlimsBaseModelTypeVar]:
+        """See fetch_models. Preloaded reference data is only used if local"""
+        resolved_sort, resolved_kwargs = self._resolve_fetch_args(
+            model, args, sort, kwargs
+        )
+        if local and self.reference_data is not None:
+            loaded = self.reference_data.query(
+                model,
+                self._criteria(args, resolved_kwargs),
+                resolved_sort,
+                start,
+                end,
+            )
+            if loaded is not None:
+                return self._remember(loaded)
+        response = self._fetch_rows(
             model._slims_table,  # TODO: consider changing fetch method
             *args,
             sort=resolved_sort,
@@ -167,7 +497,76 @@ class SlimsClient:
             end=end,
             **resolved_kwargs,
         )
-        return self._validate_models(model, response)
+        with self._validation_report(model, report) as call_report:
+            return self._remember(
+                self._validate_models(
+                    model, response, call_report, self._decoder(model)
+                )
+            )
+
+    def fetch_model_pages(
+        self,
+        model: Type[SlimsBaseModelTypeVar],
+        *args,
+        page_size: int = 100,
+        max_workers: int = 1,
+        sort: Optional[str | list[str]] = None,
+        report: Optional[ValidationReport] = None,
+        **kwargs,
+    ) -> Iterator[list[SlimsBaseModelTypeVar]]:
+        """Stream records from SLIMS one page at a time, as validated
+        SlimsBaseModel objects
+
+        Args:
+            model (Type[SlimsBaseModel]): model to fetch
+            page_size (int): number of rows requested per page
+            max_workers (int): number of pages requested concurrently
+            sort (str | list[str], optional): fields to sort by, defaults to
+                the model's pk so that pages are stable
+            report (ValidationReport, optional): counts records that fail
+                validation, which are left out of pages
+            *args (Slims.criteria.Criterion): Optional criteria to apply
+            **kwargs: "field=value" filters, mapped to field alias values
+
+        Yields:
+            list[SlimsBaseModel]: validated models of each page, in order
+        """
+        if page_size < 1 or max_workers < 1:
+            raise ValueError("page_size and max_workers must be positive")
+        if sort is None and model.model_fields["pk"].alias:
+            sort = "pk"
+        resolved_sort, resolved_kwargs = self._resolve_fetch_args(
+            model, args, sort, kwargs
+        )
+        with self._validation_report(model, report) as call_report:
+            pending: deque[Future] = deque()
+            next_start = 0
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                while True:
+                    while len(pending) < max_workers:
+                        pending.append(
+                            executor.submit(
+                                self._fetch_rows,
+                                model._slims_table,
+                                *args,
+                                sort=resolved_sort,
+                                start=next_start,
+                                end=next_start + page_size,
+                                **resolved_kwargs,
+                            )
+                        )
+                        next_start += page_size
+                    records = pending.popleft().result()
+                    if records:
+                        yield self._remember(
+                            self._validate_models(
+                                model, records, call_report, self._decoder(model)
+                            )
+                        )
+                    if len(records) < page_size:
+                        for future in pending:
+                            future.cancel()
+                        return
 
     def fetch_model(
         self,
@@ -184,7 +583,12 @@ class SlimsClient:
         Notes
         -----
         - kwargs are mapped to field alias values
+        - only one row is requested, unless end is given
         """
+        if start is None:
+            start = 0
+        if end is None:
+            end = start + 1
         records = self.fetch_models(
             model,
             *args,
@@ -199,6 +603,206 @@ class SlimsClient:
             raise SlimsRecordNotFound("No record found.")
         return records[0]
 
+    def query(
+        self, model: Type[SlimsBaseModelTypeVar], page_size: int = 100
+    ) -> QuerySet[SlimsBaseModelTypeVar]:
+        """Lazy query of every record of model, narrowed with filter,
+        order_by and slicing, and fetched when its results are first needed,
+        see aind_slims_api.queryset.QuerySet
+
+        Examples
+        --------
+        >>> client.query(SlimsBehaviorSession).filter(mouse_pk=1)[:10]
+        """
+        return QuerySet(self, model, page_size)
+
+    def first(
+        self,
+        model: Type[SlimsBaseModelTypeVar],
+        *args,
+        sort: Optional[str | list[str]] = None,
+        **kwargs,
+    ) -> SlimsBaseModelTypeVar | None:
+        """Fetch the first matching record as a validated SlimsBaseModel
+        object, or None if there is no match. Only one row is requested.
+
+        Notes
+        -----
+        - kwargs are mapped to field alias values
+        """
+        records = self.fetch_models(model, *args, sort=sort, start=0, end=1, **kwargs)
+        return records[0] if records else None
+
+    def _row_exists(
+        self, model: Type[SlimsBaseModel], args: tuple, kwargs: dict, index: int
+    ) -> bool:
+        """Whether a row exists at index of the matching records. Requests
+        at most one row, which is not validated"""
+        records = self.fetch(
+            model._slims_table, *args, start=index, end=index + 1, **kwargs
+        )
+        return len(records) > 0
+
+    def exists(self, model: Type[SlimsBaseModel], *args, **kwargs) -> bool:
+        """Whether any record matches. Requests a single row, which is not
+        validated.
+
+        Notes
+        -----
+        - kwargs are mapped to field alias values
+        """
+        _, resolved_kwargs = self._resolve_fetch_args(model, args, None, kwargs)
+        return self._row_exists(model, args, resolved_kwargs, 0)
+
+    def count_models(self, model: Type[SlimsBaseModel], *args, **kwargs) -> int:
+        """Count matching records without transferring them. The count is
+        found by probing single rows at exponentially growing, then bisected,
+        offsets, so about 2*log2(count) one-row requests are made.
+
+        Notes
+        -----
+        - kwargs are mapped to field alias values
+        """
+        _, resolved_kwargs = self._resolve_fetch_args(model, args, None, kwargs)
+        if not self._row_exists(model, args, resolved_kwargs, 0):
+            return 0
+        # the row at index lo exists, the row at index hi does not
+        lo, hi = 0, 1
+        while self._row_exists(model, args, resolved_kwargs, hi):
+            lo, hi = hi, hi * 2
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if self._row_exists(model, args, resolved_kwargs, mid):
+                lo = mid
+            else:
+                hi = mid
+        return hi
+
+    def _partition_ranges(
+        self,
+        model: Type[SlimsBaseModel],
+        args: tuple,
+        kwargs: dict,
+        field: ModelField,
+        partitions: int,
+    ) -> list[FieldExpression]:
+        """Split the matching records into at most `partitions` ranges of
+        an integer or date field, plus one for records where it is null"""
+        ranges = [] if field.name == "pk" else [field.is_null()]
+
+        def bound(sort: str):
+            """Value of field in the first record, sorted by sort"""
+            records = self.fetch(
+                model._slims_table,
+                *args,
+                field.is_not_null(),
+                sort=[sort],
+                start=0,
+                end=1,
+                **kwargs,
+            )
+            return records[0].column(field.alias) if records else None
+
+        first = bound(field.alias)
+        if first is None:
+            return ranges
+        lo, hi = first.value, bound("-" + field.alias).value
+        if not isinstance(lo, int) or isinstance(lo, bool):
+            raise ValueError(f"Cannot partition by {field}, not an integer or date")
+        edges = sorted({lo + (hi - lo) * i // partitions for i in range(partitions)})
+        if first.datatype == "DATE":
+            edges = [datetime.fromtimestamp(e / 10**3, tz=timezone.utc) for e in edges]
+        for start, end in zip(edges, edges[1:]):
+            ranges.append((field >= start) & (field < end))
+        ranges.append(field >= edges[-1])
+        return ranges
+
+    def scan_models(
+        self,
+        model: Type[SlimsBaseModelTypeVar],
+        *args,
+        partitions: int = 4,
+        max_workers: Optional[int] = None,
+        key: str = "pk",
+        page_size: int = 100,
+        report: Optional[ValidationReport] = None,
+        **kwargs,
+    ) -> Iterator[list[SlimsBaseModelTypeVar]]:
+        """Scan all matching records, concurrently, by splitting them into
+        ranges of an integer or date field.
+
+        Each range is paged by pk: every request asks for the first
+        page_size records with a pk greater than the last one received,
+        rather than using deep start offsets.
+
+        Args:
+            model (Type[SlimsBaseModel]): model to fetch
+            partitions (int): number of ranges to split the records into
+            max_workers (int, optional): number of concurrent requests,
+                defaults to one per range
+            key (str): integer or date field to partition by, e.g. pk or date
+            page_size (int): number of rows requested per page
+            report (ValidationReport, optional): counts records that fail
+                validation, which are left out of pages
+            *args (Slims.criteria.Criterion): Optional criteria to apply
+            **kwargs: "field=value" filters, mapped to field alias values
+
+        Yields:
+            list[SlimsBaseModel]: validated models of each page, in the order
+                pages complete
+        """
+        if partitions < 1 or page_size < 1:
+            raise ValueError("partitions and page_size must be positive")
+        _, resolved_kwargs = self._resolve_fetch_args(model, args, None, kwargs)
+        pk_field = ModelField(model, "pk")
+        ranges = self._partition_ranges(
+            model, args, resolved_kwargs, ModelField(model, key), partitions
+        )
+        if not ranges:
+            return
+
+        def fetch_page(criterion: FieldExpression, after: Optional[int]):
+            """Fetch the first page of a range with a pk greater than after"""
+            if after is not None:
+                criterion = criterion & (pk_field > after)
+            return self._fetch_rows(
+                model._slims_table,
+                *args,
+                criterion,
+                sort=[pk_field.alias],
+                start=0,
+                end=page_size,
+                **resolved_kwargs,
+            )
+
+        with self._validation_report(model, report) as call_report:
+            with ThreadPoolExecutor(max_workers=max_workers or len(ranges)) as executor:
+                pending = {executor.submit(fetch_page, r, None): r for r in ranges}
+                try:
+                    while pending:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            criterion = pending.pop(future)
+                            records = future.result()
+                            if len(records) >= page_size:
+                                after = _column_value(records[-1], pk_field.alias)
+                                next_page = executor.submit(
+                                    fetch_page, criterion, after
+                                )
+                                pending[next_page] = criterion
+                            if records:
+                                yield self._remember(
+                                    self._validate_models(
+                                        model,
+                                        records,
+                                        call_report,
+                                        self._decoder(model),
+                                    )
+                                )
+                finally:
+                    for future in pending:
+                        future.cancel()
+
     def fetch_attachments(
         self,
         record: SlimsBaseModel,
@@ -211,9 +815,131 @@ class SlimsClient:
             ),
         )
 
+    def fetch_attachments_many(
+        self,
+        records: Iterable[SlimsBaseModel],
+        max_workers: int = 8,
+    ) -> dict[int, list[SlimsAttachment]]:
+        """Fetch the attachments of many records, with up to max_workers
+        requests in flight.
+
+        Args:
+            records (Iterable[SlimsBaseModel]): records of a single table
+            max_workers (int): number of concurrent requests
+
+        Returns:
+            dict[int, list[SlimsAttachment]]: attachments by record pk, in
+            the order of records
+        """
+        unique: dict[int, SlimsBaseModel] = {}
+        for record in records:
+            if record.pk is None:
+                raise ValueError("Cannot fetch attachments of a record without a pk")
+            unique.setdefault(record.pk, record)
+        if len({record._slims_table for record in unique.values()}) > 1:
+            raise TypeError("fetch_attachments_many requires records of one table")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(
+                zip(unique, executor.map(self.fetch_attachments, unique.values()))
+            )
+
     def fetch_attachment_content(self, attachment: SlimsAttachment) -> Response:
-        """Fetch attachment content for a given attachment."""
-        return self.db.slims_api.get(f"repo/{attachment.pk}")
+        """Fetch attachment content for a given attachment. Contents are
+        cached by hash, so attachments with the same contents share one
+        download"""
+        if self._attachment_cache is None or attachment.hash is None:
+            return self.db.slims_api.get(f"repo/{attachment.pk}")
+        cached = self._attachment_cache.get(attachment.hash)
+        if cached is not None:
+            logger.debug(f"Attachment/{attachment.pk} contents are cached")
+            return copy(cached)
+        response = self.db.slims_api.get(f"repo/{attachment.pk}")
+        if response.status_code == 200:
+            self._attachment_cache.put(attachment.hash, response)
+            return copy(response)
+        return response
+
+    def add_attachment(
+        self,
+        record: SlimsBaseModel,
+        source: AttachmentSource,
+        name: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        deduplicate: bool = True,
+    ) -> SlimsAttachment:
+        """Attach a file to a record, unless the record already has an
+        attachment with the same contents. The file is streamed to SLIMS in
+        chunks, without being read into memory.
+
+        Args:
+            record (SlimsBaseModel): record to attach to, with a pk
+            source (str | PathLike | IO[bytes] | bytes | Iterable[bytes]):
+                contents, as a file path, a binary file object, bytes, or an
+                iterable of bytes, e.g. a generator
+            name (str, optional): attachment name, defaults to the file name
+            chunk_size (int): bytes read from files at a time
+            deduplicate (bool): hash the contents first, and return the
+                record's attachment with the same hash, if any, rather than
+                uploading them again. Sources that can only be read once,
+                e.g. generators, are always uploaded
+
+        Returns:
+            SlimsAttachment: the added, or existing, attachment
+        """
+        if record.pk is None:
+            raise ValueError("Cannot attach to a record without a pk")
+        name = name or attachment_name(source)
+        if not name:
+            raise ValueError("An attachment name is required for this source")
+        digest = content_hash(source, chunk_size) if deduplicate else None
+        if digest is not None:
+            for existing in self.fetch_attachments(record):
+                if existing.hash == digest:
+                    logger.info(
+                        f"SLIMS Attachment/{existing.pk} has the contents of {name}"
+                    )
+                    return existing
+        response = self.db.slims_api.post_stream(
+            "repo",
+            attachment_body(name, record._slims_table, record.pk, source, chunk_size),
+        )
+        if response.status_code not in (200, 201):
+            raise _SlimsApiException("Could not add attachment: " + response.text)
+        location = response.headers["Location"]
+        start = location.rfind("/") + 1
+        pk = int(location[start:])
+        logger.info(f"SLIMS Add: Attachment/{pk}")
+        return self.fetch_model(SlimsAttachment, pk=pk)
+
+    def add_attachments(
+        self,
+        attachments: Iterable[tuple[SlimsBaseModel, AttachmentSource]],
+        max_workers: int = 4,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        deduplicate: bool = True,
+    ) -> list[SlimsAttachment]:
+        """Attach files to records, uploading up to max_workers at a time
+
+        Args:
+            attachments (Iterable[tuple]): records and the sources to attach
+                to them, see add_attachment. Sources must have a file name
+            max_workers (int): number of concurrent uploads
+            chunk_size (int): bytes read from files at a time
+            deduplicate (bool): skip contents records already have
+
+        Returns:
+            list[SlimsAttachment]: the added, or existing, attachments, in
+            order
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(
+                executor.map(
+                    lambda item: self.add_attachment(
+                        *item, chunk_size=chunk_size, deduplicate=deduplicate
+                    ),
+                    attachments,
+                )
+            )
 
     @lru_cache(maxsize=None)
     def fetch_pk(self, table: SLIMS_TABLES, *args, **kwargs) -> int | None:
@@ -261,20 +987,61 @@ class SlimsClient:
         Returns
             An instance of the same type of model, with data from
             the resulting SLIMS record
+
+        Raises
+            SlimsReferenceNotFound: with check_references, if the model
+            references records that do not exist
         """
-        fields_to_include = set(args) or None
-        fields_to_exclude = set(kwargs.get("exclude", []))
-        fields_to_exclude.update(["pk", "attachments", "slims_api"])
-        rtn = self.add(
-            model._slims_table,
-            model.model_dump(
-                include=fields_to_include,
-                exclude=fields_to_exclude,
-                **kwargs,
-                by_alias=True,
-            ),
+        if self.known_pks is not None:
+            self.known_pks.check([model])
+        return self._add_model(model, args, kwargs)
+
+    def _add_model(
+        self, model: SlimsBaseModelTypeVar, args: tuple, kwargs: dict
+    ) -> SlimsBaseModelTypeVar:
+        """Add a model to SLIMS, without checking its references"""
+        rtn = self.add(model._slims_table, self._add_model_payload(model, args, kwargs))
+        return self._remember([type(model).model_validate(rtn)])[0]
+
+    def add_models(
+        self,
+        models: list[SlimsBaseModelTypeVar],
+        *args,
+        max_workers: int = 4,
+        **kwargs,
+    ) -> list[SlimsBaseModelTypeVar]:
+        """Add models to SLIMS concurrently, see add_model. With
+        check_references, the references of every model are checked, in
+        bulk, before any is added
+
+        Returns
+            list[SlimsBaseModel]: the added records, in the order of models
+
+        Raises
+            SlimsReferenceNotFound: with check_references, if any model
+            references records that do not exist
+        """
+        if self.known_pks is not None:
+            self.known_pks.check(models)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(
+                executor.map(lambda model: self._add_model(model, args, kwargs), models)
+            )
+
+    @staticmethod
+    def _add_model_payload(model: SlimsBaseModel, args: tuple, kwargs: dict) -> dict:
+        """Serialize a model for SlimsClient.add_model"""
+        if not kwargs:
+            return serialization_plan(type(model)).dump(
+                model, include=args or None, exclude=ADD_EXCLUDE
+            )
+        kwargs = dict(kwargs)
+        return model.model_dump(
+            include=set(args) or None,
+            exclude=ADD_EXCLUDE.union(kwargs.pop("exclude", ())),
+            **kwargs,
+            by_alias=True,
         )
-        return type(model).model_validate(rtn)
 
     def update_model(self, model: SlimsBaseModel, *args, **kwargs):
         """Given a SlimsBaseModel object, update its (existing) SLIMS record
@@ -291,14 +1058,97 @@ class SlimsClient:
         if model.pk is None:
             raise ValueError("Cannot update model without a pk")
 
-        fields_to_include = set(args) or None
-        rtn = self.update(
-            model._slims_table,
-            model.pk,
-            model.model_dump(
-                include=fields_to_include,
-                by_alias=True,
-                **kwargs,
-            ),
-        )
+        if kwargs:
+            data = model.model_dump(include=set(args) or None, by_alias=True, **kwargs)
+        else:
+            data = serialization_plan(type(model)).dump(model, include=args or None)
+        rtn = self.update(model._slims_table, model.pk, data)
         return type(model).model_validate(rtn)
+
+    def _fetch_by_natural_key(
+        self,
+        model_type: Type[SlimsBaseModelTypeVar],
+        models: list[SlimsBaseModelTypeVar],
+        key: tuple[str, ...],
+        chunk_size: int,
+    ) -> dict[str, SlimsBaseModelTypeVar]:
+        """Records matching models on key, by natural key. Makes one query per
+        chunk of models"""
+        fields = [ModelField(model_type, name) for name in key]
+        existing: dict[str, SlimsBaseModelTypeVar] = {}
+        for start in range(0, len(models), chunk_size):
+            end = start + chunk_size
+            chunk = models[start:end]
+            criteria = [
+                _in_or_null(field, [getattr(model, field.name) for model in chunk])
+                for field in fields
+            ]
+            records = self.fetch_models(model_type, *criteria)
+            for record in sorted(records, key=lambda r: r.pk):
+                record_key = _natural_key(record, key)
+                if record_key in existing:
+                    logger.warning(f"Multiple records in SLIMS for {record_key}")
+                else:
+                    existing[record_key] = record
+        return existing
+
+    def upsert_models(
+        self,
+        models: list[SlimsBaseModelTypeVar],
+        key: Optional[str | tuple[str, ...]] = None,
+        chunk_size: int = 100,
+        max_workers: int = 4,
+    ) -> list[SlimsBaseModelTypeVar]:
+        """Add models to SLIMS, or update the records that already match them
+        on a natural key. Safe to retry: records that match and have the same
+        values are left unchanged.
+
+        Existing records are looked up with one query per chunk of models,
+        then the necessary adds and updates are made concurrently.
+
+        Args:
+            models (list[SlimsBaseModel]): models of a single type
+            key (str | tuple[str], optional): fields identifying a record,
+                defaults to the model's natural key, e.g. ("mouse_pk", "date",
+                "task") for SlimsBehaviorSession
+            chunk_size (int): number of models looked up per query
+            max_workers (int): number of concurrent adds and updates
+
+        Returns:
+            list[SlimsBaseModel]: the added, updated or unchanged records, in
+            the order of models
+
+        Notes:
+            If several records match a model, the one with the lowest pk is
+            updated
+        """
+        if not models:
+            return []
+        model_type = type(models[0])
+        if any(type(model) is not model_type for model in models):
+            raise TypeError("upsert_models requires models of a single type")
+        if key is None:
+            key = model_type._natural_key
+        key = (key,) if isinstance(key, str) else tuple(key)
+        if not key:
+            raise ValueError(f"No key given, and {model_type} has no natural key")
+        keys = [_natural_key(model, key) for model in models]
+        if len(set(keys)) < len(keys):
+            raise ValueError(f"Models have duplicate values of {key}")
+
+        existing = self._fetch_by_natural_key(model_type, models, key, chunk_size)
+
+        def upsert(model: SlimsBaseModelTypeVar, model_key: str):
+            """Add or update a model"""
+            record = existing.get(model_key)
+            if record is None:
+                return self.add_model(model)
+            changed = _changed_fields(model, record)
+            if not changed:
+                return record
+            return self.update_model(
+                model.model_copy(update={"pk": record.pk}), *changed
+            )
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(upsert, models, keys))
@@ -7,3 +7,15 @@ class SlimsAPIException(Exception):
 
 class SlimsRecordNotFound(SlimsAPIException):
     """Exception raised when a record is not found in the SLIMS database."""
+
+
+class SlimsSchemaMismatch(SlimsAPIException):
+    """Exception raised when models do not match the SLIMS table schema."""
+
+
+class SlimsUnsupportedCriterion(SlimsAPIException):
+    """Exception raised when criteria cannot be evaluated on local records."""
+
+
+class SlimsReferenceNotFound(SlimsAPIException):
+    """Exception raised when a model references records not in SLIMS."""
@@ -0,0 +1,272 @@
+"""Evaluation of slims.criteria over records held in memory.
+
+LocalTable - answers fetches on a collection of models or json entities,
+    with hash and sorted indexes on chosen columns
+evaluate - evaluates a criterion on one row
+
+Rows are compared as SLIMS compares records: by column (alias), with dates as
+ms timestamps, and with SQL null semantics, so a comparison with a missing
+value is neither true nor false and a "not" of it does not match either.
+Criteria that cannot be evaluated exactly, e.g. on columns the rows do not
+have, raise SlimsUnsupportedCriterion so that callers can ask SLIMS instead.
+
+Examples
+--------
+>>> from aind_slims_api.local_criteria import LocalTable
+>>> table = LocalTable(mice, index=["cntn_barCode"])
+>>> table.filter(SlimsMouseContent.barcode.in_(["000001", "000002"]))
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+from slims.criteria import Criterion
+
+from aind_slims_api.exceptions import SlimsUnsupportedCriterion
+from aind_slims_api.models.base import SlimsBaseModel
+
+Row = dict[str, Any]
+# result of a comparison, None if unknown because a value is missing
+Truth = Optional[bool]
+
+
+def _row(record: SlimsBaseModel | dict) -> Row:
+    """Column values of a model or json entity, dates as ms timestamps"""
+    if isinstance(record, dict):
+        return {column["name"]: column["value"] for column in record["columns"]}
+    row = {}
+    for name, field in type(record).model_fields.items():
+        if field.alias:
+            value = getattr(record, name)
+            if isinstance(value, datetime):
+                value = round(value.timestamp() * 10**3)
+            row[field.alias] = value
+    return row
+
+
+def _operand(value: Any, operand: Any) -> Any:
+    """A criterion operand, comparable to a column value. Dates in criteria
+    are ISO 8601 strings, SLIMS stores them as ms timestamps"""
+    if isinstance(operand, list):
+        return [_operand(value, o) for o in operand]
+    if (
+        isinstance(operand, str)
+        and isinstance(value, (int, float))
+        and not isinstance(value, bool)
+    ):
+        try:
+            return round(datetime.fromisoformat(operand).timestamp() * 10**3)
+        except ValueError:
+            return operand
+    return operand
+
+
+def _lower(value: Any) -> str:
+    """Value as a string, ignoring case"""
+    return str(value).lower()
+
+
+# predicates of values that are not None, by operator
+_PREDICATES: dict[str, Callable[[Any, dict[str, Any]], bool]] = {
+    "equals": lambda v, c: v == _operand(v, c.get("value")),
+    "iEquals": lambda v, c: _lower(v) == _lower(c.get("value")),
+    "iNotEqual": lambda v, c: _lower(v) != _lower(c.get("value")),
+    "inSet": lambda v, c: v in _operand(v, c["value"]),
+    "notInSet": lambda v, c: v not in _operand(v, c["value"]),
+    "lessThan": lambda v, c: v < _operand(v, c["value"]),
+    "lessOrEqual": lambda v, c: v <= _operand(v, c["value"]),
+    "greaterThan": lambda v, c: v > _operand(v, c["value"]),
+    "greaterOrEqual": lambda v, c: v >= _operand(v, c["value"]),
+    "betweenInclusive": lambda v, c: (
+        _operand(v, c["start"]) <= v <= _operand(v, c["end"])
+    ),
+    "iContains": lambda v, c: _lower(c["value"]) in _lower(v),
+    "iStartsWith": lambda v, c: _lower(v).startswith(_lower(c["value"])),
+    "iEndsWith": lambda v, c: _lower(v).endswith(_lower(c["value"])),
+}
+
+
+def _evaluate_predicate(criterion: dict[str, Any], row: Row) -> Truth:
+    """Evaluate a criterion on a single column"""
+    name, operator = criterion["fieldName"], criterion["operator"]
+    if name not in row:
+        raise SlimsUnsupportedCriterion(f"No column {name} to evaluate locally")
+    value = row[name]
+    if operator == "isNull":
+        return value is None
+    if operator == "notNull":
+        return value is not None
+    if operator not in _PREDICATES:
+        raise SlimsUnsupportedCriterion(f"Cannot evaluate {operator} locally")
+    if value is None:
+        return None
+    if isinstance(value, (list, dict)):
+        raise SlimsUnsupportedCriterion(f"Cannot evaluate {name} locally")
+    try:
+        return _PREDICATES[operator](value, criterion)
+    except TypeError as e:
+        raise SlimsUnsupportedCriterion(
+            f"Cannot compare {name} with {criterion} locally"
+        ) from e
+
+
+def _evaluate(criterion: dict[str, Any], row: Row) -> Truth:
+    """Evaluate a criterion dictionary on a row, with SQL null semantics"""
+    if "criteria" not in criterion:
+        return _evaluate_predicate(criterion, row)
+    results = [_evaluate(c, row) for c in criterion["criteria"]]
+    operator = criterion["operator"]
+    if operator == "and":
+        if False in results:
+            return False
+        return None if None in results else True
+    if operator == "or":
+        if True in results:
+            return True
+        return None if None in results else False
+    if operator == "not":
+        result = results[0]
+        return None if result is None else not result
+    raise SlimsUnsupportedCriterion(f"Cannot evaluate {operator} locally")
+
+
+def evaluate(criterion: Criterion | dict[str, Any], row: Row) -> bool:
+    """Whether a row matches a criterion, as a SLIMS fetch would"""
+    if isinstance(criterion, Criterion):
+        criterion = criterion.to_dict()
+    return _evaluate(criterion, row) is True
+
+
+class LocalTable:
+    """Records held in memory, filtered, sorted and paged like a SLIMS fetch.
+
+    Hash indexes on the index columns answer equals and inSet criteria, and
+    sorted indexes answer range criteria, without scanning every row. The
+    rest of the criterion is evaluated on the candidate rows.
+    """
+
+    def __init__(
+        self, records: Sequence[SlimsBaseModel | dict], index: Iterable[str] = ()
+    ):
+        """Table of records
+
+        Args:
+            records (Sequence[SlimsBaseModel | dict]): models or json
+                entities, returned by filter
+            index (Iterable[str]): columns to index
+        """
+        self.records = list(records)
+        self.rows = [_row(record) for record in self.records]
+        self._hash: dict[str, dict[Any, list[int]]] = {}
+        self._sorted: dict[str, tuple[list[Any], list[int]]] = {}
+        for name in index:
+            self._build_index(name)
+
+    def _build_index(self, name: str):
+        """Hash and, if its values are comparable, sorted index of column"""
+        hashed: dict[Any, list[int]] = {}
+        present = []
+        for i, row in enumerate(self.rows):
+            value = row.get(name)
+            if value is None or isinstance(value, (list, dict)):
+                continue
+            hashed.setdefault(value, []).append(i)
+            present.append((value, i))
+        self._hash[name] = hashed
+        try:
+            present.sort()
+        except TypeError:
+            return
+        self._sorted[name] = ([v for v, _ in present], [i for _, i in present])
+
+    def _candidates(self, criterion: dict[str, Any]) -> Optional[set[int]]:
+        """Rows that may match criterion, from an index. None if no index
+        applies"""
+        if criterion.get("operator") == "and":
+            for member in criterion["criteria"]:
+                candidates = self._candidates(member)
+                if candidates is not None:
+                    return candidates
+            return None
+        name, operator = criterion.get("fieldName"), criterion.get("operator")
+        if name in self._hash and operator in ("equals", "inSet"):
+            hashed = self._hash[name]
+            if not hashed:
+                return set()
+            values = _operand(next(iter(hashed)), criterion.get("value"))
+            values = values if isinstance(values, list) else [values]
+            try:
+                return {i for v in values for i in hashed.get(v, ())}
+            except TypeError:
+                return None
+        if name in self._sorted and operator in (
+            "lessThan",
+            "lessOrEqual",
+            "greaterThan",
+            "greaterOrEqual",
+            "betweenInclusive",
+        ):
+            return self._range(name, operator, criterion)
+        return None
+
+    def _range(
+        self, name: str, operator: str, criterion: dict[str, Any]
+    ) -> Optional[set[int]]:
+        """Rows whose column is in the range of a criterion, from the sorted
+        index"""
+        values, rows = self._sorted[name]
+        if not values:
+            return set()
+        lo, hi = 0, len(values)
+        try:
+            if operator == "betweenInclusive":
+                lo = bisect_left(values, _operand(values[0], criterion["start"]))
+                hi = bisect_right(values, _operand(values[0], criterion["end"]))
+            else:
+                bound = _operand(values[0], criterion["value"])
+                if operator == "lessThan":
+                    hi = bisect_left(values, bound)
+                elif operator == "lessOrEqual":
+                    hi = bisect_right(values, bound)
+                elif operator == "greaterThan":
+                    lo = bisect_right(values, bound)
+                else:
+                    lo = bisect_left(values, bound)
+        except TypeError:
+            return None
+        return set(rows[lo:hi])
+
+    def filter(
+        self,
+        criterion: Criterion | dict[str, Any],
+        sort: Optional[str | list[str]] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> list[SlimsBaseModel | dict]:
+        """Records matching criterion, sorted and paged as SlimsClient.fetch
+        would. Rows with a missing sort value come last
+
+        Raises:
+            SlimsUnsupportedCriterion: if criterion or sort cannot be
+                evaluated locally
+        """
+        if isinstance(criterion, Criterion):
+            criterion = criterion.to_dict()
+        candidates = self._candidates(criterion)
+        indices = range(len(self.rows)) if candidates is None else sorted(candidates)
+        matched = [i for i in indices if _evaluate(criterion, self.rows[i]) is True]
+        for key in reversed([sort] if isinstance(sort, str) else sort or []):
+            name = key.lstrip("-")
+            if any(name not in self.rows[i] for i in matched):
+                raise SlimsUnsupportedCriterion(f"No column {name} to sort by")
+            present = [i for i in matched if self.rows[i][name] is not None]
+            missing = [i for i in matched if self.rows[i][name] is None]
+            try:
+                present.sort(
+                    key=lambda i: self.rows[i][name], reverse=key.startswith("-")
+                )
+            except TypeError as e:
+                raise SlimsUnsupportedCriterion(f"Cannot sort by {name}") from e
+            matched = present + missing
+        return [self.records[i] for i in matched[start:end]]
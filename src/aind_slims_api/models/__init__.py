@@ -1,19 +1,38 @@
 """Models for abstractions around Slims records. Friendlier names and
- documenation on how things relate to each other in our specific instance.
+documenation on how things relate to each other in our specific instance.
 """
 
+from typing import Type
+
 from aind_slims_api.models.attachment import SlimsAttachment
+from aind_slims_api.models.base import SlimsBaseModel
 from aind_slims_api.models.behavior_session import SlimsBehaviorSession
+from aind_slims_api.models.codec import decode_models, encode_models
 from aind_slims_api.models.instrument import SlimsInstrument
 from aind_slims_api.models.mouse import SlimsMouseContent
+from aind_slims_api.models.serialization import dump_many
 from aind_slims_api.models.unit import SlimsUnit
 from aind_slims_api.models.user import SlimsUser
 
+# Registry of models by name, e.g. for the command line exporter
+MODELS: dict[str, Type[SlimsBaseModel]] = {
+    "attachment": SlimsAttachment,
+    "behavior-session": SlimsBehaviorSession,
+    "instrument": SlimsInstrument,
+    "mouse": SlimsMouseContent,
+    "unit": SlimsUnit,
+    "user": SlimsUser,
+}
+
 __all__ = [
+    "MODELS",
     "SlimsAttachment",
     "SlimsBehaviorSession",
     "SlimsInstrument",
     "SlimsMouseContent",
     "SlimsUnit",
     "SlimsUser",
+    "decode_models",
+    "dump_many",
+    "encode_models",
 ]
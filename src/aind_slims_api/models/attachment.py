@@ -25,4 +25,9 @@ class SlimsAttachment(SlimsBaseModel):
 
     pk: int = Field(..., alias="attm_pk")
     name: str = Field(..., alias="attm_name")
+    hash: str | None = Field(
+        default=None,
+        alias="attm_hash",
+        description="MD5 hash of the contents, as a hex digest.",
+    )
     _slims_table = "Attachment"
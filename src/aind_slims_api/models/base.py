@@ -1,23 +1,53 @@
-"""Base model for SLIMS records abstraction.
-"""
+"""Base model for SLIMS records abstraction."""
 
 import logging
-from datetime import datetime
-from typing import ClassVar, Optional
+import threading
+from typing import Any, ClassVar, Optional
 
 from pydantic import BaseModel, ValidationInfo, field_serializer, field_validator
 from slims.internal import Column as SlimsColumn
 
-from aind_slims_api.models.utils import _find_unit_spec
+from aind_slims_api.models.expressions import ModelField
+from aind_slims_api.models.serialization import serialization_plan, serialize_value
 from aind_slims_api.types import SLIMS_TABLES
 
 logger = logging.getLogger(__name__)
 
 
+class _SlimsModelMetaclass(type(BaseModel)):
+    """Resolves fields accessed on a model class, e.g. SlimsMouseContent.barcode,
+    to a ModelField for building criteria"""
+
+    # pydantic inspects base classes while a model is created, fields must not
+    # resolve then or they would be mistaken for attributes of the base class
+    _creating = threading.local()
+
+    def __new__(mcs, *args, **kwargs):
+        """Create a model class"""
+        mcs._creating.depth = getattr(mcs._creating, "depth", 0) + 1
+        try:
+            return super().__new__(mcs, *args, **kwargs)
+        finally:
+            mcs._creating.depth -= 1
+
+    def __getattr__(cls, item: str):
+        """Aliased fields of a created model resolve to a ModelField"""
+        fields = cls.__dict__.get("__pydantic_fields__")
+        if (
+            fields
+            and item in fields
+            and fields[item].alias
+            and not getattr(cls._creating, "depth", 0)
+        ):
+            return ModelField(cls, item)
+        return super().__getattr__(item)
+
+
 class SlimsBaseModel(
     BaseModel,
     from_attributes=True,
     validate_assignment=True,
+    metaclass=_SlimsModelMetaclass,
 ):
     """Pydantic model to represent a SLIMS record.
     Subclass with fields matching those in the SLIMS record.
@@ -30,6 +60,11 @@ class SlimsBaseModel(
         Quantities will be serialized using the first unit passed
 
     Datetime fields will be serialized to an integer ms timestamp
+
+    Fields accessed on the class build criteria for fetches, see
+    aind_slims_api.models.expressions:
+
+        client.fetch_models(MyModel, MyModel.myfield > 10)
     """
 
     pk: Optional[int] = None
@@ -37,43 +72,54 @@ class SlimsBaseModel(
     _slims_table: ClassVar[SLIMS_TABLES]
     # base filters for model fetch
     _base_fetch_filters: ClassVar[dict[str, str]] = {}
+    # fields identifying a record, for SlimsClient.upsert_models
+    _natural_key: ClassVar[tuple[str, ...]] = ()
 
     @field_validator("*", mode="before")
     def _validate(cls, value, info: ValidationInfo):
         """Validates a field, accounts for Quantities"""
         if isinstance(value, SlimsColumn):
             if value.datatype == "QUANTITY":
-                unit_spec = _find_unit_spec(cls.model_fields[info.field_name])
-                if unit_spec is None:
-                    msg = (
-                        f'Quantity field "{info.field_name}"'
-                        "must be annotated with a UnitSpec"
-                    )
-                    raise TypeError(msg)
-                if value.unit not in unit_spec.units:
-                    msg = (
-                        f'Unexpected unit "{value.unit}" for field '
-                        f"{info.field_name}, Expected {unit_spec.units}"
-                    )
-                    raise ValueError(msg)
+                cls._check_unit(info.field_name, value.unit)
             return value.value
-        else:
-            return value
+        units = info.context and info.context.get("units")
+        if units:
+            name = cls.model_fields[info.field_name].alias or info.field_name
+            if name in units:
+                cls._check_unit(info.field_name, units[name])
+        return value
+
+    @classmethod
+    def _check_unit(cls, field_name: str, unit: Optional[str]):
+        """Checks the unit of a Quantity is one of its field's UnitSpec"""
+        unit_spec = serialization_plan(cls).unit_specs[field_name]
+        if unit_spec is None:
+            msg = f'Quantity field "{field_name}"' "must be annotated with a UnitSpec"
+            raise TypeError(msg)
+        if unit not in unit_spec.units:
+            msg = (
+                f'Unexpected unit "{unit}" for field '
+                f"{field_name}, Expected {unit_spec.units}"
+            )
+            raise ValueError(msg)
+
+    @classmethod
+    def from_json_entity(cls, json_entity: dict[str, Any]) -> "SlimsBaseModel":
+        """Validate a record from its json entity, as returned by the SLIMS
+        rest api, without building slims Record and Column objects"""
+        values: dict[str, Any] = {"json_entity": json_entity}
+        units = {}
+        for column in json_entity["columns"]:
+            values[column["name"]] = column["value"]
+            if column["datatype"] == "QUANTITY":
+                units[column["name"]] = column.get("unit")
+        return cls.model_validate(values, context={"units": units})
 
     @field_serializer("*")
     def _serialize(self, field, info):
         """Serialize a field, accounts for Quantities and datetime"""
-        unit_spec = _find_unit_spec(self.model_fields[info.field_name])
-        if unit_spec and field is not None:
-            quantity = {
-                "amount": field,
-                "unit_display": unit_spec.preferred_unit,
-            }
-            return quantity
-        elif isinstance(field, datetime):
-            return int(field.timestamp() * 10**3)
-        else:
-            return field
+        unit_spec = serialization_plan(type(self)).unit_specs.get(info.field_name)
+        return serialize_value(field, unit_spec)
 
     # TODO: Add links - need Record.json_entity['links']['self']
     # TODO: Add Table - need Record.json_entity['tableName']
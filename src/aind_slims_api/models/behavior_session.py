@@ -1,14 +1,18 @@
 """Contains a model for the behavior session content events, a method for
- fetching it and writing it.
+fetching it and writing it.
 """
 
 import logging
 from datetime import datetime
-from typing import ClassVar
+from typing import Annotated, ClassVar
 
 from pydantic import Field
 
 from aind_slims_api.models.base import SlimsBaseModel
+from aind_slims_api.models.instrument import SlimsInstrument
+from aind_slims_api.models.mouse import SlimsMouseContent
+from aind_slims_api.models.user import SlimsUser
+from aind_slims_api.models.utils import ForeignKey
 
 logger = logging.getLogger()
 
@@ -27,7 +31,7 @@ class SlimsBehaviorSession(SlimsBaseModel):
     """
 
     pk: int | None = Field(default=None, alias="cnvn_pk")
-    mouse_pk: int | None = Field(
+    mouse_pk: Annotated[int | None, ForeignKey(SlimsMouseContent)] = Field(
         default=None,
         alias="cnvn_fk_content",
         description=(
@@ -36,8 +40,12 @@ class SlimsBehaviorSession(SlimsBaseModel):
     )  # used as reference to mouse
     notes: str | None = Field(default=None, alias="cnvn_cf_notes")
     task_stage: str | None = Field(default=None, alias="cnvn_cf_taskStage")
-    instrument: int | None = Field(default=None, alias="cnvn_cf_fk_instrument")
-    trainers: list[int] = Field(default=[], alias="cnvn_cf_fk_trainer")
+    instrument: Annotated[int | None, ForeignKey(SlimsInstrument)] = Field(
+        default=None, alias="cnvn_cf_fk_instrument"
+    )
+    trainers: Annotated[list[int], ForeignKey(SlimsUser)] = Field(
+        default=[], alias="cnvn_cf_fk_trainer"
+    )
     task: str | None = Field(default=None, alias="cnvn_cf_task")
     is_curriculum_suggestion: bool | None = Field(
         default=None, alias="cnvn_cf_stageIsOnCurriculum"
@@ -52,3 +60,4 @@ class SlimsBehaviorSession(SlimsBaseModel):
     _base_fetch_filters: ClassVar[dict[str, str]] = {
         "cnvt_name": "Behavior Session",
     }
+    _natural_key: ClassVar[tuple[str, ...]] = ("mouse_pk", "date", "task")
@@ -0,0 +1,151 @@
+"""Compact binary encoding of lists of SlimsBaseModels, for caches and
+passing models between processes.
+
+encode_models - encodes models of one type as msgpack, one row of field
+    values per model, under a fingerprint of the model's schema
+decode_models - decodes them, without validation if the fingerprint matches
+    the model decoded to
+
+Requires msgpack, install with `pip install aind-slims-api[msgpack]`.
+
+Examples
+--------
+>>> from aind_slims_api.models import SlimsMouseContent
+>>> from aind_slims_api.models.codec import decode_models, encode_models
+>>> data = encode_models(mice)  # without json_entity
+>>> decode_models(data, SlimsMouseContent)[0].barcode == mice[0].barcode
+True
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Iterable, Sequence, Type, TypeVar
+
+from aind_slims_api.models.serialization import serialization_plan
+
+FORMAT = "aind-slims-models"
+VERSION = 1
+# msgpack extension type of datetimes, stored in ISO 8601 format
+_DATETIME_EXT = 1
+# fields encode_models leaves out by default: the raw json entity holds every
+# column and its metadata, and is many times larger than the fields
+DEFAULT_EXCLUDE = frozenset({"json_entity"})
+
+ModelTypeVar = TypeVar("ModelTypeVar")
+
+
+def _msgpack():
+    """The msgpack module, with a hint on how to install it if missing"""
+    try:
+        import msgpack
+    except ImportError as e:
+        raise ImportError(
+            "The model codec requires msgpack, "
+            "install with `pip install aind-slims-api[msgpack]`"
+        ) from e
+    return msgpack
+
+
+@lru_cache(maxsize=None)
+def schema_fingerprint(model: type) -> str:
+    """Hash of the names, aliases, types and units of a model's fields.
+    Models encoded with the same fingerprint decode without validation"""
+    unit_specs = serialization_plan(model).unit_specs
+    schema = [
+        [
+            name,
+            field.alias,
+            str(field.annotation),
+            list(unit_specs[name].units) if unit_specs[name] else None,
+        ]
+        for name, field in model.model_fields.items()
+    ]
+    return hashlib.sha256(
+        json.dumps([model.__qualname__, schema]).encode()
+    ).hexdigest()[:16]
+
+
+def _default(value: Any) -> Any:
+    """Encode values msgpack does not support"""
+    if isinstance(value, datetime):
+        return _msgpack().ExtType(_DATETIME_EXT, value.isoformat().encode())
+    raise TypeError(f"Cannot encode {type(value)}")
+
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    """Decode values encoded by _default"""
+    if code == _DATETIME_EXT:
+        return datetime.fromisoformat(data.decode())
+    return _msgpack().ExtType(code, data)
+
+
+def encode_models(
+    models: Sequence[Any], exclude: Iterable[str] = DEFAULT_EXCLUDE
+) -> bytes:
+    """Encode models of a single type
+
+    Args:
+        models (Sequence[SlimsBaseModel]): models to encode
+        exclude (Iterable[str]): fields left out, which decode to their
+            default. By default json_entity, pass exclude=() to include it
+
+    Returns:
+        bytes: msgpack encoded models
+    """
+    msgpack = _msgpack()
+    model_types = {type(model) for model in models}
+    if len(model_types) > 1:
+        raise TypeError("encode_models requires models of a single type")
+    model_type = model_types.pop() if model_types else None
+    exclude = frozenset(exclude)
+    fields = (
+        [name for name in model_type.model_fields if name not in exclude]
+        if model_type is not None
+        else []
+    )
+    return msgpack.packb(
+        {
+            "format": FORMAT,
+            "version": VERSION,
+            "model": model_type.__qualname__ if model_type else None,
+            "fingerprint": schema_fingerprint(model_type) if model_type else None,
+            "fields": fields,
+            "rows": [[getattr(model, name) for name in fields] for model in models],
+        },
+        default=_default,
+    )
+
+
+def decode_models(data: bytes, model: Type[ModelTypeVar]) -> list[ModelTypeVar]:
+    """Decode models encoded by encode_models.
+
+    If they were encoded with the schema fingerprint of model, they are
+    constructed without validation. Otherwise, e.g. if the model changed
+    since, the fields model still has are validated.
+
+    Args:
+        data (bytes): encoded models
+        model (Type[SlimsBaseModel]): type of the models
+
+    Returns:
+        list[SlimsBaseModel]: decoded models
+    """
+    decoded = _msgpack().unpackb(data, ext_hook=_ext_hook)
+    if not isinstance(decoded, dict) or decoded.get("format") != FORMAT:
+        raise ValueError("Not models encoded by encode_models")
+    if decoded["version"] != VERSION:
+        raise ValueError(f"Unsupported encoding version {decoded['version']}")
+    if decoded["model"] not in (None, model.__qualname__):
+        raise ValueError(f"Encoded {decoded['model']} models, not {model}")
+    fields, rows = decoded["fields"], decoded["rows"]
+    if decoded["fingerprint"] == schema_fingerprint(model):
+        return [model.model_construct(**dict(zip(fields, row))) for row in rows]
+    model_fields = model.model_fields
+    keys = [
+        (i, model_fields[name].alias or name)
+        for i, name in enumerate(fields)
+        if name in model_fields
+    ]
+    return [model.model_validate({key: row[i] for i, key in keys}) for row in rows]
@@ -0,0 +1,238 @@
+"""Field expressions, to filter fetches with operators on model fields.
+
+Accessing a field on a SlimsBaseModel subclass, rather than on an instance,
+returns a ModelField. Comparing it, or calling one of its methods, builds a
+FieldExpression that compiles to slims.criteria using the field's alias.
+Expressions are Criterion objects, so they can be passed anywhere criteria
+are accepted, e.g. SlimsClient.fetch_models, and are evaluated by SLIMS.
+
+Examples
+--------
+>>> from datetime import datetime
+>>> from aind_slims_api.models import SlimsBehaviorSession, SlimsMouseContent
+>>> recent = SlimsBehaviorSession.date >= datetime(2024, 6, 1)
+>>> stages = SlimsBehaviorSession.task_stage.in_(["STAGE_1", "STAGE_2"])
+>>> sessions = client.fetch_models(SlimsBehaviorSession, recent & stages)
+>>> mice = client.fetch_models(
+...     SlimsMouseContent,
+...     SlimsMouseContent.barcode.in_(["000001", "000002"])
+...     | SlimsMouseContent.barcode.startswith("1234"),
+... )
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+from slims.criteria import Criterion, Expression, conjunction, disjunction, is_not
+
+
+def _criterion_value(value: Any) -> Any:
+    """Convert a value to its representation in a criterion. Datetimes are
+    sent in ISO 8601 format, as slims.criteria does for single values"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [_criterion_value(v) for v in value]
+    return value
+
+
+class FieldExpression(Criterion, ABC):
+    """A criterion built from model fields. Combine with & (and), | (or) and
+    ~ (not). Compiled to slims.criteria once, on first use"""
+
+    models: frozenset[type]
+    _compiled: Optional[Criterion] = None
+
+    def compile(self) -> Criterion:
+        """The equivalent slims.criteria tree"""
+        if self._compiled is None:
+            self._compiled = self._compile()
+        return self._compiled
+
+    @abstractmethod
+    def _compile(self) -> Criterion:
+        """Build the equivalent slims.criteria tree"""
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serializes criterion to dictionary"""
+        return self.compile().to_dict()
+
+    def applies_to(self, model: type) -> bool:
+        """Whether every field of this expression is a field of model"""
+        return all(issubclass(model, m) for m in self.models)
+
+    def __and__(self, other: "FieldExpression") -> "FieldExpression":
+        """Both expressions must match"""
+        return Combination("and", self, other)
+
+    def __or__(self, other: "FieldExpression") -> "FieldExpression":
+        """Either expression must match"""
+        return Combination("or", self, other)
+
+    def __invert__(self) -> "FieldExpression":
+        """The expression must not match"""
+        return Combination("not", self)
+
+    def __bool__(self) -> bool:
+        """Expressions have no truth value, so that mistakes such as
+        "field in [1, 2]" or "a and b" raise rather than match everything"""
+        raise TypeError(
+            "Field expressions have no truth value: use & | ~ instead of "
+            "and, or, not, and field.in_(values) instead of in"
+        )
+
+
+class Predicate(FieldExpression):
+    """A single constraint on a model field"""
+
+    def __init__(self, field: "ModelField", criterion: dict[str, Any]):
+        """Constrain field with a slims criterion dictionary"""
+        self.field = field
+        self.criterion = criterion
+        self.models = frozenset([field.model])
+
+    def _compile(self) -> Criterion:
+        """Build the equivalent slims.criteria expression"""
+        return Expression(self.criterion)
+
+    def __repr__(self) -> str:
+        """Representation including the field and criterion"""
+        return f"Predicate({self.field!r}, {self.criterion!r})"
+
+
+class Combination(FieldExpression):
+    """Expressions joined by "and" or "or", or negated with "not" """
+
+    def __init__(self, operator: str, *members: FieldExpression):
+        """Join members with operator, flattening nested joins of the same
+        operator"""
+        self.operator = operator
+        self.members: list[FieldExpression] = []
+        for member in members:
+            if not isinstance(member, FieldExpression):
+                raise TypeError(
+                    f"Cannot combine a field expression with {type(member).__name__}"
+                )
+            if (
+                operator != "not"
+                and isinstance(member, Combination)
+                and member.operator == operator
+            ):
+                self.members.extend(member.members)
+            else:
+                self.members.append(member)
+        self.models = frozenset().union(*(m.models for m in self.members))
+
+    def _compile(self) -> Criterion:
+        """Build the equivalent slims.criteria junction"""
+        if self.operator == "not":
+            return is_not(self.members[0].compile())
+        junction = conjunction() if self.operator == "and" else disjunction()
+        for member in self.members:
+            junction.add(member.compile())
+        return junction
+
+    def __repr__(self) -> str:
+        """Representation including the operator and members"""
+        return f"Combination({self.operator!r}, {self.members!r})"
+
+
+class ModelField:
+    """A field of a SlimsBaseModel subclass, used to build FieldExpressions.
+    Obtained by accessing the field on the model class, e.g.
+    SlimsMouseContent.barcode"""
+
+    __hash__ = None  # comparison operators build expressions
+
+    def __init__(self, model: type, name: str):
+        """Field name of model, which must have a SLIMS alias"""
+        alias = model.model_fields[name].alias
+        if alias is None:
+            raise ValueError(f"Cannot resolve alias for {name} on {model}")
+        self.model = model
+        self.name = name
+        self.alias = alias
+
+    def __repr__(self) -> str:
+        """Representation as model.field"""
+        return f"{self.model.__name__}.{self.name}"
+
+    def _predicate(self, operator: str, value: Any = None) -> Predicate:
+        """Build a predicate on this field"""
+        criterion = {"fieldName": self.alias, "operator": operator}
+        if value is not None:
+            criterion["value"] = _criterion_value(value)
+        return Predicate(self, criterion)
+
+    def __eq__(self, value: Any) -> Predicate:  # type: ignore[override]
+        """Field equals value, or is null if value is None"""
+        if value is None:
+            return self.is_null()
+        return self._predicate("equals", value)
+
+    def __ne__(self, value: Any) -> Predicate:  # type: ignore[override]
+        """Field does not equal value, or is not null if value is None"""
+        if value is None:
+            return self.is_not_null()
+        return self._predicate("iNotEqual", value)
+
+    def __lt__(self, value: Any) -> Predicate:
+        """Field is less than value"""
+        return self._predicate("lessThan", value)
+
+    def __le__(self, value: Any) -> Predicate:
+        """Field is less than or equal to value"""
+        return self._predicate("lessOrEqual", value)
+
+    def __gt__(self, value: Any) -> Predicate:
+        """Field is greater than value"""
+        return self._predicate("greaterThan", value)
+
+    def __ge__(self, value: Any) -> Predicate:
+        """Field is greater than or equal to value"""
+        return self._predicate("greaterOrEqual", value)
+
+    def in_(self, values: Iterable[Any]) -> Predicate:
+        """Field is one of values"""
+        return self._predicate("inSet", list(values))
+
+    def not_in(self, values: Iterable[Any]) -> Predicate:
+        """Field is none of values"""
+        return self._predicate("notInSet", list(values))
+
+    def between(self, start: Any, end: Any) -> Predicate:
+        """Field is between start and end, inclusive"""
+        return Predicate(
+            self,
+            {
+                "fieldName": self.alias,
+                "operator": "betweenInclusive",
+                "start": _criterion_value(start),
+                "end": _criterion_value(end),
+            },
+        )
+
+    def contains(self, value: str) -> Predicate:
+        """Field contains value, ignoring case"""
+        return self._predicate("iContains", value)
+
+    def startswith(self, value: str) -> Predicate:
+        """Field starts with value, ignoring case"""
+        return self._predicate("iStartsWith", value)
+
+    def endswith(self, value: str) -> Predicate:
+        """Field ends with value, ignoring case"""
+        return self._predicate("iEndsWith", value)
+
+    def iequals(self, value: str) -> Predicate:
+        """Field equals value, ignoring case"""
+        return self._predicate("iEquals", value)
+
+    def is_null(self) -> Predicate:
+        """Field has no value"""
+        return self._predicate("isNull")
+
+    def is_not_null(self) -> Predicate:
+        """Field has a value"""
+        return self._predicate("notNull")
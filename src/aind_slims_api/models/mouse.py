@@ -36,6 +36,7 @@ class SlimsMouseContent(SlimsBaseModel):
     _base_fetch_filters: ClassVar[dict[str, str]] = {
         "cntp_name": "Mouse",
     }
+    _natural_key: ClassVar[tuple[str, ...]] = ("barcode",)
 
     # TODO: Include other helpful fields (genotype, gender...)
 
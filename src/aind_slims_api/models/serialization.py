@@ -0,0 +1,95 @@
+"""Serialization of SlimsBaseModels to SLIMS payloads.
+
+SerializationPlan - how each field of a model is serialized, compiled once
+    per model: SLIMS column name, quantity unit, datetime conversion and the
+    models foreign key fields reference
+serialization_plan - the cached plan of a model
+dump_many - serializes models to SLIMS payloads, or json, in one pass
+"""
+
+import json
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Iterable, Optional
+
+from aind_slims_api.models.utils import (
+    UnitSpec,
+    _find_foreign_key,
+    _find_unit_spec,
+)
+
+# fields SlimsClient.add_model does not send to SLIMS
+ADD_EXCLUDE = frozenset({"pk", "attachments", "slims_api"})
+
+
+def serialize_value(value: Any, unit_spec: Optional[UnitSpec]) -> Any:
+    """Serialize a field value: quantities are wrapped with their preferred
+    unit, datetimes converted to an integer ms timestamp"""
+    if unit_spec is not None and value is not None:
+        return {"amount": value, "unit_display": unit_spec.preferred_unit}
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 10**3)
+    return value
+
+
+class SerializationPlan:
+    """How each field of a model is serialized to a SLIMS payload"""
+
+    def __init__(self, model: type):
+        """Compile the plan of a SlimsBaseModel subclass"""
+        self.unit_specs: dict[str, Optional[UnitSpec]] = {}
+        self.fields: list[tuple[str, str, Optional[UnitSpec]]] = []
+        # models referenced by ForeignKey fields, by field name
+        self.foreign_keys: dict[str, type] = {}
+        for name, field_info in model.model_fields.items():
+            unit_spec = _find_unit_spec(field_info)
+            self.unit_specs[name] = unit_spec
+            self.fields.append((name, field_info.alias or name, unit_spec))
+            foreign_key = _find_foreign_key(field_info)
+            if foreign_key is not None:
+                self.foreign_keys[name] = foreign_key.model
+
+    def dump(
+        self,
+        model: Any,
+        include: Optional[Iterable[str]] = None,
+        exclude: Iterable[str] = (),
+    ) -> dict[str, Any]:
+        """Serialize model by alias, like model.model_dump(by_alias=True)
+        for models whose fields are plain values"""
+        include = None if include is None else frozenset(include)
+        exclude = frozenset(exclude)
+        return {
+            key: serialize_value(getattr(model, name), unit_spec)
+            for name, key, unit_spec in self.fields
+            if name not in exclude and (include is None or name in include)
+        }
+
+
+@lru_cache(maxsize=None)
+def serialization_plan(model: type) -> SerializationPlan:
+    """The plan of a SlimsBaseModel subclass, compiled on first use"""
+    return SerializationPlan(model)
+
+
+def dump_many(
+    models: Iterable[Any],
+    exclude: Iterable[str] = ADD_EXCLUDE,
+    as_json: bool = False,
+) -> list[dict[str, Any]] | bytes:
+    """Serialize models to SLIMS payloads, as sent by SlimsClient.add_model
+
+    Args:
+        models (Iterable[SlimsBaseModel]): models to serialize
+        exclude (Iterable[str]): fields left out, by default those add_model
+            leaves out
+        as_json (bool): return a json array of the payloads, as bytes
+
+    Returns:
+        list[dict] | bytes: payloads, or their json
+    """
+    exclude = frozenset(exclude)
+    payloads = [serialization_plan(type(m)).dump(m, exclude=exclude) for m in models]
+    if as_json:
+        return json.dumps(payloads, separators=(",", ":")).encode()
+    return payloads
@@ -1,6 +1,6 @@
 """Contains a model for a user."""
 
-from typing import Optional
+from typing import ClassVar, Optional
 
 from pydantic import Field
 
@@ -26,3 +26,4 @@ class SlimsUser(SlimsBaseModel):
     pk: int = Field(..., alias="user_pk")
 
     _slims_table = "User"
+    _natural_key: ClassVar[tuple[str, ...]] = ("username",)
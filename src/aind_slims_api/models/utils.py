@@ -1,5 +1,4 @@
-"""Utility functions and classes for working with slims models.
-"""
+"""Utility functions and classes for working with slims models."""
 
 from typing import Optional
 
@@ -21,6 +20,15 @@ class UnitSpec:
             self.preferred_unit = self.units[0]
 
 
+class ForeignKey:
+    """Used in type annotation metadata to mark a field holding pks of
+    records of another model"""
+
+    def __init__(self, model: type):
+        """Set the SlimsBaseModel subclass whose pks the field holds"""
+        self.model = model
+
+
 def _find_unit_spec(field: FieldInfo) -> UnitSpec | None:
     """Given a Pydantic FieldInfo, find the UnitSpec in its metadata"""
     metadata = field.metadata
@@ -28,3 +36,11 @@ def _find_unit_spec(field: FieldInfo) -> UnitSpec | None:
         if isinstance(m, UnitSpec):
             return m
     return None
+
+
+def _find_foreign_key(field: FieldInfo) -> ForeignKey | None:
+    """Given a Pydantic FieldInfo, find the ForeignKey in its metadata"""
+    for m in field.metadata:
+        if isinstance(m, ForeignKey):
+            return m
+    return None
@@ -0,0 +1,223 @@
+"""Lazy, chainable queries of SLIMS models.
+
+QuerySet - a fetch that is built up with filter, order_by and slicing, and
+    only runs once its results are needed. Returned by SlimsClient.query
+
+Slices map to the start and end rows of the fetch, count() to
+SlimsClient.count_models, and iteration streams the results one page at a
+time. Results are cached on the QuerySet once fully iterated, e.g. by all(),
+list() or len(), so iterating, indexing or counting it again makes no
+further requests. Every filter, order_by or slice returns a new QuerySet,
+with an empty cache.
+
+Records that fail validation are skipped, and logged, as by
+SlimsClient.fetch_models. Slices and indexes count rows in SLIMS, including
+any that fail validation, so query[i] is the first valid result from row i.
+Once results are cached, they count the cached results instead, which only
+differs if some records failed validation.
+
+Examples
+--------
+>>> from aind_slims_api import SlimsClient
+>>> from aind_slims_api.models import SlimsBehaviorSession
+>>> client = SlimsClient()
+>>> sessions = client.query(SlimsBehaviorSession).filter(mouse_pk=mouse.pk)
+>>> latest = sessions.order_by("-date")[:5]  # no request yet
+>>> [session.task_stage for session in latest]  # one request, of 5 rows
+"""
+
+from typing import TYPE_CHECKING, Any, Generic, Iterator, Optional, Type, TypeVar
+
+from aind_slims_api.models.base import SlimsBaseModel
+from aind_slims_api.models.expressions import ModelField
+from aind_slims_api.validation import ValidationReport
+
+if TYPE_CHECKING:
+    from aind_slims_api.core import SlimsClient
+
+ModelTypeVar = TypeVar("ModelTypeVar", bound=SlimsBaseModel)
+
+
+class QuerySet(Generic[ModelTypeVar]):
+    """Records of a model matching criteria, fetched when first needed"""
+
+    def __init__(
+        self,
+        client: "SlimsClient",
+        model: Type[ModelTypeVar],
+        page_size: int = 100,
+    ):
+        """Query of every record of model
+
+        Args:
+            client (SlimsClient): client the query is run with
+            model (Type[SlimsBaseModel]): model to fetch
+            page_size (int): number of rows requested per page when
+                iterating
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be positive")
+        self.client = client
+        self.model = model
+        self.page_size = page_size
+        self._criteria: tuple = ()
+        self._sort: Optional[list[str]] = None
+        self._start = 0
+        self._end: Optional[int] = None
+        self._cache: Optional[list[ModelTypeVar]] = None
+
+    def _clone(self, **changes: Any) -> "QuerySet[ModelTypeVar]":
+        """Copy of the query, with changed attributes and no cached
+        results"""
+        clone = QuerySet(self.client, self.model, self.page_size)
+        clone._criteria = self._criteria
+        clone._sort = self._sort
+        clone._start = self._start
+        clone._end = self._end
+        for name, value in changes.items():
+            setattr(clone, name, value)
+        return clone
+
+    def filter(self, *args, **kwargs) -> "QuerySet[ModelTypeVar]":
+        """Query of the records that also match criteria, e.g. field
+        expressions, and "field=value" filters"""
+        if self._start or self._end is not None:
+            raise TypeError("Cannot filter a query once it is sliced")
+        criteria = list(args)
+        for name, value in kwargs.items():
+            if name not in self.model.model_fields:
+                raise ValueError(f"Cannot resolve alias for {name} on {self.model}")
+            criteria.append(ModelField(self.model, name) == value)
+        return self._clone(_criteria=self._criteria + tuple(criteria))
+
+    def order_by(self, *fields: str) -> "QuerySet[ModelTypeVar]":
+        """Query sorted by fields, replacing any previous order. Prefix a
+        field with "-" for descending order"""
+        if self._start or self._end is not None:
+            raise TypeError("Cannot order a query once it is sliced")
+        return self._clone(_sort=list(fields) or None)
+
+    def _sort_or_pk(self) -> Optional[list[str]]:
+        """Sort of the query, by pk if not given so that pages are stable"""
+        if self._sort is None and self.model.model_fields["pk"].alias:
+            return ["pk"]
+        return self._sort
+
+    def _fetch(self, start: int, end: int) -> tuple[list[ModelTypeVar], int]:
+        """Fetch the rows of the query from start to end, relative to the
+        start of the query. Returns the validated models, and the number of
+        rows fetched, including those that failed validation"""
+        end = end if self._end is None else min(end, self._end - self._start)
+        if end <= start:
+            return [], 0
+        report = ValidationReport(self.model)
+        models = self.client.fetch_models(
+            self.model,
+            *self._criteria,
+            sort=self._sort_or_pk(),
+            start=self._start + start,
+            end=self._start + end,
+            report=report,
+        )
+        return models, len(models) + report.failed
+
+    def __iter__(self) -> Iterator[ModelTypeVar]:
+        """Stream the results one page at a time, caching them once every
+        page is fetched"""
+        if self._cache is not None:
+            yield from self._cache
+            return
+        results: list[ModelTypeVar] = []
+        start = 0
+        while True:
+            page, rows = self._fetch(start, start + self.page_size)
+            results.extend(page)
+            yield from page
+            if rows < self.page_size:
+                break
+            start += self.page_size
+        self._cache = results
+
+    def all(self) -> list[ModelTypeVar]:
+        """Every result, fetched and cached if not already"""
+        # iterated directly, as list(self) would call __len__
+        return list(iter(self))
+
+    def first(self) -> Optional[ModelTypeVar]:
+        """The first result, or None if there is none. Requests one row, and
+        then twice as many rows each time only rows that fail validation are
+        fetched, up to page_size"""
+        if self._cache is not None:
+            return self._cache[0] if self._cache else None
+        start, size = 0, 1
+        while True:
+            page, rows = self._fetch(start, start + size)
+            if page:
+                return page[0]
+            if rows < size:
+                return None
+            start += size
+            size = min(size * 2, self.page_size)
+
+    def count(self) -> int:
+        """Number of results, counted by SLIMS unless they are cached, see
+        SlimsClient.count_models"""
+        if self._cache is not None:
+            return len(self._cache)
+        total = self.client.count_models(self.model, *self._criteria)
+        if self._end is not None:
+            total = min(total, self._end)
+        return max(total - self._start, 0)
+
+    def __len__(self) -> int:
+        """Number of results, fetching and caching every result, so that
+        list() of a query does not first count it. count counts without
+        fetching"""
+        return len(self.all())
+
+    def __bool__(self) -> bool:
+        """Whether any rows match, see SlimsClient.exists. Requests at most
+        one row, which is not validated, unless results are cached"""
+        if self._cache is not None:
+            return bool(self._cache)
+        if self._end is not None and self._end <= self._start:
+            return False
+        if not self._start:
+            return self.client.exists(self.model, *self._criteria)
+        _, kwargs = self.client._resolve_fetch_args(
+            self.model, self._criteria, None, {}
+        )
+        return self.client._row_exists(self.model, self._criteria, kwargs, self._start)
+
+    def __getitem__(self, key: int | slice):
+        """The first result from row index, see first, or a query of a slice
+        of the results, mapped to the start and end rows of the fetch"""
+        if isinstance(key, slice):
+            if key.step not in (None, 1):
+                raise ValueError("Slices of a query cannot have a step")
+            if (key.start or 0) < 0 or (key.stop is not None and key.stop < 0):
+                raise ValueError("Negative indexes are not supported")
+            start = self._start + (key.start or 0)
+            end = None if key.stop is None else self._start + key.stop
+            if self._end is not None:
+                start = min(start, self._end)
+                end = self._end if end is None else min(end, self._end)
+            clone = self._clone(_start=start, _end=end)
+            if self._cache is not None:
+                clone._cache = self._cache[key]
+            return clone
+        if key < 0:
+            raise ValueError("Negative indexes are not supported")
+        if self._cache is not None:
+            return self._cache[key]
+        result = self[key:].first()
+        if result is None:
+            raise IndexError("Query index out of range")
+        return result
+
+    def __repr__(self) -> str:
+        """Representation with the model and query"""
+        return (
+            f"<QuerySet {self.model.__name__} criteria={list(self._criteria)!r} "
+            f"sort={self._sort!r} start={self._start} end={self._end}>"
+        )
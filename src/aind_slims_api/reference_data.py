@@ -0,0 +1,222 @@
+"""Local copies of small, rarely changing SLIMS tables.
+
+ReferenceDataRegistry - loads every record of reference tables, e.g.
+    instruments, users and units, indexes them by key fields, and refreshes
+    them in the background once they are older than a TTL
+
+Enable with SlimsClient(preload_reference_data=True): fetch_models and
+fetch_model calls on registered models are then answered from the registry,
+see aind_slims_api.local_criteria, when its answer is complete: the criteria
+require a key field to equal a value, or one of a set of values, and a
+loaded record has each of them. Any other fetch, e.g. by a range, or of a
+record created since the registry was loaded, goes to SLIMS.
+
+Examples
+--------
+>>> from aind_slims_api import SlimsClient
+>>> client = SlimsClient(preload_reference_data=True)
+>>> client.fetch_model(SlimsUser, username="LKim")  # no request
+"""
+
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional, Type
+
+from slims.criteria import Criterion, conjunction
+
+from aind_slims_api.exceptions import SlimsUnsupportedCriterion
+from aind_slims_api.local_criteria import LocalTable
+from aind_slims_api.models.base import SlimsBaseModel
+from aind_slims_api.models.expressions import ModelField
+from aind_slims_api.models.instrument import SlimsInstrument
+from aind_slims_api.models.unit import SlimsUnit
+from aind_slims_api.models.user import SlimsUser
+
+if TYPE_CHECKING:
+    from aind_slims_api.core import SlimsClient
+
+logger = logging.getLogger(__name__)
+
+# fields reference tables are indexed by, by default
+REFERENCE_KEYS: dict[Type[SlimsBaseModel], tuple[str, ...]] = {
+    SlimsInstrument: ("pk", "name"),
+    SlimsUnit: ("pk", "name"),
+    SlimsUser: ("pk", "username"),
+}
+
+
+class _ReferenceTable:
+    """Every record of a model, indexed by the columns of key fields"""
+
+    def __init__(
+        self,
+        model: Type[SlimsBaseModel],
+        records: list[SlimsBaseModel],
+        keys: Iterable[str],
+        loaded_at: float,
+    ):
+        """Index records by keys"""
+        self.loaded_at = loaded_at
+        # field names of keys, by column name
+        self.keys = {model.model_fields[key].alias or key: key for key in keys}
+        self.table = LocalTable(records, index=list(self.keys))
+
+    def complete(
+        self, criterion: Criterion | dict[str, Any], records: list[SlimsBaseModel]
+    ) -> bool:
+        """Whether records, matching criterion, are every record SLIMS would
+        return: criterion requires a key to equal a value, or to be in a set
+        of values, and records have each value"""
+        if isinstance(criterion, Criterion):
+            criterion = criterion.to_dict()
+        members = [criterion]
+        while members:
+            member = members.pop()
+            if member.get("operator") == "and":
+                members.extend(member["criteria"])
+                continue
+            field = self.keys.get(member.get("fieldName"))
+            if field is None:
+                continue
+            if member["operator"] == "equals":
+                values = [member["value"]]
+            elif member["operator"] == "inSet":
+                values = member["value"]
+            else:
+                continue
+            found = [getattr(record, field) for record in records]
+            if all(value in found for value in values):
+                return True
+        return False
+
+
+class ReferenceDataRegistry:
+    """Every record of reference models, kept locally and refreshed in the
+    background.
+
+    Lookups are served from the loaded records even once they are older than
+    ttl; the first such lookup starts a background refresh, and the records
+    are replaced once it completes (stale-while-revalidate). A failed
+    refresh is logged and retried by a later lookup.
+    """
+
+    def __init__(
+        self,
+        client: "SlimsClient",
+        keys: Optional[dict[Type[SlimsBaseModel], tuple[str, ...]]] = None,
+        ttl: float = 60 * 60,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Registry of models fetched with client, loaded by load
+
+        Args:
+            client (SlimsClient): client records are fetched with
+            keys (dict, optional): models to keep, and the fields to index
+                each by. Defaults to REFERENCE_KEYS
+            ttl (float): seconds before loaded records are refreshed
+            clock (Callable): current time in seconds
+        """
+        self.client = client
+        self.keys = dict(REFERENCE_KEYS if keys is None else keys)
+        self.ttl = ttl
+        self._clock = clock
+        self._tables: dict[Type[SlimsBaseModel], _ReferenceTable] = {}
+        self._lock = threading.Lock()
+        self._refreshing: dict[Type[SlimsBaseModel], threading.Thread] = {}
+
+    def load(self):
+        """Fetch every record of every model"""
+        for model in self.keys:
+            self.refresh(model)
+
+    def refresh(self, model: Type[SlimsBaseModel]):
+        """Fetch every record of model, replacing the loaded records"""
+        loaded_at = self._clock()
+        records = [
+            record
+            for page in self.client.fetch_model_pages(model, page_size=1000)
+            for record in page
+        ]
+        table = _ReferenceTable(model, records, self.keys[model], loaded_at)
+        with self._lock:
+            self._tables[model] = table
+        logger.debug("Loaded %d %s records", len(records), model.__name__)
+
+    def _refresh_in_background(self, model: Type[SlimsBaseModel]):
+        """Refresh model in a background thread, unless a refresh of it is
+        already in flight"""
+
+        def run():
+            """Refresh, logging failures"""
+            try:
+                self.refresh(model)
+            except Exception as e:
+                logger.warning("Refreshing %s failed: %r", model.__name__, e)
+            finally:
+                with self._lock:
+                    del self._refreshing[model]
+
+        with self._lock:
+            if model in self._refreshing:
+                return
+            thread = threading.Thread(
+                target=run, name=f"slims-refresh-{model.__name__}", daemon=True
+            )
+            self._refreshing[model] = thread
+        thread.start()
+
+    def wait(self, timeout: Optional[float] = None):
+        """Wait for background refreshes in flight to complete"""
+        with self._lock:
+            threads = list(self._refreshing.values())
+        for thread in threads:
+            thread.join(timeout)
+
+    def query(
+        self,
+        model: Type[SlimsBaseModel],
+        criterion: Criterion | dict[str, Any],
+        sort: Optional[str | list[str]] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> Optional[list[SlimsBaseModel]]:
+        """Loaded records of model matching criterion, sorted and paged as
+        SlimsClient.fetch would, refreshing them in the background if older
+        than ttl. Criterion and sort are on SLIMS column names.
+
+        Returns:
+            list[SlimsBaseModel] | None: copies of the matching records, None
+            if model is not loaded, criterion cannot be evaluated locally, or
+            SLIMS may have more matching records, see module docstring
+        """
+        table = self._tables.get(model)
+        if table is None:
+            return None
+        if self._clock() - table.loaded_at >= self.ttl:
+            self._refresh_in_background(model)
+        try:
+            records = table.table.filter(criterion, sort=sort, start=start, end=end)
+        except SlimsUnsupportedCriterion as e:
+            logger.debug("Not answering %s query locally: %s", model.__name__, e)
+            return None
+        if not table.complete(criterion, records):
+            return None
+        return [record.model_copy() for record in records]
+
+    def find(
+        self, model: Type[SlimsBaseModel], filters: dict[str, Any]
+    ) -> Optional[list[SlimsBaseModel]]:
+        """Loaded records of model whose fields equal filters, see query
+
+        Returns:
+            list[SlimsBaseModel] | None: matching records, None if model is
+            not loaded or filters are not all aliased field names
+        """
+        criterion = conjunction()
+        for name, value in filters.items():
+            field = model.model_fields.get(name)
+            if field is None or not field.alias:
+                return None
+            criterion.add(ModelField(model, name) == value)
+        return self.query(model, criterion)
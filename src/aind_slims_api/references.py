@@ -0,0 +1,121 @@
+"""Existence checks of the records that models reference, before writes.
+
+Fields annotated with ForeignKey (see aind_slims_api.models.utils) hold pks
+of records of another model, e.g. SlimsBehaviorSession.mouse_pk.
+
+KnownPks - pks known to exist, per model, filled by reads and by bulk
+    lookups of the pks it does not know yet
+
+Enable with SlimsClient(check_references=True): add_model and add_models then
+reject models referencing records that do not exist with
+SlimsReferenceNotFound, before sending them to SLIMS, rather than a fetch per
+reference per write or a failed write.
+
+Examples
+--------
+>>> from aind_slims_api import SlimsClient
+>>> client = SlimsClient(check_references=True)
+>>> client.add_models(behavior_sessions)  # one lookup per referenced model
+"""
+
+import logging
+import threading
+from typing import TYPE_CHECKING, Iterable, Type
+
+from aind_slims_api.exceptions import SlimsReferenceNotFound
+from aind_slims_api.models.base import SlimsBaseModel
+from aind_slims_api.models.expressions import ModelField
+from aind_slims_api.models.serialization import serialization_plan
+
+if TYPE_CHECKING:
+    from aind_slims_api.core import SlimsClient
+
+logger = logging.getLogger(__name__)
+
+
+def references(
+    models: Iterable[SlimsBaseModel],
+) -> dict[Type[SlimsBaseModel], set[int]]:
+    """pks that the ForeignKey fields of models hold, by referenced model"""
+    referenced: dict[Type[SlimsBaseModel], set[int]] = {}
+    for model in models:
+        for name, target in serialization_plan(type(model)).foreign_keys.items():
+            value = getattr(model, name)
+            values = value if isinstance(value, list) else [value]
+            pks = referenced.setdefault(target, set())
+            pks.update(pk for pk in values if pk is not None)
+    return referenced
+
+
+class KnownPks:
+    """pks of records known to exist in SLIMS, per model.
+
+    Records read through the client are remembered, and check looks up the
+    pks it does not know in bulk, one query per chunk_size pks. Records are
+    not expected to be deleted, so known pks are kept for the life of the
+    client.
+    """
+
+    def __init__(self, client: "SlimsClient", chunk_size: int = 100):
+        """Cache of pks fetched with client
+
+        Args:
+            client (SlimsClient): client unknown pks are looked up with
+            chunk_size (int): number of pks looked up per query
+        """
+        self.client = client
+        self.chunk_size = chunk_size
+        self._known: dict[Type[SlimsBaseModel], set[int]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, model: Type[SlimsBaseModel], pks: Iterable[int]):
+        """Remember pks of model as existing"""
+        with self._lock:
+            self._known.setdefault(model, set()).update(
+                pk for pk in pks if pk is not None
+            )
+
+    def add_models(self, models: Iterable[SlimsBaseModel]):
+        """Remember the pks of models read from, or written to, SLIMS"""
+        by_type: dict[Type[SlimsBaseModel], list[int]] = {}
+        for model in models:
+            by_type.setdefault(type(model), []).append(model.pk)
+        for model_type, pks in by_type.items():
+            self.add(model_type, pks)
+
+    def missing(self, model: Type[SlimsBaseModel], pks: Iterable[int]) -> set[int]:
+        """pks of model that do not exist in SLIMS. Unknown pks are looked
+        up, and those found are remembered"""
+        with self._lock:
+            unknown = sorted(set(pks) - self._known.get(model, set()))
+        if not unknown:
+            return set()
+        pk_field = ModelField(model, "pk")
+        found = []
+        for start in range(0, len(unknown), self.chunk_size):
+            end = start + self.chunk_size
+            # from SLIMS, as preloaded reference data may predate the records
+            records = self.client._fetch_models(
+                model, (pk_field.in_(unknown[start:end]),), {}, local=False
+            )
+            found.extend(record.pk for record in records)
+        self.add(model, found)
+        logger.debug("Looked up %d %s pks", len(unknown), model.__name__)
+        return set(unknown).difference(found)
+
+    def check(self, models: Iterable[SlimsBaseModel]):
+        """Check the records models reference exist
+
+        Raises:
+            SlimsReferenceNotFound: listing the pks, by model, that do not
+                exist
+        """
+        problems = []
+        for target, pks in references(models).items():
+            missing = self.missing(target, pks)
+            if missing:
+                problems.append(f"{target.__name__} {sorted(missing)}")
+        if problems:
+            raise SlimsReferenceNotFound(
+                "Referenced records not found: " + ", ".join(problems)
+            )
@@ -0,0 +1,243 @@
+"""Introspection of SLIMS table schemas, to check models against them.
+
+SchemaCache - column names, datatypes and units of the tables behind each
+    model, fetched once and cached in a local file with a TTL. Checks the
+    aliases and quantity units of models, and compiles decoders for them
+ModelDecoder - validates a model from a json entity, reading only the
+    columns of the model
+
+SLIMS does not describe custom columns separately from records, so the
+schema of a model is taken from one record matching the model's base fetch
+filters; e.g. the columns of Content records of the Mouse type.
+
+Examples
+--------
+>>> from aind_slims_api import SlimsClient
+>>> client = SlimsClient(check_schema=True)  # raises SlimsSchemaMismatch
+>>> client.schema.check_model(SlimsMouseContent)
+[]
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterable, NamedTuple, Optional, Type
+
+from aind_slims_api.exceptions import SlimsSchemaMismatch
+from aind_slims_api.models.base import SlimsBaseModel
+from aind_slims_api.models.serialization import serialization_plan
+
+if TYPE_CHECKING:
+    from aind_slims_api.core import SlimsClient
+
+logger = logging.getLogger(__name__)
+
+
+def default_cache_path() -> Path:
+    """schema.json in the user's cache directory"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "aind-slims-api" / "schema.json"
+
+
+class ColumnSchema(NamedTuple):
+    """A column of a SLIMS table"""
+
+    datatype: str
+    unit: Optional[str] = None
+
+
+class TableSchema(NamedTuple):
+    """The columns of a SLIMS table, as found in the records matching
+    filters"""
+
+    table: str
+    columns: dict[str, ColumnSchema]
+    fetched_at: float
+
+    @classmethod
+    def from_json_entity(
+        cls, json_entity: dict[str, Any], fetched_at: float
+    ) -> "TableSchema":
+        """Schema of the table of a record"""
+        return cls(
+            json_entity["tableName"],
+            {
+                c["name"]: ColumnSchema(c["datatype"], c.get("unit"))
+                for c in json_entity["columns"]
+            },
+            fetched_at,
+        )
+
+    def to_json(self) -> dict[str, Any]:
+        """Representation in the cache file"""
+        return {
+            "table": self.table,
+            "columns": {name: list(c) for name, c in self.columns.items()},
+            "fetched_at": self.fetched_at,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "TableSchema":
+        """Read the representation in the cache file"""
+        return cls(
+            data["table"],
+            {name: ColumnSchema(*c) for name, c in data["columns"].items()},
+            data["fetched_at"],
+        )
+
+
+class ModelDecoder:
+    """Validates a model from json entities of a table with a known schema.
+    Reads only the model's columns, and knows its quantity columns ahead of
+    time"""
+
+    def __init__(self, model: Type[SlimsBaseModel], schema: TableSchema):
+        """Compile the decoder of model"""
+        self.model = model
+        keys = {field.alias or name for name, field in model.model_fields.items()}
+        self.columns = frozenset(keys.intersection(schema.columns))
+        self.quantities = frozenset(
+            name for name in self.columns if schema.columns[name].datatype == "QUANTITY"
+        )
+
+    def __call__(self, json_entity: dict[str, Any]) -> SlimsBaseModel:
+        """Validate a model from a json entity"""
+        values: dict[str, Any] = {"json_entity": json_entity}
+        units = {}
+        for column in json_entity["columns"]:
+            name = column["name"]
+            if name in self.columns:
+                values[name] = column["value"]
+                if name in self.quantities:
+                    units[name] = column.get("unit")
+        return self.model.model_validate(values, context={"units": units})
+
+
+class SchemaCache:
+    """Schemas of the SLIMS tables behind models, fetched at most once per
+    ttl seconds and kept in a json file shared between processes"""
+
+    def __init__(
+        self,
+        client: "SlimsClient",
+        path: Optional[str | os.PathLike] = None,
+        ttl: float = 24 * 60 * 60,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Cache schemas fetched with client
+
+        Args:
+            client (SlimsClient): client schemas are fetched with
+            path (str | PathLike, optional): cache file, defaults to
+                default_cache_path()
+            ttl (float): seconds before a cached schema is fetched again
+            clock (Callable): current time in seconds
+        """
+        self.client = client
+        self.path = Path(path) if path is not None else default_cache_path()
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._schemas: dict[str, TableSchema] = {}
+        self._decoders: dict[type, ModelDecoder] = {}
+        self._load()
+
+    def _load(self):
+        """Read schemas from the cache file, if any"""
+        try:
+            with open(self.path) as f:
+                cached = json.load(f)
+            self._schemas = {k: TableSchema.from_json(v) for k, v in cached.items()}
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Cannot read schema cache %s: %r", self.path, e)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring invalid schema cache %s: %r", self.path, e)
+
+    def _save(self):
+        """Write schemas to the cache file. Schemas stay cached in memory
+        if it cannot be written"""
+        temporary = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temporary, "w") as f:
+                json.dump({k: v.to_json() for k, v in self._schemas.items()}, f)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            logger.warning("Cannot write schema cache %s: %r", self.path, e)
+
+    def _key(self, model: Type[SlimsBaseModel]) -> str:
+        """Cache key of the records of model"""
+        filters = json.dumps(model._base_fetch_filters, sort_keys=True)
+        return f"{self.client.url}|{model._slims_table}|{filters}"
+
+    def table_schema(self, model: Type[SlimsBaseModel]) -> Optional[TableSchema]:
+        """Schema of the records of model, fetched if not cached within ttl.
+        None if there are no records to take it from"""
+        key = self._key(model)
+        with self._lock:
+            schema = self._schemas.get(key)
+            if schema is not None and self._clock() - schema.fetched_at < self.ttl:
+                return schema
+            entities = self.client.fetch_entities(
+                model._slims_table, start=0, end=1, **model._base_fetch_filters
+            )
+            if not entities:
+                return None
+            schema = TableSchema.from_json_entity(entities[0], self._clock())
+            self._schemas[key] = schema
+            self._save()
+            return schema
+
+    def check_model(self, model: Type[SlimsBaseModel]) -> list[str]:
+        """Problems with the aliases and units of model's fields, and compile
+        its decoder. Fields without an alias are only checked if they name a
+        column"""
+        schema = self.table_schema(model)
+        if schema is None:
+            logger.warning(
+                "No %s records to check %s against", model._slims_table, model
+            )
+            return []
+        problems = []
+        unit_specs = serialization_plan(model).unit_specs
+        for name, field in model.model_fields.items():
+            column = schema.columns.get(field.alias or name)
+            unit_spec = unit_specs[name]
+            where = f"{model.__name__}.{name}"
+            if column is None:
+                if field.alias is not None:
+                    problems.append(
+                        f"{where}: no column {field.alias} in {schema.table}"
+                    )
+            elif column.datatype != "QUANTITY":
+                if unit_spec is not None:
+                    problems.append(f"{where}: UnitSpec on {column.datatype} column")
+            elif unit_spec is None:
+                problems.append(f"{where}: QUANTITY column without a UnitSpec")
+            elif column.unit is not None and column.unit not in unit_spec.units:
+                problems.append(f"{where}: unit {column.unit} not in {unit_spec.units}")
+        self._decoders[model] = ModelDecoder(model, schema)
+        return problems
+
+    def check_models(self, models: Optional[Iterable[Type[SlimsBaseModel]]] = None):
+        """Check models, by default every model in aind_slims_api.models.MODELS
+
+        Raises:
+            SlimsSchemaMismatch: listing the problems found
+        """
+        if models is None:
+            from aind_slims_api.models import MODELS
+
+            models = MODELS.values()
+        problems = [p for model in models for p in self.check_model(model)]
+        if problems:
+            raise SlimsSchemaMismatch("\n".join(problems))
+
+    def decoder(self, model: Type[SlimsBaseModel]) -> Optional[ModelDecoder]:
+        """Decoder of model, if it has been checked"""
+        return self._decoders.get(model)
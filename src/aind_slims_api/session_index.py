@@ -0,0 +1,152 @@
+"""Index of the latest behavior session of each mouse.
+
+LatestBehaviorSessionIndex - maps mouse pks to their most recent
+    SlimsBehaviorSession. Built once by scanning every behavior session, then
+    refreshed with only the sessions added since
+
+Examples
+--------
+>>> from aind_slims_api import SlimsClient
+>>> from aind_slims_api.session_index import LatestBehaviorSessionIndex
+>>> index = LatestBehaviorSessionIndex(SlimsClient())
+>>> index.build()
+>>> index[mouse.pk].task_stage
+>>> index.refresh()  # e.g. before each curriculum update
+"""
+
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+from aind_slims_api.core import SlimsClient
+from aind_slims_api.models.behavior_session import SlimsBehaviorSession
+
+logger = logging.getLogger(__name__)
+
+# sorts sessions without a date before every dated session
+_NO_DATE = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def _recency(session: SlimsBehaviorSession) -> tuple[datetime, int]:
+    """Sort key of sessions, by date then pk"""
+    return session.date or _NO_DATE, session.pk or 0
+
+
+class LatestBehaviorSessionIndex:
+    """Latest behavior session of each mouse, by date then pk, with O(1)
+    lookups by mouse pk.
+
+    build fetches every behavior session with SlimsClient.scan_models.
+    refresh then only fetches sessions with a pk above the highest seen, as
+    new content events get increasing pks. Edits to existing sessions are
+    only picked up by building again.
+
+    Lookups may run concurrently with build and refresh.
+    """
+
+    def __init__(
+        self,
+        client: SlimsClient,
+        partitions: int = 4,
+        page_size: int = 100,
+    ):
+        """Empty index, filled by build
+
+        Args:
+            client (SlimsClient): client sessions are fetched with
+            partitions (int): number of concurrent pk ranges build scans
+            page_size (int): number of sessions requested per page
+        """
+        self.client = client
+        self.partitions = partitions
+        self.page_size = page_size
+        self._latest: dict[int, SlimsBehaviorSession] = {}
+        self._max_pk: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def max_pk(self) -> Optional[int]:
+        """Highest session pk seen, refresh fetches sessions above it"""
+        return self._max_pk
+
+    @staticmethod
+    def _merge(
+        latest: dict[int, SlimsBehaviorSession],
+        sessions: list[SlimsBehaviorSession],
+        max_pk: Optional[int],
+    ) -> Optional[int]:
+        """Put sessions in latest if they are more recent than their mouse's
+        session there. Returns the highest of max_pk and the sessions' pks"""
+        for session in sessions:
+            if session.pk is not None and (max_pk is None or session.pk > max_pk):
+                max_pk = session.pk
+            if session.mouse_pk is None:
+                continue
+            current = latest.get(session.mouse_pk)
+            if current is None or _recency(session) > _recency(current):
+                latest[session.mouse_pk] = session
+        return max_pk
+
+    def build(self) -> int:
+        """Index every behavior session. Lookups see the previous index until
+        the new one is complete
+
+        Returns:
+            int: number of sessions fetched
+        """
+        latest: dict[int, SlimsBehaviorSession] = {}
+        max_pk = None
+        fetched = 0
+        for page in self.client.scan_models(
+            SlimsBehaviorSession,
+            partitions=self.partitions,
+            page_size=self.page_size,
+        ):
+            fetched += len(page)
+            max_pk = self._merge(latest, page, max_pk)
+        with self._lock:
+            self._latest, self._max_pk = latest, max_pk
+        logger.info("Indexed latest behavior sessions of %d mice", len(latest))
+        return fetched
+
+    def refresh(self) -> int:
+        """Index the behavior sessions added since the last build or refresh.
+        Builds the index if it is empty
+
+        Returns:
+            int: number of sessions fetched
+        """
+        if self._max_pk is None:
+            return self.build()
+        fetched = 0
+        for page in self.client.scan_models(
+            SlimsBehaviorSession,
+            SlimsBehaviorSession.pk > self._max_pk,
+            partitions=1,
+            page_size=self.page_size,
+        ):
+            fetched += len(page)
+            with self._lock:
+                self._max_pk = self._merge(self._latest, page, self._max_pk)
+        return fetched
+
+    def get(self, mouse_pk: int) -> Optional[SlimsBehaviorSession]:
+        """Latest session of a mouse, None if it has none"""
+        return self._latest.get(mouse_pk)
+
+    def __getitem__(self, mouse_pk: int) -> SlimsBehaviorSession:
+        """Latest session of a mouse, raises KeyError if it has none"""
+        return self._latest[mouse_pk]
+
+    def __contains__(self, mouse_pk: object) -> bool:
+        """Whether a mouse has a session"""
+        return mouse_pk in self._latest
+
+    def __len__(self) -> int:
+        """Number of mice with a session"""
+        return len(self._latest)
+
+    def __iter__(self) -> Iterator[int]:
+        """Pks of the mice with a session"""
+        return iter(list(self._latest))
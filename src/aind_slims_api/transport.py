@@ -0,0 +1,132 @@
+"""HTTP transport used by SlimsClient.
+
+SlimsTransport replaces the _SlimsApi HTTP layer of slims-python-api, which
+opens a new connection for every request and decodes responses with the
+standard library json module. It keeps connections alive in a pool, asks for
+compressed responses and decodes them with a pluggable json decoder, orjson
+by default when it is installed.
+"""
+
+import json
+from typing import Any, Callable, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from slims.internal import Attachment, Record, _SlimsApi, _SlimsApiException
+
+from aind_slims_api.concurrency import AdaptiveLimiter
+
+JsonLoads = Callable[[bytes], Any]
+
+
+def default_json_loads() -> JsonLoads:
+    """orjson.loads if orjson is installed, otherwise json.loads"""
+    try:
+        import orjson
+    except ImportError:
+        return json.loads
+    return orjson.loads
+
+
+class SlimsTransport(_SlimsApi):
+    """HTTP layer for a slims.Slims instance, with a persistent connection
+    pool, response compression and a pluggable json decoder"""
+
+    def __init__(
+        self,
+        url: str,
+        username: str,
+        password: str,
+        json_loads: Optional[JsonLoads] = None,
+        accept_encoding: str = "gzip, deflate",
+        pool_maxsize: int = 32,
+        limiter: Optional[AdaptiveLimiter] = None,
+        **request_params: Any,
+    ):
+        """Create transport for a SLIMS instance
+
+        Args:
+            url (str): SLIMS url
+            username (str): SLIMS username
+            password (str): SLIMS password
+            json_loads (Callable, optional): decodes response bodies, defaults
+                to default_json_loads()
+            accept_encoding (str): response encodings to accept, "identity"
+                disables compression
+            pool_maxsize (int): maximum number of connections kept alive,
+                should be at least the number of concurrent requests
+            limiter (AdaptiveLimiter, optional): admits every request, told
+                of 429 and 5xx responses
+            **request_params: passed to every request, e.g. verify
+        """
+        super().__init__(url, username, password, **request_params)
+        self.json_loads = json_loads or default_json_loads()
+        self.session = requests.Session()
+        self.session.auth = (username, password)
+        self.session.headers["Accept-Encoding"] = accept_encoding
+        adapter = HTTPAdapter(pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.limiter = limiter
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request to SLIMS, url is relative to the rest api"""
+        if (
+            self.url.startswith("https")
+            and url.startswith("http")
+            and url[4:].startswith(self.url[5:])
+        ):
+            url = "https" + url[4:]
+        if not url.startswith(self.url):
+            url = self.url + url
+        kwargs = {"headers": _SlimsApi._headers(), **self.request_params, **kwargs}
+        if self.limiter is None:
+            return self.session.request(method, url, **kwargs)
+        with self.limiter.slot() as slot:
+            response = self.session.request(method, url, **kwargs)
+            slot.overloaded = response.status_code == 429 or response.status_code >= 500
+        return response
+
+    def get_json(self, url: str, body: Optional[dict[str, Any]] = None) -> Any:
+        """GET url and decode the json response"""
+        response = self.request("GET", url, json=body)
+        if response.status_code != 200:
+            raise _SlimsApiException("Could not fetch entities: " + response.text)
+        return self.json_loads(response.content)
+
+    def get_entities(
+        self, url: str, body: Optional[dict[str, Any]] = None
+    ) -> list[Record]:
+        """GET url and return the entities of the response as records"""
+        return [
+            (Attachment if entity["tableName"] == "Attachment" else Record)(
+                entity, self
+            )
+            for entity in self.get_json(url, body)["entities"]
+        ]
+
+    def get(self, url: str) -> requests.Response:
+        """GET url"""
+        return self.request("GET", url)
+
+    def post(
+        self, url: str, body: Optional[dict[str, Any]] = None
+    ) -> requests.Response:
+        """POST body to url"""
+        return self.request("POST", url, json=body)
+
+    def post_stream(
+        self, url: str, chunks: Iterable[bytes], content_type: str = "application/json"
+    ) -> requests.Response:
+        """POST a body streamed from chunks to url, with chunked transfer
+        encoding"""
+        headers = {**_SlimsApi._headers(), "Content-Type": content_type}
+        return self.request("POST", url, data=chunks, headers=headers)
+
+    def put(self, url: str, body: Optional[dict[str, Any]] = None) -> requests.Response:
+        """PUT body to url"""
+        return self.request("PUT", url, json=body)
+
+    def delete(self, url: str) -> requests.Response:
+        """DELETE url"""
+        return self.request("DELETE", url)
@@ -0,0 +1,88 @@
+"""Reporting of SLIMS records that fail validation as SlimsBaseModels.
+
+ValidationReport - counts validation failures per field and error type, and
+    keeps a sample of the pks of the offending records
+"""
+
+import logging
+import threading
+from collections import Counter
+from typing import Any, Optional
+
+from pydantic import ValidationError
+
+
+class ValidationReport:
+    """Summary of the records that failed validation during a fetch.
+
+    Pass one to SlimsClient.fetch_models, fetch_model_pages or scan_models to
+    collect failures across calls. Each call also logs a single summary line
+    if any of its records failed.
+
+    Examples
+    --------
+    >>> report = ValidationReport()
+    >>> mice = client.fetch_models(SlimsMouseContent, report=report)
+    >>> report.failed, report.errors.most_common(3), report.sample_pks
+    """
+
+    def __init__(self, model: Optional[type] = None, max_samples: int = 10):
+        """Empty report
+
+        Args:
+            model (type, optional): model validated, named in the summary
+            max_samples (int): most pks of failed records kept
+        """
+        self.model = model
+        self.max_samples = max_samples
+        self.validated = 0
+        self.failed = 0
+        self.errors: Counter[tuple[str, str]] = Counter()
+        self.sample_pks: list[Any] = []
+        self._lock = threading.Lock()
+
+    def add_failure(self, pk: Any, error: ValidationError):
+        """Count a record that failed validation with error"""
+        with self._lock:
+            self.failed += 1
+            for detail in error.errors(
+                include_url=False, include_context=False, include_input=False
+            ):
+                field = ".".join(str(loc) for loc in detail["loc"]) or "__root__"
+                self.errors[(field, detail["type"])] += 1
+            if len(self.sample_pks) < self.max_samples:
+                self.sample_pks.append(pk)
+
+    def add_validated(self, count: int):
+        """Count records that passed validation"""
+        with self._lock:
+            self.validated += count
+
+    def update(self, other: "ValidationReport"):
+        """Add the counts and samples of other to this report"""
+        with self._lock:
+            if self.model is None:
+                self.model = other.model
+            self.validated += other.validated
+            self.failed += other.failed
+            self.errors.update(other.errors)
+            room = self.max_samples - len(self.sample_pks)
+            self.sample_pks.extend(other.sample_pks[: max(room, 0)])
+
+    def summary(self) -> str:
+        """One line summary of the failures"""
+        name = self.model.__name__ if self.model is not None else "SLIMS"
+        errors = ", ".join(
+            f"{field} {error_type} x{count}"
+            for (field, error_type), count in self.errors.most_common()
+        )
+        return (
+            f"SLIMS data validation failed for {self.failed} of "
+            f"{self.failed + self.validated} {name} records: {errors}; "
+            f"pks {self.sample_pks}"
+        )
+
+    def log(self, logger: logging.Logger):
+        """Log the summary as an error, if any record failed"""
+        if self.failed:
+            logger.error(self.summary())
@@ -0,0 +1,341 @@
+"""Write-behind queue for adding records to SLIMS without blocking.
+
+WriteBehindQueue - adds models to SLIMS from a background thread. Pending
+    writes are kept in a local append-only spool file, so that they survive
+    restarts and SLIMS outages
+
+Examples
+--------
+>>> from aind_slims_api import SlimsClient
+>>> from aind_slims_api.write_behind import WriteBehindQueue
+>>> with WriteBehindQueue(SlimsClient(), "slims_spool.jsonl") as queue:
+...     future = queue.add_model(behavior_session)
+>>> future.result().pk
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Optional, Type
+from uuid import uuid4
+
+import requests
+from slims.internal import Record
+from slims.slims import _SlimsApiException
+
+from aind_slims_api.core import SlimsClient
+from aind_slims_api.models.base import SlimsBaseModel
+from aind_slims_api.types import SLIMS_TABLES
+
+logger = logging.getLogger(__name__)
+
+
+class _Write:
+    """A pending write of data to a SLIMS table"""
+
+    def __init__(
+        self,
+        id: str,
+        table: SLIMS_TABLES,
+        data: dict[str, Any],
+        model_type: Optional[Type[SlimsBaseModel]] = None,
+    ):
+        """Write data to table, resolving future with a model_type instance,
+        or with the slims Record if model_type is None"""
+        self.id = id
+        self.table = table
+        self.data = data
+        self.model_type = model_type
+        self.attempts = 0
+        self.error: Optional[Exception] = None
+        self.future: Future = Future()
+
+
+class _Spool:
+    """Append-only json lines file of pending writes. A write is one line,
+    {"id": ..., "table": ..., "data": ...}, and is acknowledged once added to
+    SLIMS by a later {"ack": id} line"""
+
+    def __init__(self, path: Path, fsync: bool):
+        """Spool to path, syncing every line to disk if fsync"""
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = None
+
+    def open(self) -> list[dict[str, Any]]:
+        """Open the spool for appending. Returns the writes that were not
+        acknowledged, in order, and compacts the file to them"""
+        pending: dict[str, dict[str, Any]] = {}
+        if self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # an interrupted append, not acknowledged
+                        logger.warning("Skipping incomplete line in %s", self.path)
+                        continue
+                    if "ack" in entry:
+                        pending.pop(entry["ack"], None)
+                    else:
+                        pending[entry["id"]] = entry
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        compacted = self.path.with_name(self.path.name + ".tmp")
+        with open(compacted, "w") as f:
+            for entry in pending.values():
+                f.write(json.dumps(entry) + "\n")
+            self._sync(f)
+        os.replace(compacted, self.path)
+        self._file = open(self.path, "a")
+        return list(pending.values())
+
+    def _sync(self, f):
+        """Flush f, to disk if fsync"""
+        f.flush()
+        if self.fsync:
+            os.fsync(f.fileno())
+
+    def append(self, entry: dict[str, Any]):
+        """Append an entry"""
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._sync(self._file)
+
+    def close(self):
+        """Close the spool"""
+        with self._lock:
+            self._file.close()
+
+
+class WriteBehindQueue:
+    """Adds models to SLIMS in the background. add_model returns immediately
+    with a Future; a worker thread adds queued writes in batches, with
+    bounded concurrency, and retries writes that failed with connection
+    errors, timeouts, or 429 and 5xx responses.
+
+    Queued writes are appended to a local spool file before add_model
+    returns, and acknowledged there once added to SLIMS, or once SLIMS
+    rejects them with any other response. Writes that were not
+    acknowledged, because the process stopped or SLIMS was unreachable, are
+    queued again when a WriteBehindQueue is next created with the spool.
+    """
+
+    def __init__(
+        self,
+        client: SlimsClient,
+        spool_path: str | os.PathLike,
+        max_workers: int = 4,
+        batch_size: int = 16,
+        max_attempts: int = 5,
+        retry_interval: float = 30.0,
+        fsync: bool = True,
+    ):
+        """Start the worker, queueing writes left in the spool
+
+        Args:
+            client (SlimsClient): client writes are made with
+            spool_path (str | PathLike): spool file, created if missing
+            max_workers (int): maximum number of concurrent writes
+            batch_size (int): maximum number of writes taken from the queue
+                at a time
+            max_attempts (int): attempts before a write's Future fails. The
+                write is kept in the spool, and retried on the next start
+            retry_interval (float): seconds to wait after a failed batch
+            fsync (bool): sync the spool to disk before add_model returns
+        """
+        if max_workers < 1 or batch_size < 1 or max_attempts < 1:
+            raise ValueError(
+                "max_workers, batch_size and max_attempts must be positive"
+            )
+        self.client = client
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_interval = retry_interval
+        self._spool = _Spool(Path(spool_path), fsync)
+        self._condition = threading.Condition()
+        self._pending: deque[_Write] = deque(
+            _Write(entry["id"], entry["table"], entry["data"])
+            for entry in self._spool.open()
+        )
+        if self._pending:
+            logger.info("Queued %d writes from %s", len(self._pending), spool_path)
+        self._in_flight = 0
+        self._closed = False
+        self._stopped = False
+        self._worker = threading.Thread(
+            target=self._run, name="slims-write-behind", daemon=True
+        )
+        self._worker.start()
+
+    @property
+    def pending(self) -> int:
+        """Number of writes not yet added to SLIMS"""
+        with self._condition:
+            return len(self._pending) + self._in_flight
+
+    def add_model(self, model: SlimsBaseModel, *args, **kwargs) -> Future:
+        """Queue a model to add to SLIMS, see SlimsClient.add_model
+
+        Returns:
+            Future: resolves to an instance of the same type of model, with
+            data from the resulting SLIMS record
+        """
+        kwargs.setdefault("mode", "json")
+        write = _Write(
+            uuid4().hex,
+            model._slims_table,
+            self.client._add_model_payload(model, args, kwargs),
+            type(model),
+        )
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Cannot add to a closed WriteBehindQueue")
+            self._spool.append(
+                {"id": write.id, "table": write.table, "data": write.data}
+            )
+            self._pending.append(write)
+            self._condition.notify_all()
+        return write.future
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued write is added, or has failed. Returns
+        False if timeout seconds elapsed first"""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._pending and not self._in_flight, timeout
+            )
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Stop accepting and retrying writes, wait up to timeout seconds for
+        queued writes to be attempted, then stop the worker. Writes that were
+        not added stay in the spool. Returns False if timeout seconds elapsed
+        first"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        flushed = self.flush(timeout)
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._worker.join()
+        self._spool.close()
+        return flushed
+
+    def __enter__(self) -> "WriteBehindQueue":
+        """Use as a context manager, closing on exit"""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close, waiting for queued writes to be attempted once"""
+        self.close()
+
+    def _run(self):
+        """Worker: add queued writes in batches until stopped"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                with self._condition:
+                    self._condition.wait_for(
+                        lambda: self._pending or self._stopped or self._closed
+                    )
+                    if self._closed:
+                        self._give_up_retries()
+                    if self._stopped or not self._pending:
+                        return
+                    batch = [
+                        self._pending.popleft()
+                        for _ in range(min(self.batch_size, len(self._pending)))
+                    ]
+                    self._in_flight = len(batch)
+                retry = list(executor.map(self._write, batch))
+                with self._condition:
+                    for write, failed in reversed(list(zip(batch, retry))):
+                        if failed:
+                            self._pending.appendleft(write)
+                    self._in_flight = 0
+                    self._condition.notify_all()
+                    if any(retry):
+                        self._condition.wait_for(
+                            lambda: self._stopped or self._closed, self.retry_interval
+                        )
+
+    def _give_up_retries(self):
+        """Fail the queued writes that already failed, once closed. They stay
+        in the spool"""
+        retries = [write for write in self._pending if write.attempts]
+        if retries:
+            self._pending = deque(w for w in self._pending if not w.attempts)
+            for write in retries:
+                self._give_up(write)
+            self._condition.notify_all()
+
+    def _give_up(self, write: _Write):
+        """Fail a write's Future with its last error, keeping it in the spool"""
+        logger.error(
+            "SLIMS write to %s failed %d times, kept in spool: %r",
+            write.table,
+            write.attempts,
+            write.error,
+        )
+        write.future.set_exception(write.error)
+
+    def _failed(self, write: _Write, error: Exception) -> bool:
+        """Record a failed attempt at a write. Returns whether to retry it"""
+        write.error = error
+        if write.attempts < self.max_attempts:
+            logger.warning(
+                "SLIMS write to %s failed (attempt %d), retrying: %r",
+                write.table,
+                write.attempts,
+                error,
+            )
+            return True
+        self._give_up(write)
+        return False
+
+    def _write(self, write: _Write) -> bool:
+        """Add a write to SLIMS and acknowledge it in the spool. Returns
+        whether it failed, and should be retried"""
+        write.attempts += 1
+        slims_api = self.client.db.slims_api
+        try:
+            response = slims_api.put(url=write.table, body=write.data)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            return self._failed(write, e)
+        except Exception as e:
+            write.error = e
+            self._give_up(write)
+            return False
+        if response.status_code == 429 or response.status_code >= 500:
+            error = _SlimsApiException("Add failed: " + response.text)
+            return self._failed(write, error)
+        self._spool.append({"ack": write.id})
+        if response.status_code != 200:
+            logger.error(
+                "SLIMS rejected write to %s, dropped from spool: %s %r",
+                write.table,
+                response.text,
+                write.data,
+            )
+            write.future.set_exception(
+                _SlimsApiException("Add failed: " + response.text)
+            )
+            return False
+        try:
+            record = Record(
+                slims_api.json_loads(response.content)["entities"][0], slims_api
+            )
+            logger.info(f"SLIMS Add: {write.table}/{record.pk()}")
+            if write.model_type is None:
+                write.future.set_result(record)
+            else:
+                write.future.set_result(write.model_type.model_validate(record))
+        except Exception as e:
+            write.future.set_exception(e)
+        return False
@@ -6,6 +6,7 @@ Notes
 """
 
 import logging
+from concurrent.futures import Future
 
 from aind_slims_api.core import SlimsClient
 from aind_slims_api.models import (
@@ -14,6 +15,7 @@ from aind_slims_api.models import (
     SlimsMouseContent,
     SlimsUser,
 )
+from aind_slims_api.write_behind import WriteBehindQueue
 
 logger = logging.getLogger()
 
@@ -32,9 +34,49 @@ def write_behavior_session_content_events(
     - Here due to restructuring of models, will likely be deprecated in the
      future.
     """
+    added = []
+    for behavior_session in _resolve_behavior_sessions(
+        mouse, instrument, trainers, behavior_sessions
+    ):
+        added.append(client.add_model(behavior_session))
+
+    return added
+
+
+def enqueue_behavior_session_content_events(
+    queue: WriteBehindQueue,
+    mouse: SlimsMouseContent,
+    instrument: SlimsInstrument,
+    trainers: list[SlimsUser],
+    *behavior_sessions: SlimsBehaviorSession,
+) -> list[Future]:
+    """Queues behavior sessions to be written to the SLIMS database in the
+    background, see write_behavior_session_content_events. Returns
+    immediately.
+
+    Returns
+    -------
+    list[Future]
+        resolve to the written behavior sessions
+    """
+    return [
+        queue.add_model(behavior_session)
+        for behavior_session in _resolve_behavior_sessions(
+            mouse, instrument, trainers, behavior_sessions
+        )
+    ]
+
+
+def _resolve_behavior_sessions(
+    mouse: SlimsMouseContent,
+    instrument: SlimsInstrument,
+    trainers: list[SlimsUser],
+    behavior_sessions: tuple[SlimsBehaviorSession, ...],
+) -> list[SlimsBehaviorSession]:
+    """Copies of behavior_sessions linked to mouse, instrument and trainers"""
     trainer_pks = [trainer.pk for trainer in trainers]
     logger.debug(f"Trainer pks: {trainer_pks}")
-    added = []
+    resolved = []
     for behavior_session in behavior_sessions:
         updated = behavior_session.model_copy(
             update={
@@ -44,6 +86,5 @@ def write_behavior_session_content_events(
             },
         )
         logger.debug(f"Resolved behavior session: {updated}")
-        added.append(client.add_model(updated))
-
-    return added
+        resolved.append(updated)
+    return resolved
@@ -0,0 +1,121 @@
+"""Tests methods in attachments module"""
+
+import base64
+import hashlib
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from requests import Response
+
+from aind_slims_api.attachments import (
+    ContentCache,
+    attachment_body,
+    attachment_name,
+    base64_chunks,
+    content_hash,
+    read_chunks,
+)
+
+
+def _response(content: bytes) -> Response:
+    """A response with content"""
+    response = Response()
+    response._content = content
+    return response
+
+
+class TestAttachments(unittest.TestCase):
+    """Tests streaming of attachment contents"""
+
+    def setUp(self):
+        """Write an example file"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.contents = bytes(range(256)) * 5
+        self.path = Path(directory.name) / "rig.json"
+        self.path.write_bytes(self.contents)
+
+    def test_read_chunks(self):
+        """Tests files are read in chunks, other sources as they are"""
+        self.assertEqual(
+            [self.contents[:300], self.contents[300:600]],
+            list(read_chunks(self.path, 300))[:2],
+        )
+        with open(self.path, "rb") as f:
+            self.assertEqual(5, len(list(read_chunks(f, 256))))
+        self.assertEqual([b"ab"], list(read_chunks(b"ab")))
+        self.assertEqual([b"a", b"b"], list(read_chunks(iter([b"a", b"b"]))))
+
+    def test_base64_chunks(self):
+        """Tests chunks of any size encode like the whole contents"""
+        for size in (1, 2, 3, 7, 2000):
+            chunks = read_chunks(io.BytesIO(self.contents), size)
+            self.assertEqual(
+                base64.b64encode(self.contents), b"".join(base64_chunks(chunks))
+            )
+        self.assertEqual([], list(base64_chunks([b""])))
+
+    def test_attachment_body(self):
+        """Tests the body is the json Record.add_attachment sends"""
+        body = b"".join(attachment_body("rig.json", "Content", 1, self.path, 3))
+        self.assertEqual(
+            {
+                "attm_name": "rig.json",
+                "atln_recordPk": 1,
+                "atln_recordTable": "Content",
+                "contents": base64.b64encode(self.contents).decode(),
+            },
+            json.loads(body),
+        )
+
+    def test_attachment_name(self):
+        """Tests names are taken from paths and named files"""
+        self.assertEqual("rig.json", attachment_name(str(self.path)))
+        with open(self.path, "rb") as f:
+            self.assertEqual("rig.json", attachment_name(f))
+        self.assertIsNone(attachment_name(io.BytesIO(b"")))
+        self.assertIsNone(attachment_name([b""]))
+
+    def test_content_hash(self):
+        """Tests sources that can be read again are hashed, as SLIMS hashes
+        attachments, and files are rewound"""
+        digest = hashlib.md5(self.contents).hexdigest()
+        self.assertEqual(digest, content_hash(self.path, 100))
+        self.assertEqual(digest, content_hash(self.contents))
+        with open(self.path, "rb") as f:
+            f.read(10)
+            self.assertEqual(
+                hashlib.md5(self.contents[10:]).hexdigest(), content_hash(f)
+            )
+            self.assertEqual(10, f.tell())
+        self.assertIsNone(content_hash(iter([self.contents])))
+        with open(self.path, "rb", buffering=0) as f:
+            f.seekable = lambda: False
+            self.assertIsNone(content_hash(f))
+
+
+class TestContentCache(unittest.TestCase):
+    """Tests ContentCache class"""
+
+    def test_eviction(self):
+        """Tests the least recently used contents are evicted beyond
+        max_bytes, and contents larger than it are not cached"""
+        cache = ContentCache(max_bytes=4)
+        cache.put("a", _response(b"aa"))
+        cache.put("b", _response(b"bb"))
+        self.assertEqual(b"aa", cache.get("a").content)
+        cache.put("c", _response(b"cc"))
+        self.assertIsNone(cache.get("b"))
+        cache.put("a", _response(b"a"))
+        cache.put("d", _response(b"d"))
+        self.assertEqual(b"cc", cache.get("c").content)
+        cache.put("e", _response(b"eeeee"))
+        self.assertIsNone(cache.get("e"))
+        self.assertEqual(b"a", cache.get("a").content)
+
+
+if __name__ == "__main__":
+    unittest.main()
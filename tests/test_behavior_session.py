@@ -2,11 +2,13 @@
 
 import json
 import os
+import tempfile
 import unittest
 from datetime import datetime
 from pathlib import Path
 from unittest.mock import MagicMock, patch, call
 
+import requests
 from slims.internal import Record
 
 from aind_slims_api.core import SlimsClient
@@ -14,7 +16,11 @@ from aind_slims_api.models.behavior_session import SlimsBehaviorSession
 from aind_slims_api.models.instrument import SlimsInstrument
 from aind_slims_api.models.mouse import SlimsMouseContent
 from aind_slims_api.models.user import SlimsUser
-from aind_slims_api.write_models import write_behavior_session_content_events
+from aind_slims_api.write_behind import WriteBehindQueue
+from aind_slims_api.write_models import (
+    enqueue_behavior_session_content_events,
+    write_behavior_session_content_events,
+)
 
 RESOURCES_DIR = Path(os.path.dirname(os.path.realpath(__file__))) / "resources"
 
@@ -147,6 +153,34 @@ class TestBehaviorSession(unittest.TestCase):
             [call.info('SLIMS Add: ContentEvent/79')]
         )
 
+    @patch("aind_slims_api.transport.SlimsTransport.put")
+    def test_enqueue_behavior_session_content_events(self, mock_put: MagicMock):
+        """Test enqueue_behavior_session_content_events writes in the
+        background"""
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(
+            {"entities": [self.example_write_sessions_response.json_entity]}
+        ).encode()
+        mock_put.return_value = response
+        with tempfile.TemporaryDirectory() as directory:
+            with WriteBehindQueue(
+                self.example_client, Path(directory) / "spool.jsonl"
+            ) as queue:
+                futures = enqueue_behavior_session_content_events(
+                    queue,
+                    self.example_mouse,
+                    self.example_instrument,
+                    [self.example_trainer],
+                    *self.example_behavior_sessions,
+                )
+        added = [future.result() for future in futures]
+        self.assertEqual(len(self.example_behavior_sessions), len(added))
+        self.assertEqual(
+            [self.example_mouse.pk] * len(added),
+            [c.kwargs["body"]["cnvn_fk_content"] for c in mock_put.mock_calls],
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
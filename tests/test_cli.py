@@ -0,0 +1,164 @@
+"""Tests methods in cli module"""
+
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pyarrow.parquet as pq
+from slims.internal import Record
+
+from aind_slims_api.cli import _json_default, main, parse_filters
+from aind_slims_api.models import SlimsBehaviorSession, SlimsUnit
+
+RESOURCES_DIR = Path(os.path.dirname(os.path.realpath(__file__))) / "resources"
+
+
+def _load_records(filename: str) -> list[Record]:
+    """Load an example response from the resource dir as records"""
+    return [
+        Record(json_entity=r, slims_api=None)
+        for r in json.loads((RESOURCES_DIR / filename).read_text())
+    ]
+
+
+class TestCli(unittest.TestCase):
+    """Tests the aind-slims command line interface"""
+
+    example_unit_response: list[Record]
+    example_sessions_response: list[Record]
+
+    @classmethod
+    def setUpClass(cls):
+        """Load example responses"""
+        cls.example_unit_response = _load_records("example_fetch_unit_response.json")
+        cls.example_sessions_response = _load_records(
+            "example_fetch_behavior_session_content_events_response.json_entity.json"
+        )
+
+    def setUp(self):
+        """Create a temporary output directory"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def _export(self, *argv: str) -> str:
+        """Run the export command, writing to a temporary file"""
+        output = os.path.join(self.tmp_dir.name, "out")
+        with patch("sys.stderr", new=io.StringIO()):
+            self.assertEqual(0, main(["export", *argv, "-o", output]))
+        return output
+
+    @patch("slims.slims.Slims.fetch")
+    def test_export_ndjson(self, mock_fetch: MagicMock):
+        """Tests exporting units as ndjson, page by page"""
+        mock_fetch.side_effect = [
+            self.example_unit_response[:1],
+            self.example_unit_response[1:],
+            [],
+        ]
+        output = self._export("unit", "--page-size", "1", "--filter", "name=a")
+        rows = [json.loads(line) for line in Path(output).read_text().splitlines()]
+        self.assertEqual(["picometer^3", "picometer^2"], [r["name"] for r in rows])
+        self.assertNotIn("json_entity", rows[0])
+        self.assertEqual(3, mock_fetch.call_count)
+        self.assertEqual(
+            "unit_name",
+            mock_fetch.mock_calls[0].args[1].members[0].criterion["fieldName"],
+        )
+
+    @patch("slims.slims.Slims.fetch")
+    def test_export_ndjson_datetime(self, mock_fetch: MagicMock):
+        """Tests datetimes are exported in ISO 8601 format"""
+        mock_fetch.return_value = self.example_sessions_response
+        output = self._export("behavior-session")
+        row = json.loads(Path(output).read_text().splitlines()[0])
+        self.assertEqual("2021-01-01T08:00:00+00:00", row["date"])
+
+    @patch("slims.slims.Slims.fetch")
+    def test_export_csv(self, mock_fetch: MagicMock):
+        """Tests exporting behavior sessions as csv"""
+        mock_fetch.return_value = self.example_sessions_response
+        output = self._export("behavior-session", "--format", "csv", "--sort", "date")
+        with open(output, newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(2, len(rows))
+        self.assertEqual("[19]", rows[0]["trainers"])
+        self.assertEqual("2021-01-01T08:00:00+00:00", rows[0]["date"])
+        self.assertEqual(
+            ["cnvn_cf_scheduledDate"], mock_fetch.mock_calls[0].kwargs["sort"]
+        )
+
+    @patch("slims.slims.Slims.fetch")
+    def test_export_parquet(self, mock_fetch: MagicMock):
+        """Tests exporting behavior sessions as parquet"""
+        mock_fetch.return_value = self.example_sessions_response
+        output = self._export("behavior-session", "--format", "parquet")
+        table = pq.read_table(output)
+        self.assertEqual(2, table.num_rows)
+        self.assertEqual([19], table.column("trainers").to_pylist()[0])
+        self.assertEqual("timestamp[ms, tz=UTC]", str(table.schema.field("date").type))
+
+    @patch("slims.slims.Slims.fetch")
+    def test_export_stdout(self, mock_fetch: MagicMock):
+        """Tests exporting to stdout"""
+        mock_fetch.return_value = self.example_unit_response
+        with (
+            patch("sys.stdout", new=io.StringIO()) as stdout,
+            patch("sys.stderr", new=io.StringIO()) as stderr,
+        ):
+            main(["export", "unit"])
+        self.assertEqual(2, len(stdout.getvalue().splitlines()))
+        self.assertIn("Exported 2 unit records", stderr.getvalue())
+
+    @patch("slims.slims.Slims.fetch")
+    def test_export_sort_descending(self, mock_fetch: MagicMock):
+        """Tests sort fields prefixed with - sort in descending order"""
+        mock_fetch.return_value = []
+        self._export("unit", "--sort=-name", "--sort", "pk")
+        self.assertEqual(
+            ["-unit_name", "unit_pk"], mock_fetch.mock_calls[0].kwargs["sort"]
+        )
+
+    def test_parquet_requires_pyarrow(self):
+        """Tests a helpful error is raised when pyarrow is missing"""
+        with patch.dict(sys.modules, {"pyarrow": None}):
+            with self.assertRaises(ImportError):
+                self._export("unit", "--format", "parquet")
+
+    def test_invalid_arguments(self):
+        """Tests invalid filters, sort fields and sizes exit with a usage
+        error"""
+        for argv in (
+            ["export", "unit", "--filter", "not_a_field=1"],
+            ["export", "unit", "--filter", "pk"],
+            ["export", "unit", "--filter", "pk=abc"],
+            ["export", "unit", "--sort", "not_a_field"],
+            ["export", "unit", "--sort=-not_a_field"],
+            ["export", "unit", "--page-size", "0"],
+            ["export", "unit", "--concurrency", "0"],
+        ):
+            with patch("sys.stderr", new=io.StringIO()):
+                with self.assertRaises(SystemExit):
+                    main(argv)
+
+    def test_parse_filters(self):
+        """Tests filter values are coerced to the field type"""
+        self.assertEqual({"pk": 31}, parse_filters(SlimsUnit, ["pk=31"]))
+        self.assertEqual(
+            {"mouse_pk": 1, "task": "a=b"},
+            parse_filters(SlimsBehaviorSession, ["mouse_pk=1", "task=a=b"]),
+        )
+
+    def test_json_default(self):
+        """Tests unsupported values still raise a TypeError"""
+        with self.assertRaises(TypeError):
+            _json_default(object())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+"""Tests methods in codec module"""
+
+import pickle
+import unittest
+from unittest.mock import patch
+
+import msgpack
+
+from aind_slims_api.models import (
+    SlimsBehaviorSession,
+    SlimsMouseContent,
+    SlimsUnit,
+    decode_models,
+    encode_models,
+)
+from aind_slims_api.models.codec import _ext_hook, schema_fingerprint
+from tests.test_serialization import load_models
+
+
+class TestCodec(unittest.TestCase):
+    """Tests encode_models and decode_models"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Load example behavior sessions, which have datetimes and lists"""
+        cls.sessions = load_models(
+            SlimsBehaviorSession,
+            "example_fetch_behavior_session_content_events_response"
+            ".json_entity.json",
+        )
+
+    def _repack(self, data: bytes, **changes) -> bytes:
+        """Change fields of encoded models"""
+        decoded = msgpack.unpackb(data, raw=False, ext_hook=msgpack.ExtType)
+        decoded.update(changes)
+        return msgpack.packb(decoded)
+
+    def test_round_trip(self):
+        """Tests models decode equal to the encoded models, without
+        validation or json entities, and are smaller than their pickles"""
+        data = encode_models(self.sessions)
+        self.assertLess(len(data), len(pickle.dumps(self.sessions)) / 10)
+        with patch.object(SlimsBehaviorSession, "model_validate") as mock_validate:
+            decoded = decode_models(data, SlimsBehaviorSession)
+        mock_validate.assert_not_called()
+        stripped = [s.model_copy(update={"json_entity": None}) for s in self.sessions]
+        self.assertEqual(stripped, decoded)
+        self.assertEqual([], decode_models(encode_models([]), SlimsUnit))
+
+    def test_include_json_entity(self):
+        """Tests json entities are encoded if not excluded"""
+        decoded = decode_models(
+            encode_models(self.sessions, exclude=()), SlimsBehaviorSession
+        )
+        self.assertEqual(self.sessions, decoded)
+
+    def test_schema_changed(self):
+        """Tests models encoded with another schema are validated, ignoring
+        fields the model no longer has"""
+        data = encode_models(self.sessions)
+        decoded = msgpack.unpackb(data, ext_hook=msgpack.ExtType)
+        decoded["fields"][0] = "removed"
+        changed = self._repack(data, fingerprint="0", fields=decoded["fields"])
+        with patch.object(
+            SlimsBehaviorSession,
+            "model_validate",
+            side_effect=SlimsBehaviorSession.model_validate,
+        ) as mock_validate:
+            models = decode_models(changed, SlimsBehaviorSession)
+        self.assertEqual(len(self.sessions), mock_validate.call_count)
+        self.assertEqual([s.notes for s in self.sessions], [m.notes for m in models])
+        self.assertEqual([None, None], [m.pk for m in models])
+
+    def test_invalid(self):
+        """Tests data that is not encoded models is rejected"""
+        data = encode_models(self.sessions)
+        with self.assertRaises(ValueError):
+            decode_models(msgpack.packb([1]), SlimsBehaviorSession)
+        with self.assertRaises(ValueError):
+            decode_models(self._repack(data, version=0), SlimsBehaviorSession)
+        with self.assertRaises(ValueError):
+            decode_models(data, SlimsMouseContent)
+        with self.assertRaises(TypeError):
+            encode_models(self.sessions + [SlimsUnit(unit_name="g", unit_pk=1)])
+        with self.assertRaises(TypeError):
+            encode_models(
+                [SlimsUnit(unit_name="g", unit_pk=1, json_entity={1: {2}})],
+                exclude=(),
+            )
+        self.assertEqual(msgpack.ExtType(9, b""), _ext_hook(9, b""))
+
+    def test_fingerprint(self):
+        """Tests fingerprints differ between models"""
+        self.assertNotEqual(
+            schema_fingerprint(SlimsUnit), schema_fingerprint(SlimsMouseContent)
+        )
+
+    def test_missing_msgpack(self):
+        """Tests a missing msgpack is reported with how to install it"""
+        with patch.dict("sys.modules", {"msgpack": None}):
+            with self.assertRaises(ImportError) as raised:
+                encode_models(self.sessions)
+        self.assertIn("aind-slims-api[msgpack]", str(raised.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
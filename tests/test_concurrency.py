@@ -0,0 +1,215 @@
+"""Tests methods in concurrency module"""
+
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+from aind_slims_api.concurrency import AdaptiveLimiter, SingleFlight
+from aind_slims_api.core import SlimsClient
+
+
+def _wait_for(condition):
+    """Poll condition every millisecond until it is true, for up to 5 s"""
+    assert any(time.sleep(0.001) or condition() for _ in range(5000)), "Timed out"
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Tests SingleFlight class"""
+
+    def test_coalesces_concurrent_calls(self):
+        """Tests concurrent calls with the same key share one call"""
+        single_flight = SingleFlight()
+        release = threading.Event()
+        fn = MagicMock(side_effect=lambda: release.wait() and "result")
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(single_flight.do, "key", fn) for _ in range(4)]
+            _wait_for(lambda: single_flight.in_flight("key") == 4)
+            release.set()
+            self.assertEqual(["result"] * 4, [f.result() for f in futures])
+        fn.assert_called_once_with()
+        self.assertEqual(0, single_flight.in_flight("key"))
+
+    def test_sequential_calls(self):
+        """Tests calls are not shared once complete, nor across keys"""
+        single_flight = SingleFlight()
+        fn = MagicMock(return_value="result")
+        single_flight.do("a", fn, 1, b=2)
+        single_flight.do("a", fn, 1, b=2)
+        single_flight.do("b", fn, 1, b=2)
+        self.assertEqual(3, fn.call_count)
+
+    def test_exception_shared(self):
+        """Tests an exception is raised to every caller of the call"""
+        single_flight = SingleFlight()
+        release = threading.Event()
+
+        def fail():
+            """Fails once released"""
+            release.wait()
+            raise RuntimeError("failed")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(single_flight.do, "key", fail) for _ in range(2)]
+            _wait_for(lambda: single_flight.in_flight("key") == 2)
+            release.set()
+            for future in futures:
+                with self.assertRaises(RuntimeError):
+                    future.result()
+        self.assertEqual(0, single_flight.in_flight("key"))
+
+    def test_do_async(self):
+        """Tests coroutines share calls, also with threads"""
+        single_flight = SingleFlight()
+        release = threading.Event()
+        fn = MagicMock(side_effect=lambda: release.wait() and "result")
+
+        async def main():
+            """Join a call from two coroutines and a thread"""
+            tasks = [
+                asyncio.ensure_future(single_flight.do_async("key", fn))
+                for _ in range(2)
+            ]
+            thread = threading.Thread(target=single_flight.do, args=("key", fn))
+            await asyncio.sleep(0)
+            thread.start()
+            await asyncio.to_thread(
+                _wait_for, lambda: single_flight.in_flight("key") == 3
+            )
+            release.set()
+            thread.join()
+            return await asyncio.gather(*tasks)
+
+        self.assertEqual(["result", "result"], asyncio.run(main()))
+        fn.assert_called_once_with()
+
+
+class TestSlimsClientCoalescing(unittest.TestCase):
+    """Tests SlimsClient.fetch coalesces identical requests"""
+
+    @patch("slims.slims.Slims.fetch")
+    def test_fetch_coalesced(self, mock_fetch: MagicMock):
+        """Tests identical concurrent fetches make one request"""
+        client = SlimsClient(url="http://fake_url", username="user", password="pw")
+        release = threading.Event()
+        mock_fetch.side_effect = lambda *args, **kwargs: release.wait() and ["r"]
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [
+                executor.submit(client.fetch, "Content", cntn_barCode="1", start=0)
+                for _ in range(3)
+            ]
+            calls = client._single_flight._calls
+            _wait_for(lambda: [c.waiters for c in list(calls.values())] == [2])
+            release.set()
+            results = [f.result() for f in futures]
+        self.assertEqual([["r"]] * 3, results)
+        self.assertIsNot(results[0], results[1])
+        mock_fetch.assert_called_once()
+
+    @patch("slims.slims.Slims.fetch")
+    def test_fetch_not_coalesced(self, mock_fetch: MagicMock):
+        """Tests coalescing can be disabled"""
+        client = SlimsClient(
+            url="http://fake_url",
+            username="user",
+            password="pw",
+            coalesce_requests=False,
+        )
+        mock_fetch.return_value = ["r"]
+        self.assertEqual(["r"], client.fetch("Content", cntn_barCode="1"))
+        self.assertIsNone(client._single_flight)
+
+
+class TestAdaptiveLimiter(unittest.TestCase):
+    """Tests AdaptiveLimiter class"""
+
+    def test_aimd(self):
+        """Tests the cap halves on overload, once per burst, and grows back"""
+        now = [0.0]
+        limiter = AdaptiveLimiter(max_concurrency=4, clock=lambda: now[0])
+        started = [limiter.acquire() for _ in range(3)]
+        self.assertEqual(3, limiter.in_flight)
+        limiter.release(started[0])
+        self.assertEqual(4, limiter.limit)
+        now[0] = 1.0
+        limiter.release(started[1], overloaded=True)
+        limiter.release(started[2], overloaded=True)
+        self.assertEqual(2, limiter.limit)
+        limiter.release(limiter.acquire(), overloaded=True)
+        self.assertEqual(1, limiter.limit)
+        for _ in range(3):
+            limiter.release(limiter.acquire())
+        self.assertEqual(2, limiter.limit)
+
+    def test_latency_target(self):
+        """Tests slow requests count as overloaded"""
+        now = [0.0]
+        limiter = AdaptiveLimiter(
+            max_concurrency=4, latency_target=1, clock=lambda: now[0]
+        )
+        started = limiter.acquire()
+        now[0] = 2.0
+        limiter.release(started)
+        self.assertEqual(2, limiter.limit)
+
+    def test_caps_in_flight(self):
+        """Tests requests wait while the cap is reached"""
+        limiter = AdaptiveLimiter(max_concurrency=1)
+        started = limiter.acquire()
+        thread = threading.Thread(target=limiter.acquire)
+        thread.start()
+        time.sleep(0.01)
+        self.assertTrue(thread.is_alive())
+        limiter.release(started)
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(1, limiter.in_flight)
+
+    def test_rate(self):
+        """Tests requests per second are capped"""
+        limiter = AdaptiveLimiter(max_concurrency=4, rate=100, burst=1)
+        start = time.monotonic()
+        for _ in range(3):
+            with limiter.slot():
+                pass
+        self.assertGreaterEqual(time.monotonic() - start, 0.015)
+
+    def test_slot_exception(self):
+        """Tests a request that raises counts as overloaded"""
+        limiter = AdaptiveLimiter(max_concurrency=2)
+        with self.assertRaises(ConnectionError):
+            with limiter.slot():
+                raise ConnectionError()
+        self.assertEqual(1, limiter.limit)
+        self.assertEqual(0, limiter.in_flight)
+
+    def test_invalid(self):
+        """Tests invalid settings are rejected"""
+        for kwargs in (
+            {"min_concurrency": 0},
+            {"min_concurrency": 2, "max_concurrency": 1},
+            {"decrease_factor": 1},
+            {"rate": 0},
+        ):
+            with self.assertRaises(ValueError):
+                AdaptiveLimiter(**kwargs)
+
+    @patch("requests.Session.request")
+    def test_client_limiter(self, mock_request: MagicMock):
+        """Tests the client's requests go through its limiter"""
+        limiter = AdaptiveLimiter(max_concurrency=4)
+        client = SlimsClient(
+            url="http://fake_url", username="user", password="pw", limiter=limiter
+        )
+        mock_request.return_value = MagicMock(status_code=200)
+        client.db.slims_api.get("repo/1")
+        self.assertEqual(4, limiter.limit)
+        mock_request.return_value = MagicMock(status_code=429)
+        client.db.slims_api.get("repo/1")
+        self.assertEqual(2, limiter.limit)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,11 @@
 """ Tests methods in core module"""
 
+import hashlib
 import json
 import os
 import unittest
 from copy import deepcopy
+from datetime import datetime, timezone
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -11,13 +13,61 @@ from requests import Response
 from slims.criteria import conjunction, equals
 from slims.internal import Record, _SlimsApiException
 
-from aind_slims_api.core import SlimsAttachment, SlimsClient
+from aind_slims_api.core import SlimsAttachment, SlimsClient, _in_or_null
 from aind_slims_api.exceptions import SlimsRecordNotFound
+from aind_slims_api.models.behavior_session import SlimsBehaviorSession
 from aind_slims_api.models.unit import SlimsUnit
+from aind_slims_api.validation import ValidationReport
 
 RESOURCES_DIR = Path(os.path.dirname(os.path.realpath(__file__))) / "resources"
 
 
+def _fake_fetch(records: list[Record]):
+    """Side effect for Slims.fetch that filters and sorts records in memory.
+    Supports the criteria and sorting used by SlimsClient.scan_models"""
+
+    def to_ms(bound):
+        """Convert ISO 8601 bounds to ms timestamps, as SLIMS stores dates"""
+        if isinstance(bound, list):
+            return [to_ms(b) for b in bound]
+        if isinstance(bound, str):
+            return int(datetime.fromisoformat(bound).timestamp() * 10**3)
+        return bound
+
+    def matches(record: Record, criterion: dict) -> bool:
+        """Evaluate a criterion dictionary on a record"""
+        if "criteria" in criterion:
+            results = [matches(record, c) for c in criterion["criteria"]]
+            return {"and": all, "or": any}[criterion["operator"]](results)
+        value = record.column(criterion["fieldName"]).value
+        if value is None:
+            return criterion["operator"] == "isNull"
+        bound = criterion.get("value")
+        if isinstance(value, int):
+            bound = to_ms(bound)
+        return {
+            "equals": lambda: value == bound,
+            "notNull": lambda: True,
+            "isNull": lambda: False,
+            "greaterThan": lambda: value > bound,
+            "greaterOrEqual": lambda: value >= bound,
+            "lessThan": lambda: value < bound,
+            "inSet": lambda: value in bound,
+        }[criterion["operator"]]()
+
+    def fetch(table, criteria, sort=None, start=None, end=None):
+        """Fake Slims.fetch"""
+        matched = [r for r in records if matches(r, criteria.to_dict())]
+        for key in reversed(sort or []):
+            name = key.lstrip("-")
+            matched.sort(
+                key=lambda r: r.column(name).value, reverse=key.startswith("-")
+            )
+        return matched[start:end]
+
+    return fetch
+
+
 class TestSlimsClient(unittest.TestCase):
     """Tests methods in SlimsClient class"""
 
@@ -26,6 +76,7 @@ class TestSlimsClient(unittest.TestCase):
     example_fetch_mouse_response: list[Record]
     example_fetch_user_response: list[Record]
     example_fetch_attachment_response: list[Record]
+    example_fetch_session_response: list[Record]
 
     @classmethod
     def setUpClass(cls):
@@ -53,6 +104,9 @@ class TestSlimsClient(unittest.TestCase):
         cls.example_fetch_attachment_response = get_response(
             "example_fetch_attachments_response.json_entity"
         )
+        cls.example_fetch_session_response = get_response(
+            "example_fetch_behavior_session_content_events_response.json_entity"
+        )
 
     def test_rest_link(self):
         """Tests rest_link method with both queries and no queries."""
@@ -240,6 +294,26 @@ class TestSlimsClient(unittest.TestCase):
         self.assertEqual(updated_model, returned_model)
         mock_log.assert_called_once_with("SLIMS Update: Unit/31")
 
+    @patch("slims.slims.Slims.fetch_by_pk")
+    @patch("slims.internal.Record.update")
+    def test_update_model_payload(
+        self, mock_update: MagicMock, mock_fetch_by_pk: MagicMock
+    ):
+        """Tests update_model sends the fields asked for"""
+        record = self.example_fetch_unit_response[0]
+        mock_fetch_by_pk.return_value = record
+        mock_update.return_value = record
+        model = SlimsUnit.model_validate(record)
+        self.example_client.update_model(model, "name")
+        self.example_client.update_model(model, exclude={"json_entity", "pk"})
+        self.assertEqual(
+            [
+                {"unit_name": "picometer^3"},
+                {"unit_name": "picometer^3", "unit_abbreviation": "pm^3"},
+            ],
+            [c.args[0] for c in mock_update.mock_calls],
+        )
+
     @patch("slims.slims.Slims.fetch")
     def test_fetch_model_no_records(self, mock_slims_fetch: MagicMock):
         """Tests fetch_user method"""
@@ -247,6 +321,136 @@ class TestSlimsClient(unittest.TestCase):
         with self.assertRaises(SlimsRecordNotFound):
             self.example_client.fetch_model(SlimsUnit)
 
+    @patch("slims.slims.Slims.fetch")
+    def test_fetch_model_single_row(self, mock_slims_fetch: MagicMock):
+        """Tests fetch_model only requests one row unless end is given"""
+        mock_slims_fetch.return_value = self.example_fetch_unit_response[:1]
+        unit = self.example_client.fetch_model(SlimsUnit, name="picometer^3")
+        self.assertEqual(31, unit.pk)
+        self.example_client.fetch_model(SlimsUnit, start=5)
+        self.example_client.fetch_model(SlimsUnit, start=5, end=10)
+        self.assertEqual(
+            [(0, 1), (5, 6), (5, 10)],
+            [(c.kwargs["start"], c.kwargs["end"]) for c in mock_slims_fetch.mock_calls],
+        )
+
+    @patch("slims.slims.Slims.fetch")
+    def test_first(self, mock_slims_fetch: MagicMock):
+        """Tests first returns the first record, or None"""
+        mock_slims_fetch.return_value = self.example_fetch_unit_response[:1]
+        self.assertEqual(31, self.example_client.first(SlimsUnit, sort="pk").pk)
+        self.assertEqual(0, mock_slims_fetch.mock_calls[0].kwargs["start"])
+        self.assertEqual(1, mock_slims_fetch.mock_calls[0].kwargs["end"])
+        mock_slims_fetch.return_value = []
+        self.assertIsNone(self.example_client.first(SlimsUnit))
+
+    @patch("slims.slims.Slims.fetch")
+    def test_exists(self, mock_slims_fetch: MagicMock):
+        """Tests exists requests a single row"""
+        mock_slims_fetch.return_value = self.example_fetch_unit_response[:1]
+        self.assertTrue(self.example_client.exists(SlimsUnit, name="picometer^3"))
+        mock_slims_fetch.return_value = []
+        self.assertFalse(self.example_client.exists(SlimsUnit))
+        for c in mock_slims_fetch.mock_calls:
+            self.assertEqual((0, 1), (c.kwargs["start"], c.kwargs["end"]))
+
+    @patch("slims.slims.Slims.fetch")
+    def test_count_models(self, mock_slims_fetch: MagicMock):
+        """Tests count_models finds the count with single row probes"""
+        record = self.example_fetch_unit_response[0]
+        for count in (0, 1, 2, 5, 8, 1000):
+            mock_slims_fetch.reset_mock()
+            mock_slims_fetch.side_effect = lambda *args, **kwargs: (
+                [record] if kwargs["start"] < count else []
+            )
+            self.assertEqual(count, self.example_client.count_models(SlimsUnit))
+            for c in mock_slims_fetch.mock_calls:
+                self.assertEqual(c.kwargs["start"] + 1, c.kwargs["end"])
+            self.assertLessEqual(
+                mock_slims_fetch.call_count, 2 + 2 * count.bit_length()
+            )
+
+    def _example_units(self, count: int) -> list[Record]:
+        """Copies of the example unit record with pks 1 to count"""
+        records = []
+        for pk in range(1, count + 1):
+            json_entity = deepcopy(self.example_fetch_unit_response[0].json_entity)
+            json_entity["pk"] = pk
+            for column in json_entity["columns"]:
+                if column["name"] == "unit_pk":
+                    column["value"] = pk
+            records.append(Record(json_entity=json_entity, slims_api=None))
+        return records
+
+    @patch("slims.slims.Slims.fetch")
+    def test_scan_models(self, mock_slims_fetch: MagicMock):
+        """Tests scan_models reads every record once, paging by pk"""
+        mock_slims_fetch.side_effect = _fake_fetch(self._example_units(11))
+        pages = list(
+            self.example_client.scan_models(
+                SlimsUnit, partitions=3, max_workers=2, page_size=2
+            )
+        )
+        self.assertEqual(
+            list(range(1, 12)), sorted(unit.pk for page in pages for unit in page)
+        )
+        self.assertTrue(all(len(page) <= 2 for page in pages))
+        for c in mock_slims_fetch.mock_calls:
+            self.assertEqual(0, c.kwargs["start"])
+        # later pages continue after the last pk received
+        self.assertTrue(
+            any(
+                '"operator": "greaterThan"' in json.dumps(c.args[1].to_dict())
+                for c in mock_slims_fetch.mock_calls
+            )
+        )
+
+    @patch("slims.slims.Slims.fetch")
+    def test_scan_models_closed_early(self, mock_slims_fetch: MagicMock):
+        """Tests pending requests are cancelled when a scan is closed"""
+        mock_slims_fetch.side_effect = _fake_fetch(self._example_units(10))
+        scan = self.example_client.scan_models(SlimsUnit, partitions=2, page_size=1)
+        self.assertEqual(1, len(next(scan)))
+        scan.close()
+
+    @patch("slims.slims.Slims.fetch")
+    def test_scan_models_by_date(self, mock_slims_fetch: MagicMock):
+        """Tests scan_models partitions by a date field, including nulls"""
+        records = []
+        for pk, date in enumerate([1609488000000, None, 1609574400000, 1609660800000]):
+            json_entity = deepcopy(self.example_fetch_session_response[0].json_entity)
+            json_entity["pk"] = pk
+            for column in json_entity["columns"]:
+                if column["name"] == "cnvn_pk":
+                    column["value"] = pk
+                if column["name"] == "cnvn_cf_scheduledDate":
+                    column["value"] = date
+            records.append(Record(json_entity=json_entity, slims_api=None))
+        mock_slims_fetch.side_effect = _fake_fetch(records)
+        sessions = [
+            session
+            for page in self.example_client.scan_models(
+                SlimsBehaviorSession, key="date", partitions=2
+            )
+            for session in page
+        ]
+        self.assertEqual([0, 1, 2, 3], sorted(s.pk for s in sessions))
+
+    @patch("slims.slims.Slims.fetch")
+    def test_scan_models_empty(self, mock_slims_fetch: MagicMock):
+        """Tests scan_models with no records"""
+        mock_slims_fetch.return_value = []
+        self.assertEqual([], list(self.example_client.scan_models(SlimsUnit)))
+
+    @patch("slims.slims.Slims.fetch")
+    def test_scan_models_invalid(self, mock_slims_fetch: MagicMock):
+        """Tests scan_models rejects invalid arguments"""
+        mock_slims_fetch.side_effect = _fake_fetch(self._example_units(2))
+        with self.assertRaises(ValueError):
+            next(self.example_client.scan_models(SlimsUnit, partitions=0))
+        with self.assertRaises(ValueError):
+            next(self.example_client.scan_models(SlimsUnit, key="name"))
+
     def test_fetch_attachments(self):
         """Tests fetch_attachments method success."""
         # slims_api is dynamically added to slims client
@@ -267,6 +471,37 @@ class TestSlimsClient(unittest.TestCase):
             )
             assert len(attachments) == 1
 
+    def test_fetch_attachments_many(self):
+        """Tests fetch_attachments_many fetches the attachments of each
+        record once"""
+        units = [
+            SlimsUnit(unit_name=name, unit_pk=pk)
+            for name, pk in [("a", 2), ("b", 1), ("a", 2)]
+        ]
+        with patch.object(
+            self.example_client.db.slims_api,
+            "get_entities",
+            side_effect=lambda url: (
+                self.example_fetch_attachment_response if url.endswith("/2") else []
+            ),
+        ) as mock_get_entities:
+            attachments = self.example_client.fetch_attachments_many(units)
+        self.assertEqual([2, 1], list(attachments))
+        self.assertEqual([1, 0], [len(a) for a in attachments.values()])
+        self.assertEqual(2, mock_get_entities.call_count)
+        mock_get_entities.assert_any_call("attachment/Unit/1")
+
+    def test_fetch_attachments_many_invalid(self):
+        """Tests fetch_attachments_many rejects records it cannot key by pk"""
+        with self.assertRaises(ValueError):
+            self.example_client.fetch_attachments_many(
+                [SlimsBehaviorSession(cnvn_pk=None)]
+            )
+        with self.assertRaises(TypeError):
+            self.example_client.fetch_attachments_many(
+                [SlimsUnit(unit_name="a", unit_pk=1), SlimsBehaviorSession(cnvn_pk=2)]
+            )
+
     def test_fetch_attachment_content(self):
         """Tests fetch_attachment_content method success."""
         # slims_api is dynamically added to slims client
@@ -282,6 +517,116 @@ class TestSlimsClient(unittest.TestCase):
                 )
             )
 
+    @patch("slims.slims.Slims.fetch")
+    def test_add_attachment(self, mock_slims_fetch: MagicMock):
+        """Tests add_attachment streams the contents, and returns the added
+        attachment"""
+        mock_slims_fetch.return_value = self.example_fetch_attachment_response
+        response = Response()
+        response.status_code = 201
+        response.headers["Location"] = "http://fake_url/rest/repo/1"
+        unit = SlimsUnit.model_validate(self.example_fetch_unit_response[0])
+        with patch.object(
+            self.example_client.db.slims_api, "post_stream", return_value=response
+        ) as mock_post:
+            attachment = self.example_client.add_attachment(
+                unit, iter([b"a", b"bc"]), name="test.txt"
+            )
+        self.assertEqual(self.example_fetch_attachment_response[0].pk(), attachment.pk)
+        self.assertEqual(
+            {
+                "attm_name": "test.txt",
+                "atln_recordPk": 31,
+                "atln_recordTable": "Unit",
+                "contents": "YWJj",
+            },
+            json.loads(b"".join(mock_post.call_args.args[1])),
+        )
+        self.assertIn(
+            '"attm_pk"', json.dumps(mock_slims_fetch.call_args.args[1].to_dict())
+        )
+
+    def test_add_attachment_errors(self):
+        """Tests add_attachment errors"""
+        unit = SlimsUnit.model_validate(self.example_fetch_unit_response[0])
+        with self.assertRaises(ValueError):
+            self.example_client.add_attachment(
+                unit.model_copy(update={"pk": None}), b""
+            )
+        with self.assertRaises(ValueError):
+            self.example_client.add_attachment(unit, b"")
+        response = Response()
+        response.status_code = 500
+        response._content = b"Server error"
+        with patch.object(
+            self.example_client.db.slims_api, "post_stream", return_value=response
+        ):
+            with self.assertRaises(_SlimsApiException):
+                self.example_client.add_attachment(
+                    unit, b"", name="test.txt", deduplicate=False
+                )
+
+    def test_add_attachment_deduplicate(self):
+        """Tests contents a record already has are not uploaded again"""
+        entity = deepcopy(self.example_fetch_attachment_response[0].json_entity)
+        for column in entity["columns"]:
+            if column["name"] == "attm_hash":
+                column["value"] = hashlib.md5(b"abc").hexdigest()
+        unit = SlimsUnit.model_validate(self.example_fetch_unit_response[0])
+        with (
+            patch.object(
+                self.example_client.db.slims_api, "get_entities", return_value=[entity]
+            ),
+            patch.object(self.example_client.db.slims_api, "post_stream") as mock_post,
+        ):
+            attachment = self.example_client.add_attachment(
+                unit, b"abc", name="test.txt"
+            )
+        mock_post.assert_not_called()
+        self.assertEqual(entity["pk"], attachment.pk)
+
+    def test_fetch_attachment_content_cached(self):
+        """Tests attachments with the same hash share one download, and
+        failed downloads are not cached"""
+        response = Response()
+        response.status_code = 200
+        response._content = b"{}"
+        attachments = [
+            SlimsAttachment(attm_name="a", attm_pk=pk, attm_hash="h") for pk in (1, 2)
+        ]
+        with patch.object(
+            self.example_client.db.slims_api, "get", return_value=response
+        ) as mock_get:
+            contents = [
+                self.example_client.fetch_attachment_content(a).json()
+                for a in attachments
+            ]
+        self.assertEqual([{}, {}], contents)
+        mock_get.assert_called_once_with("repo/1")
+        failed = Response()
+        failed.status_code = 404
+        attachment = SlimsAttachment(attm_name="a", attm_pk=3, attm_hash="x")
+        with patch.object(
+            self.example_client.db.slims_api, "get", return_value=failed
+        ) as mock_get:
+            self.example_client.fetch_attachment_content(attachment)
+            self.example_client.fetch_attachment_content(attachment)
+        self.assertEqual(2, mock_get.call_count)
+
+    def test_add_attachments(self):
+        """Tests add_attachments adds each attachment, in order"""
+        unit = SlimsUnit.model_validate(self.example_fetch_unit_response[0])
+        with patch.object(
+            self.example_client,
+            "add_attachment",
+            side_effect=lambda record, source, chunk_size, deduplicate: source,
+        ) as mock_add:
+            added = self.example_client.add_attachments(
+                [(unit, "a.txt"), (unit, "b.txt")], max_workers=2
+            )
+        self.assertEqual(["a.txt", "b.txt"], added)
+        self.assertEqual(2, mock_add.call_count)
+
     @patch("logging.Logger.error")
     def test__validate_model_invalid_model(self, mock_log: MagicMock):
         """Tests _validate_model method with one invalid model and one valid
@@ -306,6 +651,167 @@ class TestSlimsClient(unittest.TestCase):
         assert len(validated) == 1
         assert mock_log.call_count == 1
 
+    @patch("logging.Logger.error")
+    @patch("slims.slims.Slims.fetch")
+    def test_fetch_models_report(self, mock_fetch: MagicMock, mock_log: MagicMock):
+        """Tests validation failures are reported once per call"""
+        invalid_data = deepcopy(self.example_fetch_unit_response[0].json_entity)
+        invalid_data["columns"][0]["value"] = 1
+        invalid = Record(json_entity=invalid_data, slims_api=None)
+        pages = {0: [invalid, self.example_fetch_unit_response[1]], 2: [invalid]}
+        mock_fetch.side_effect = lambda *args, **kwargs: pages[kwargs["start"]]
+        report = ValidationReport()
+        self.example_client.fetch_models(SlimsUnit, start=0, report=report)
+        mock_log.assert_called_once()
+        list(
+            self.example_client.fetch_model_pages(SlimsUnit, page_size=2, report=report)
+        )
+        self.assertEqual(2, mock_log.call_count)
+        self.assertEqual(3, report.failed)
+        self.assertEqual(2, report.validated)
+        self.assertEqual([31, 31, 31], report.sample_pks)
+
+    @patch("slims.slims.Slims.fetch")
+    def test_fetch_model_pages(self, mock_slims_fetch: MagicMock):
+        """Tests fetch_model_pages requests pages concurrently, in order"""
+        pages = {
+            0: self.example_fetch_unit_response[:1],
+            1: self.example_fetch_unit_response[1:],
+            2: [],
+            3: [],
+        }
+        mock_slims_fetch.side_effect = lambda *args, **kwargs: pages[kwargs["start"]]
+        validated = list(
+            self.example_client.fetch_model_pages(SlimsUnit, page_size=1, max_workers=2)
+        )
+        self.assertEqual([[31], [15]], [[m.pk for m in page] for page in validated])
+        # the request for the 4th page may be cancelled before it is sent
+        self.assertEqual(
+            [(0, 1), (1, 2), (2, 3)],
+            sorted(
+                (c.kwargs["start"], c.kwargs["end"])
+                for c in mock_slims_fetch.mock_calls
+            )[:3],
+        )
+        self.assertEqual("unit_pk", mock_slims_fetch.mock_calls[0].kwargs["sort"])
+
+    def test_fetch_model_pages_invalid(self):
+        """Tests fetch_model_pages rejects non-positive sizes"""
+        with self.assertRaises(ValueError):
+            next(self.example_client.fetch_model_pages(SlimsUnit, page_size=0))
+
+    def test_fetch_entities(self):
+        """Tests fetch_entities requests json entities through the transport"""
+        client = SlimsClient(url="http://fake_url", username="user", password="pw")
+        entities = [r.json_entity for r in self.example_fetch_unit_response]
+        client.db.slims_api.get_json = MagicMock(return_value={"entities": entities})
+        response = client.fetch_entities("Unit", unit_name="x", start=0, end=2)
+        self.assertEqual(entities, response)
+        client.db.slims_api.get_json.assert_called_once_with(
+            "Unit/advanced",
+            {
+                "sortBy": [],
+                "startRow": 0,
+                "endRow": 2,
+                "criteria": conjunction().add(equals("unit_name", "x")).to_dict(),
+            },
+        )
+
+    @patch("slims.slims.Slims.fetch")
+    def test_fetch_models_raw_entities(self, mock_slims_fetch: MagicMock):
+        """Tests models validated from json entities match those validated
+        from slims Records"""
+        mock_slims_fetch.return_value = self.example_fetch_session_response
+        client = SlimsClient(
+            url="http://fake_url", username="user", password="pw", raw_entities=True
+        )
+        entities = [r.json_entity for r in self.example_fetch_session_response]
+        client.db.slims_api.get_json = MagicMock(return_value={"entities": entities})
+        self.assertEqual(
+            self.example_client.fetch_models(SlimsBehaviorSession),
+            client.fetch_models(SlimsBehaviorSession),
+        )
+        mock_slims_fetch.assert_called_once()
+
+    @patch("slims.slims.Slims.fetch")
+    def test_scan_models_raw_entities(self, mock_slims_fetch: MagicMock):
+        """Tests scan_models pages by pk when validating json entities"""
+        fake_fetch = _fake_fetch(self._example_units(5))
+        mock_slims_fetch.side_effect = fake_fetch
+        client = SlimsClient(
+            url="http://fake_url", username="user", password="pw", raw_entities=True
+        )
+        with patch.object(
+            client,
+            "_get_entities",
+            side_effect=lambda *args, **kwargs: [
+                r.json_entity for r in fake_fetch(*args, **kwargs)
+            ],
+        ):
+            pages = list(client.scan_models(SlimsUnit, partitions=2, page_size=2))
+        self.assertEqual(
+            [1, 2, 3, 4, 5], sorted(unit.pk for page in pages for unit in page)
+        )
+
+    @patch("slims.slims.Slims.fetch")
+    def test_upsert_models(self, mock_slims_fetch: MagicMock):
+        """Tests upsert_models only adds and updates what is needed"""
+        changed = deepcopy(self.example_fetch_session_response[0].json_entity)
+        for column in changed["columns"]:
+            if column["name"] == "cnvn_pk":
+                column["value"] = 65
+            if column["name"] == "cnvn_cf_scheduledDate":
+                column["value"] = 1609574400000
+        records = self.example_fetch_session_response + [
+            Record(json_entity=changed, slims_api=None)
+        ]
+        mock_slims_fetch.side_effect = _fake_fetch(records)
+        unchanged = SlimsBehaviorSession.model_validate(records[0])
+        updated = SlimsBehaviorSession.model_validate(records[2]).model_copy(
+            update={"notes": "New", "pk": None}
+        )
+        added = unchanged.model_copy(
+            update={"date": datetime(2021, 1, 3, tzinfo=timezone.utc), "pk": None}
+        )
+        client = self.example_client
+        with (
+            patch.object(client, "add_model") as mock_add,
+            patch.object(client, "update_model") as mock_update,
+            self.assertLogs("aind_slims_api.core", "WARNING"),
+        ):
+            result = client.upsert_models([unchanged, updated, added], chunk_size=2)
+        self.assertEqual(
+            [unchanged, mock_update.return_value, mock_add.return_value], result
+        )
+        mock_add.assert_called_once_with(added)
+        mock_update.assert_called_once_with(
+            updated.model_copy(update={"pk": 65}), "notes"
+        )
+        self.assertEqual(2, mock_slims_fetch.call_count)
+
+    def test_upsert_models_invalid(self):
+        """Tests upsert_models rejects models it cannot match"""
+        client = self.example_client
+        session = SlimsBehaviorSession(cnvn_cf_task="a")
+        self.assertEqual([], client.upsert_models([]))
+        with self.assertRaises(TypeError):
+            client.upsert_models([session, SlimsUnit(unit_name="g", unit_pk=1)])
+        with self.assertRaises(ValueError):
+            client.upsert_models([SlimsUnit(unit_name="g", unit_pk=1)])
+        with self.assertRaises(ValueError):
+            client.upsert_models([session, session.model_copy()], key="task")
+
+    def test_in_or_null(self):
+        """Tests key values that may be null are matched"""
+        field = SlimsBehaviorSession.task
+        self.assertEqual(
+            field.is_null().to_dict(), _in_or_null(field, [None]).to_dict()
+        )
+        self.assertEqual(
+            (field.in_(["a"]) | field.is_null()).to_dict(),
+            _in_or_null(field, ["a", None, "a"]).to_dict(),
+        )
+
     def test_resolve_model_alias_invalid(self):
         """Tests resolve_model_alias method raises expected error with an
         invalid alias name.
@@ -0,0 +1,207 @@
+"""Tests methods in expressions module"""
+
+import unittest
+import warnings
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from pydantic import Field
+from slims.criteria import Criterion, conjunction, equals, greater_than_or_equal
+
+from aind_slims_api.core import SlimsClient
+from aind_slims_api.models import SlimsBehaviorSession, SlimsMouseContent
+from aind_slims_api.models.base import SlimsBaseModel
+from aind_slims_api.models.expressions import (
+    Combination,
+    ModelField,
+    Predicate,
+)
+
+
+class TestFieldExpressions(unittest.TestCase):
+    """Tests building criteria from model fields"""
+
+    def test_model_field(self):
+        """Tests fields accessed on the class resolve to a ModelField"""
+        field = SlimsMouseContent.barcode
+        self.assertIsInstance(field, ModelField)
+        self.assertEqual("cntn_barCode", field.alias)
+        self.assertEqual("SlimsMouseContent.barcode", repr(field))
+        # fields without an alias, and other names, are not resolved
+        with self.assertRaises(AttributeError):
+            SlimsBehaviorSession.cnvn_fk_contentEventType
+        with self.assertRaises(AttributeError):
+            SlimsBehaviorSession.not_a_field
+        with self.assertRaises(ValueError):
+            ModelField(SlimsBehaviorSession, "json_entity")
+
+    def test_instance_access(self):
+        """Tests instances still return field values"""
+        session = SlimsBehaviorSession(cnvn_cf_task="task")
+        self.assertEqual("task", session.task)
+        session.task = "other"
+        self.assertEqual("other", session.task)
+
+    def test_subclass_fields(self):
+        """Tests subclasses can redefine fields without warnings"""
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+
+            class Subclass(SlimsMouseContent):
+                """Redefines barcode"""
+
+                barcode: str = Field("", alias="cntn_id")
+
+        self.assertEqual("cntn_id", Subclass.barcode.alias)
+        self.assertEqual("", Subclass.model_fields["barcode"].default)
+
+    def test_comparisons(self):
+        """Tests comparison operators compile to slims criteria"""
+        field = SlimsBehaviorSession.mouse_pk
+        self.assertEqual(
+            {"fieldName": "cnvn_fk_content", "operator": "equals", "value": 0},
+            (field == 0).to_dict(),
+        )
+        expected = {
+            "iNotEqual": field != 1,
+            "lessThan": field < 1,
+            "lessOrEqual": field <= 1,
+            "greaterThan": field > 1,
+            "greaterOrEqual": field >= 1,
+            "iContains": field.contains(1),
+            "iStartsWith": field.startswith(1),
+            "iEndsWith": field.endswith(1),
+            "iEquals": field.iequals(1),
+        }
+        for operator, expression in expected.items():
+            self.assertEqual(
+                {"fieldName": "cnvn_fk_content", "operator": operator, "value": 1},
+                expression.to_dict(),
+            )
+
+    def test_null_and_sets(self):
+        """Tests null checks and set membership"""
+        field = SlimsBehaviorSession.task
+        self.assertEqual("isNull", (field == None).to_dict()["operator"])  # noqa
+        self.assertEqual("notNull", (field != None).to_dict()["operator"])  # noqa
+        self.assertEqual(
+            {"fieldName": "cnvn_cf_task", "operator": "inSet", "value": ["a", "b"]},
+            field.in_(("a", "b")).to_dict(),
+        )
+        self.assertEqual(
+            {"fieldName": "cnvn_cf_task", "operator": "notInSet", "value": ["a"]},
+            field.not_in(["a"]).to_dict(),
+        )
+
+    def test_datetimes(self):
+        """Tests datetimes are converted, also in sets and ranges"""
+        field = SlimsBehaviorSession.date
+        t0, t1 = datetime(2024, 1, 1), datetime(2024, 2, 1)
+        self.assertEqual(
+            {
+                "fieldName": "cnvn_cf_scheduledDate",
+                "operator": "betweenInclusive",
+                "start": "2024-01-01T00:00:00",
+                "end": "2024-02-01T00:00:00",
+            },
+            field.between(t0, t1).to_dict(),
+        )
+        self.assertEqual(["2024-01-01T00:00:00"], field.in_([t0]).to_dict()["value"])
+        self.assertEqual(
+            greater_than_or_equal("cnvn_cf_scheduledDate", t0).to_dict(),
+            (field >= t0).to_dict(),
+        )
+
+    def test_combinations(self):
+        """Tests &, | and ~ compile to junctions, flattening nested ones"""
+        a = SlimsBehaviorSession.task == "a"
+        b = SlimsBehaviorSession.task_stage == "b"
+        c = SlimsBehaviorSession.mouse_pk == 1
+        expression = (a & b & c) | ~a
+        self.assertIsInstance(expression, Combination)
+        self.assertEqual(
+            {
+                "operator": "or",
+                "criteria": [
+                    {
+                        "operator": "and",
+                        "criteria": [a.to_dict(), b.to_dict(), c.to_dict()],
+                    },
+                    {"operator": "not", "criteria": [a.to_dict()]},
+                ],
+            },
+            expression.to_dict(),
+        )
+        self.assertIn("Combination('and'", repr(a & b))
+        self.assertIn("Predicate(SlimsBehaviorSession.task", repr(a))
+        with self.assertRaises(TypeError):
+            a & equals("cnvn_cf_task", "a")
+
+    def test_no_truth_value(self):
+        """Tests expressions cannot be used as booleans, e.g. by in, and or
+        not"""
+        expression = SlimsMouseContent.barcode == "1"
+        with self.assertRaises(TypeError):
+            bool(expression)
+        with self.assertRaises(TypeError):
+            SlimsMouseContent.barcode in ["1", "2"]
+        with self.assertRaises(TypeError):
+            expression and SlimsMouseContent.barcode == "2"
+
+    def test_compile_once(self):
+        """Tests expressions are compiled to slims criteria once"""
+        expression = (SlimsMouseContent.barcode == "1") | (
+            SlimsMouseContent.barcode == "2"
+        )
+        self.assertIsInstance(expression, Criterion)
+        self.assertIs(expression.compile(), expression.compile())
+
+    def test_applies_to(self):
+        """Tests expressions know which models they apply to"""
+        expression = SlimsMouseContent.barcode == "1"
+        self.assertIsInstance(expression, Predicate)
+        self.assertTrue(expression.applies_to(SlimsMouseContent))
+        self.assertFalse(expression.applies_to(SlimsBaseModel))
+        self.assertFalse(
+            (expression & (SlimsBehaviorSession.task == "a")).applies_to(
+                SlimsMouseContent
+            )
+        )
+
+
+class TestFetchWithExpressions(unittest.TestCase):
+    """Tests fetching models with field expressions"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create a client"""
+        cls.example_client = SlimsClient(
+            url="http://fake_url", username="user", password="pass"
+        )
+
+    @patch("slims.slims.Slims.fetch")
+    def test_fetch_models(self, mock_fetch: MagicMock):
+        """Tests expressions are pushed down to SLIMS with base filters"""
+        mock_fetch.return_value = []
+        t0 = datetime(2024, 1, 1)
+        self.example_client.fetch_models(
+            SlimsBehaviorSession, SlimsBehaviorSession.date >= t0, mouse_pk=1
+        )
+        expected = (
+            conjunction()
+            .add(greater_than_or_equal("cnvn_cf_scheduledDate", t0))
+            .add(equals("cnvt_name", "Behavior Session"))
+            .add(equals("cnvn_fk_content", 1))
+        )
+        self.assertEqual(expected.to_dict(), mock_fetch.mock_calls[0].args[1].to_dict())
+
+    def test_fetch_models_wrong_model(self):
+        """Tests expressions on another model are rejected"""
+        with self.assertRaises(ValueError):
+            self.example_client.fetch_models(
+                SlimsBehaviorSession, SlimsMouseContent.barcode == "1"
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
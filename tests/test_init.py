@@ -0,0 +1,70 @@
+"""Tests lazy attributes and import time of the package"""
+
+import subprocess
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+import aind_slims_api
+
+# Modules that must not be imported by a bare `import aind_slims_api`
+HEAVY_MODULES = ("slims", "pydantic", "pydantic_settings", "requests")
+
+
+def _import_time_profile() -> dict[str, int]:
+    """Import the package in a fresh interpreter with -X importtime and
+    return the cumulative import time (us) of every module it loaded"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import aind_slims_api"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            profile[module.strip()] = int(cumulative)
+    return profile
+
+
+class TestInit(unittest.TestCase):
+    """Tests package level lazy attributes"""
+
+    def test_import_does_not_load_dependencies(self):
+        """Benchmark guard: importing the package stays cheap"""
+        profile = _import_time_profile()
+        self.assertIn("aind_slims_api", profile)
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, profile)
+
+    def test_lazy_attributes(self):
+        """Tests config and SlimsClient resolve on first access"""
+        from aind_slims_api.configuration import AindSlimsApiSettings
+        from aind_slims_api.core import SlimsClient
+
+        self.assertIsInstance(aind_slims_api.config, AindSlimsApiSettings)
+        self.assertIs(aind_slims_api.SlimsClient, SlimsClient)
+        self.assertIn("SlimsClient", dir(aind_slims_api))
+
+    def test_unknown_attribute(self):
+        """Tests unknown attributes still raise AttributeError"""
+        with self.assertRaises(AttributeError):
+            aind_slims_api.not_an_attribute
+
+    @patch("aind_slims_api.core.Slims")
+    def test_client_connects_on_first_use(self, mock_slims: MagicMock):
+        """Tests SlimsClient defers connecting until db is accessed"""
+        from aind_slims_api.core import SlimsClient
+
+        client = SlimsClient(url="http://fake_url", username="user", password="pw")
+        mock_slims.assert_not_called()
+        self.assertIs(mock_slims.return_value, client.db)
+        self.assertIs(client.db, client.db)
+        mock_slims.assert_called_once_with("slims", "http://fake_url", "user", "pw")
+
+
+if __name__ == "__main__":
+    unittest.main()
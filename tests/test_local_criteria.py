@@ -0,0 +1,207 @@
+"""Tests methods in local_criteria module"""
+
+import unittest
+from datetime import datetime, timezone
+
+from slims.criteria import (
+    between_inclusive,
+    conjunction,
+    contains,
+    disjunction,
+    ends_with,
+    equals,
+    equals_ignore_case,
+    greater_than,
+    greater_than_or_equal,
+    is_not,
+    is_not_null,
+    is_not_one_of,
+    is_null,
+    is_one_of,
+    less_than,
+    less_than_or_equal,
+    not_equals,
+    starts_with,
+)
+
+from aind_slims_api.exceptions import SlimsUnsupportedCriterion
+from aind_slims_api.local_criteria import LocalTable, evaluate
+from aind_slims_api.models.behavior_session import SlimsBehaviorSession
+from aind_slims_api.models.user import SlimsUser
+
+
+def _entity(**columns) -> dict:
+    """A json entity with columns"""
+    return {"columns": [{"name": k, "value": v} for k, v in columns.items()]}
+
+
+class TestEvaluate(unittest.TestCase):
+    """Tests evaluate function"""
+
+    def test_operators(self):
+        """Tests each operator on a row of json entity columns"""
+        row = {"name": "Mouse", "pk": 5}
+        for criterion, expected in [
+            (equals("pk", 5), True),
+            (equals_ignore_case("name", "MOUSE"), True),
+            (not_equals("name", "MOUSE"), False),
+            (is_one_of("pk", [4, 5]), True),
+            (is_not(is_one_of("pk", [4, 5])), False),
+            (is_not_one_of("pk", [4]), True),
+            (less_than("pk", 5), False),
+            (less_than_or_equal("pk", 5), True),
+            (greater_than("pk", 4), True),
+            (greater_than_or_equal("pk", 6), False),
+            (between_inclusive("pk", 5, 6), True),
+            (contains("name", "OUS"), True),
+            (starts_with("name", "mo"), True),
+            (ends_with("name", "x"), False),
+            (is_null("name"), False),
+            (is_not_null("name"), True),
+        ]:
+            with self.subTest(criterion=criterion):
+                self.assertEqual(expected, evaluate(criterion, row))
+
+    def test_dates(self):
+        """Tests ISO dates in criteria compare to ms timestamps, and other
+        strings do not"""
+        date = datetime(2024, 1, 2, tzinfo=timezone.utc)
+        row = {"date": round(date.timestamp() * 1000)}
+        self.assertTrue(evaluate(equals("date", date.isoformat()), row))
+        self.assertTrue(evaluate(less_than("date", "2024-01-03T00:00:00+00:00"), row))
+        with self.assertRaises(SlimsUnsupportedCriterion):
+            evaluate(less_than("date", "tomorrow"), row)
+
+    def test_null_semantics(self):
+        """Tests comparisons with missing values are unknown, so neither they
+        nor their negation match"""
+        row = {"pk": None, "name": "a"}
+        self.assertFalse(evaluate(equals("pk", 1), row))
+        self.assertFalse(evaluate(is_not(equals("pk", 1)), row))
+        self.assertTrue(evaluate(is_null("pk"), row))
+        self.assertFalse(evaluate(conjunction().add(equals("pk", 1)), row))
+        self.assertFalse(
+            evaluate(conjunction().add(equals("name", "b")).add(equals("pk", 1)), row)
+        )
+        self.assertTrue(
+            evaluate(disjunction().add(equals("pk", 1)).add(equals("name", "a")), row)
+        )
+        self.assertFalse(evaluate(disjunction().add(equals("pk", 1)), row))
+        self.assertFalse(evaluate(disjunction().add(equals("name", "b")), row))
+        self.assertTrue(evaluate(conjunction().add(equals("name", "a")), row))
+
+    def test_unsupported(self):
+        """Tests criteria that cannot be evaluated exactly are rejected"""
+        row = {"pk": 1, "trainers": [1]}
+        for criterion in [
+            equals("missing", 1),
+            {"fieldName": "pk", "operator": "sameDay", "value": 1},
+            equals("trainers", 1),
+            less_than("pk", "a"),
+            {"operator": "xor", "criteria": []},
+        ]:
+            with self.subTest(criterion=criterion):
+                with self.assertRaises(SlimsUnsupportedCriterion):
+                    evaluate(criterion, row)
+
+
+class TestLocalTable(unittest.TestCase):
+    """Tests LocalTable class"""
+
+    def setUp(self):
+        """Table of json entities, indexed by pk and name"""
+        self.records = [
+            _entity(pk=3, name="c", group=1),
+            _entity(pk=1, name="a", group=2),
+            _entity(pk=2, name=None, group=1),
+            _entity(pk=4, name="b", group=None),
+        ]
+        self.table = LocalTable(self.records, index=["pk", "name"])
+
+    def _pks(self, criterion, **kwargs) -> list[int]:
+        """pks of records filtered by criterion"""
+        return [
+            r["columns"][0]["value"] for r in self.table.filter(criterion, **kwargs)
+        ]
+
+    def test_hash_index(self):
+        """Tests equals and inSet are answered from the hash index"""
+        self.assertEqual([1], self._pks(equals("pk", 1)))
+        self.assertEqual([3, 1], self._pks(is_one_of("name", ["a", "c"])))
+        self.assertEqual([], self._pks(equals("pk", 9)))
+        self.assertEqual([], self._pks(equals("pk", None)))
+        self.assertEqual(
+            [3], self._pks(conjunction().add(equals("group", 1)).add(equals("pk", 3)))
+        )
+        self.assertEqual(
+            [3, 2],
+            self._pks(conjunction().add(equals("group", 1)).add(is_not_null("pk"))),
+        )
+        self.assertEqual(
+            [], self._pks({"fieldName": "pk", "operator": "inSet", "value": [[1]]})
+        )
+
+    def test_sorted_index(self):
+        """Tests range criteria are answered from the sorted index"""
+        self.assertEqual([1], self._pks(less_than("pk", 2)))
+        self.assertEqual([1, 2], self._pks(less_than_or_equal("pk", 2), sort="pk"))
+        self.assertEqual([4], self._pks(greater_than("pk", 3)))
+        self.assertEqual([3, 4], self._pks(greater_than_or_equal("pk", 3)))
+        self.assertEqual([3, 2], self._pks(between_inclusive("pk", 2, 3)))
+        with self.assertRaises(SlimsUnsupportedCriterion):
+            self.table.filter(less_than("pk", "a"))
+
+    def test_unindexed(self):
+        """Tests columns without a usable index are scanned"""
+        table = LocalTable(
+            [_entity(pk=1, value=None), _entity(pk="a", value=None)],
+            index=["pk", "value"],
+        )
+        self.assertEqual(1, len(table.filter(equals("pk", "a"))))
+        self.assertEqual([], table.filter(equals("value", 1)))
+        self.assertEqual([], table.filter(less_than("value", 1)))
+        self.assertEqual([], LocalTable([]).filter(equals("pk", 1)))
+
+    def test_sort_and_page(self):
+        """Tests sorting by columns, descending and with nulls last, and
+        paging"""
+        self.assertEqual([1, 4, 3, 2], self._pks(is_not_null("pk"), sort="name"))
+        self.assertEqual([3, 4, 1, 2], self._pks(is_not_null("pk"), sort=["-name"]))
+        self.assertEqual(
+            [3, 2, 1, 4], self._pks(is_not_null("pk"), sort=["group", "-pk"])
+        )
+        self.assertEqual(
+            [4, 3], self._pks(is_not_null("pk"), sort="-pk", start=0, end=2)
+        )
+        with self.assertRaises(SlimsUnsupportedCriterion):
+            self.table.filter(is_not_null("pk"), sort="missing")
+        table = LocalTable([_entity(pk=1), _entity(pk="a")])
+        with self.assertRaises(SlimsUnsupportedCriterion):
+            table.filter(is_not_null("pk"), sort="pk")
+
+    def test_models(self):
+        """Tests models are filtered by alias, with dates as timestamps and
+        list fields unsupported"""
+        users = [
+            SlimsUser(user_pk=1, user_userName="a"),
+            SlimsUser(user_pk=2, user_userName="b"),
+        ]
+        table = LocalTable(users, index=["user_userName"])
+        self.assertEqual([users[1]], table.filter(SlimsUser.username == "b"))
+        sessions = [
+            SlimsBehaviorSession(
+                cnvn_pk=1, cnvn_cf_scheduledDate=datetime(2024, 1, 1), trainers=[1]
+            ),
+            SlimsBehaviorSession(cnvn_pk=2, cnvn_cf_scheduledDate=datetime(2024, 2, 1)),
+        ]
+        table = LocalTable(sessions, index=["cnvn_cf_scheduledDate"])
+        self.assertEqual(
+            [sessions[1]],
+            table.filter(SlimsBehaviorSession.date > datetime(2024, 1, 15)),
+        )
+        with self.assertRaises(SlimsUnsupportedCriterion):
+            table.filter(equals("cnvn_cf_fk_trainer", 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
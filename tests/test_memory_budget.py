@@ -0,0 +1,134 @@
+"""Tests memory used per record when fetching, validating and dumping
+models, against the budgets in resources/memory_budgets.json.
+
+Budgets are bytes per record, peak and retained, measured with tracemalloc
+over synthetic rows copied from a fixture. Fetches are served from a json
+response body at the HTTP session, so decoding it and building slims Records
+are measured along with validation. Their retained memory is measured once
+json_entity is dropped from the models, so that it is the models' own.
+When a change is expected to alter them, update the budgets from the
+measured values in the failure message, leaving headroom.
+
+The default run uses a few hundred rows. Set SLIMS_MEMORY_BUDGET_ROWS, e.g.
+to 10000 or 100000, to check the budgets over a large fetch, which takes
+tens of seconds and GBs of memory:
+
+    SLIMS_MEMORY_BUDGET_ROWS=10000 python -m unittest tests.test_memory_budget
+"""
+
+import gc
+import json
+import os
+import tracemalloc
+import unittest
+from pathlib import Path
+from typing import Any, Callable
+from unittest.mock import patch
+
+from requests import Response
+
+from aind_slims_api.core import SlimsClient
+from aind_slims_api.models.base import SlimsBaseModel
+from aind_slims_api.models.mouse import SlimsMouseContent
+
+RESOURCES_DIR = Path(os.path.dirname(os.path.realpath(__file__))) / "resources"
+
+
+def _synthetic_entities(template: dict, rows: int) -> list[dict]:
+    """Copies of a json entity, each with its own pk and barcode"""
+    text = json.dumps(template)
+    entities = []
+    for pk in range(1, rows + 1):
+        entity = json.loads(text)
+        entity["pk"] = pk
+        for column in entity["columns"]:
+            if column["name"] == "cntn_pk":
+                column["value"] = pk
+            elif column["name"] == "cntn_barCode":
+                column["value"] = f"{pk:08d}"
+        entities.append(entity)
+    return entities
+
+
+def _without_json_entity(models: list[SlimsBaseModel]) -> list[SlimsBaseModel]:
+    """models, with json_entity dropped"""
+    for model in models:
+        model.json_entity = None
+    return models
+
+
+def _measure(operation: Callable[[], Any]) -> tuple[Any, int, int]:
+    """Result of operation, and the bytes it allocated that are still
+    retained, and at peak"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = operation()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, retained, peak
+
+
+class TestMemoryBudget(unittest.TestCase):
+    """Tests memory per record against recorded budgets"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Load budgets, and synthetic mouse records"""
+        with open(RESOURCES_DIR / "memory_budgets.json") as f:
+            budgets = json.load(f)
+        with open(RESOURCES_DIR / budgets["fixture"]) as f:
+            template = json.load(f)[0]
+        cls.rows = int(os.environ.get("SLIMS_MEMORY_BUDGET_ROWS", budgets["rows"]))
+        cls.budgets = budgets["bytes_per_record"]
+        cls.entities = _synthetic_entities(template, cls.rows)
+        cls.client = SlimsClient(url="http://fake_url", username="user", password="pw")
+
+    def _assert_within_budget(self, name: str, operation: Callable[[], Any]) -> Any:
+        """Run operation, asserting its memory per record is within budget"""
+        result, retained, peak = _measure(operation)
+        measured = {"peak": peak / self.rows, "retained": retained / self.rows}
+        for kind, budget in self.budgets[name].items():
+            self.assertLessEqual(
+                measured[kind],
+                budget,
+                f"{name} {kind} memory is {measured[kind]:.0f} bytes per "
+                f"record, over its budget of {budget}",
+            )
+        return result
+
+    def test_fetch_models(self):
+        """Tests fetching models, from the response body: decoding the json,
+        building slims Records and validating them, and the models retained
+        without their json_entity"""
+        response = Response()
+        response.status_code = 200
+        response._content = json.dumps({"entities": self.entities}).encode()
+        with patch.object(
+            self.client.db.slims_api.session, "request", return_value=response
+        ):
+            models = self._assert_within_budget(
+                "fetch_models",
+                lambda: _without_json_entity(
+                    self.client.fetch_models(SlimsMouseContent)
+                ),
+            )
+        self.assertEqual(self.rows, len(models))
+        self.assertIsNone(models[0].json_entity)
+
+    def test_validate_and_dump(self):
+        """Tests validating json entities, and dumping the models"""
+        models = self._assert_within_budget(
+            "validate_models",
+            lambda: self.client._validate_models(SlimsMouseContent, self.entities),
+        )
+        self.assertEqual(self.rows, len(models))
+        dumps = self._assert_within_budget(
+            "model_dump", lambda: [model.model_dump() for model in models]
+        )
+        self.assertEqual(f"{self.rows:08d}", dumps[-1]["barcode"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+"""Tests methods in queryset module"""
+
+import json
+import os
+import unittest
+from copy import deepcopy
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from slims.internal import Record
+
+from aind_slims_api.core import SlimsClient
+from aind_slims_api.local_criteria import LocalTable
+from aind_slims_api.models.unit import SlimsUnit
+from aind_slims_api.queryset import QuerySet
+
+RESOURCES_DIR = Path(os.path.dirname(os.path.realpath(__file__))) / "resources"
+
+
+def _units(count: int) -> list[dict]:
+    """json entities of units with pks 1 to count, named by parity"""
+    with open(RESOURCES_DIR / "example_fetch_unit_response.json") as f:
+        template = json.load(f)[0]
+    entities = []
+    for pk in range(1, count + 1):
+        entity = deepcopy(template)
+        entity["pk"] = pk
+        for column in entity["columns"]:
+            if column["name"] == "unit_pk":
+                column["value"] = pk
+            elif column["name"] == "unit_name":
+                column["value"] = "odd" if pk % 2 else "even"
+        entities.append(entity)
+    return entities
+
+
+class TestQuerySet(unittest.TestCase):
+    """Tests QuerySet class"""
+
+    def setUp(self):
+        """Client whose Slims.fetch serves 5 units from memory"""
+        self.entities = _units(5)
+        patcher = patch("slims.slims.Slims.fetch", side_effect=self._fetch)
+        self.mock_fetch: MagicMock = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = SlimsClient(url="http://fake_url", username="user", password="pw")
+
+    def _fetch(self, table, criteria, sort=None, start=None, end=None):
+        """Filter, sort and page the units as SLIMS would"""
+        entities = LocalTable(self.entities).filter(criteria, sort, start, end)
+        return [Record(json_entity=e, slims_api=None) for e in entities]
+
+    def test_lazy(self):
+        """Tests building a query makes no requests"""
+        query = self.client.query(SlimsUnit).filter(name="odd").order_by("-pk")[:2]
+        self.assertIsInstance(query, QuerySet)
+        self.mock_fetch.assert_not_called()
+        self.assertIn("start=0 end=2", repr(query))
+
+    def test_iterate(self):
+        """Tests results are streamed in pages, then cached"""
+        query = self.client.query(SlimsUnit, page_size=2)
+        self.assertEqual([1, 2, 3, 4, 5], [unit.pk for unit in query])
+        self.assertEqual(3, self.mock_fetch.call_count)
+        self.assertEqual(5, len(query.all()))
+        self.assertEqual(4, query[3].pk)
+        self.assertEqual([2, 3], [unit.pk for unit in query[1:3]])
+        self.assertEqual(1, query.first().pk)
+        self.assertTrue(query)
+        self.assertEqual(3, self.mock_fetch.call_count)
+        with self.assertRaises(ValueError):
+            QuerySet(self.client, SlimsUnit, page_size=0)
+
+    def test_list_without_count(self):
+        """Tests all, list and len fetch the results, and cache them, without
+        counting them first"""
+        with patch.object(self.client, "count_models") as mock_count:
+            query = self.client.query(SlimsUnit, page_size=2)
+            self.assertEqual(5, len(query.all()))
+            self.assertEqual([1, 2, 3, 4, 5], [unit.pk for unit in list(query)])
+            self.assertEqual(2, len(list(query[:2])))
+            self.assertEqual(2, len(query[1:3]))
+            self.assertEqual(5, query.count())
+            self.assertEqual(3, self.mock_fetch.call_count)
+            self.assertEqual(2, len(list(self.client.query(SlimsUnit)[:2])))
+        mock_count.assert_not_called()
+
+    def test_invalid_records(self):
+        """Tests pages with records that fail validation do not end
+        iteration"""
+        for column in self.entities[1]["columns"]:
+            if column["name"] == "unit_name":
+                column["value"] = None
+        query = self.client.query(SlimsUnit, page_size=2)
+        self.assertEqual([1, 3, 4, 5], [unit.pk for unit in query])
+
+    def test_invalid_first_records(self):
+        """Tests first and indexes skip records that fail validation, as
+        iteration does, fetching more rows each time"""
+        for entity in self.entities[:3]:
+            for column in entity["columns"]:
+                if column["name"] == "unit_name":
+                    column["value"] = None
+        query = self.client.query(SlimsUnit, page_size=2)
+        self.assertEqual(4, query.first().pk)
+        self.assertEqual(
+            [(0, 1), (1, 3), (3, 5)],
+            [(c.kwargs["start"], c.kwargs["end"]) for c in self.mock_fetch.mock_calls],
+        )
+        self.assertEqual(4, query[1].pk)
+        self.assertIsNone(query[:3].first())
+        self.assertTrue(query[:3])
+        with self.assertRaises(IndexError):
+            query[:3][0]
+
+    def test_filter_and_order(self):
+        """Tests filters combine, and order_by replaces the sort"""
+        query = self.client.query(SlimsUnit).filter(name="odd")
+        self.assertEqual([1, 3, 5], [unit.pk for unit in query])
+        self.assertEqual(
+            [3, 1],
+            [
+                u.pk
+                for u in query.filter(SlimsUnit.pk < 5).order_by("pk").order_by("-pk")
+            ],
+        )
+        self.assertEqual([5, 3, 1], [u.pk for u in query.order_by("-pk")])
+        with self.assertRaises(ValueError):
+            query.filter(missing=1)
+        with self.assertRaises(TypeError):
+            query[1:].filter(name="odd")
+        with self.assertRaises(TypeError):
+            query[:1].order_by("pk")
+
+    def test_slice(self):
+        """Tests slices map to the start and end rows of one request"""
+        query = self.client.query(SlimsUnit).order_by("-pk")
+        self.assertEqual([4, 3], [unit.pk for unit in query[1:3]])
+        self.mock_fetch.assert_called_once()
+        self.assertEqual(3, self.mock_fetch.call_args.kwargs["end"])
+        self.assertEqual([3], [unit.pk for unit in query[1:4][1:2]])
+        self.assertEqual([2, 1], [unit.pk for unit in query[1:][2:]])
+        self.assertEqual([], list(query[3:2]))
+        self.assertEqual([], list(query[1:3][5:]))
+        with self.assertRaises(ValueError):
+            query[::2]
+        with self.assertRaises(ValueError):
+            query[-1:]
+
+    def test_index(self):
+        """Tests an index fetches a single row"""
+        query = self.client.query(SlimsUnit)
+        self.assertEqual(2, query[1].pk)
+        self.assertEqual(2, self.mock_fetch.call_args.kwargs["end"])
+        with self.assertRaises(IndexError):
+            query[5]
+        with self.assertRaises(ValueError):
+            query[-1]
+
+    def test_count(self):
+        """Tests count counts results in SLIMS, within the slice"""
+        query = self.client.query(SlimsUnit)
+        self.assertEqual(5, query.count())
+        self.assertEqual(2, query[1:3].count())
+        self.assertEqual(0, query[6:].count())
+        self.assertFalse(query.filter(name="none"))
+        self.assertTrue(query[4:])
+        self.assertFalse(query[5:])
+        self.mock_fetch.reset_mock()
+        self.assertFalse(query[3:2])
+        self.mock_fetch.assert_not_called()
+        self.assertIsNone(query.filter(name="none").first())
+        empty = query.filter(name="none")
+        list(empty)
+        self.assertIsNone(empty.first())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,197 @@
+"""Tests methods in reference_data module"""
+
+import json
+import os
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from slims.criteria import equals
+from slims.internal import Record
+
+from aind_slims_api.core import SlimsClient
+from aind_slims_api.exceptions import SlimsRecordNotFound
+from aind_slims_api.models.instrument import SlimsInstrument
+from aind_slims_api.models.unit import SlimsUnit
+from aind_slims_api.models.user import SlimsUser
+from aind_slims_api.reference_data import ReferenceDataRegistry
+
+RESOURCES_DIR = Path(os.path.dirname(os.path.realpath(__file__))) / "resources"
+
+
+def _user(pk: int, username: str) -> SlimsUser:
+    """A user"""
+    return SlimsUser(user_pk=pk, user_userName=username)
+
+
+class TestReferenceDataRegistry(unittest.TestCase):
+    """Tests ReferenceDataRegistry class"""
+
+    def setUp(self):
+        """Create a registry of users, with a client that pages them"""
+        self.client = MagicMock()
+        self.client.fetch_model_pages.return_value = [
+            [_user(1, "a"), _user(2, "b")],
+            [_user(3, "b")],
+        ]
+        self.now = 0.0
+        self.registry = ReferenceDataRegistry(
+            self.client,
+            keys={SlimsUser: ("pk", "username")},
+            ttl=10,
+            clock=lambda: self.now,
+        )
+
+    def test_find(self):
+        """Tests loaded records are found by key fields, with every record
+        that shares a key value, and other lookups are left to SLIMS"""
+        self.assertIsNone(self.registry.find(SlimsUser, {"username": "a"}))
+        self.registry.load()
+        self.client.fetch_model_pages.assert_called_once_with(SlimsUser, page_size=1000)
+        self.assertEqual([1], [u.pk for u in self.registry.find(SlimsUser, {"pk": 1})])
+        self.assertEqual(
+            [2, 3],
+            [u.pk for u in self.registry.find(SlimsUser, {"username": "b"})],
+        )
+        self.assertEqual(
+            [2], [u.pk for u in self.registry.find(SlimsUser, {"pk": 2, "email": ""})]
+        )
+        self.assertIsNone(self.registry.find(SlimsUser, {"username": "c"}))
+        self.assertIsNone(self.registry.find(SlimsUser, {"email": ""}))
+        self.assertIsNone(self.registry.find(SlimsUser, {"pk": 1, "username": "b"}))
+        self.assertIsNone(self.registry.find(SlimsUser, {"user_pk": 1}))
+        self.assertIsNone(self.registry.find(SlimsUnit, {"pk": 1}))
+
+    def test_query_complete(self):
+        """Tests queries are only answered when every requested key value
+        is loaded"""
+        self.registry.load()
+        self.assertEqual(
+            [1, 3],
+            [
+                u.pk
+                for u in self.registry.query(
+                    SlimsUser, (SlimsUser.pk.in_([1, 3])) & (SlimsUser.email == "")
+                )
+            ],
+        )
+        self.assertEqual([], self.registry.query(SlimsUser, SlimsUser.pk.in_([])))
+        self.assertIsNone(self.registry.query(SlimsUser, SlimsUser.pk.in_([1, 4])))
+        self.assertIsNone(self.registry.query(SlimsUser, SlimsUser.pk >= 1))
+        self.assertIsNone(
+            self.registry.query(
+                SlimsUser, (SlimsUser.pk == 1) | (SlimsUser.username == "b")
+            )
+        )
+
+    def test_stale_while_revalidate(self):
+        """Tests stale records are served while one background refresh
+        replaces them"""
+        self.registry.load()
+        self.now = 10
+        release = threading.Event()
+        pages = [[_user(1, "new")]]
+        self.client.fetch_model_pages.side_effect = lambda *a, **k: (
+            release.wait() and pages
+        )
+        self.assertEqual("a", self.registry.find(SlimsUser, {"pk": 1})[0].username)
+        self.assertEqual("a", self.registry.find(SlimsUser, {"pk": 1})[0].username)
+        release.set()
+        self.registry.wait(timeout=5)
+        self.assertEqual(2, self.client.fetch_model_pages.call_count)
+        self.assertEqual("new", self.registry.find(SlimsUser, {"pk": 1})[0].username)
+
+    def test_refresh_failure(self):
+        """Tests a failed refresh keeps the stale records"""
+        self.registry.load()
+        self.now = 10
+        self.client.fetch_model_pages.side_effect = ConnectionError()
+        with self.assertLogs("aind_slims_api.reference_data", "WARNING"):
+            self.registry.find(SlimsUser, {"pk": 1})
+            self.registry.wait(timeout=5)
+        self.assertEqual("a", self.registry.find(SlimsUser, {"pk": 1})[0].username)
+
+
+class TestClientReferenceData(unittest.TestCase):
+    """Tests SlimsClient with preloaded reference data"""
+
+    @patch("slims.slims.Slims.fetch")
+    def test_fetch_model(self, mock_fetch: MagicMock):
+        """Tests reference tables are loaded on connecting, and fetches of
+        them are answered locally"""
+        records = {}
+        for table, file_name in [
+            ("Instrument", "example_fetch_instrument_response.json_entity.json"),
+            ("Unit", "example_fetch_unit_response.json"),
+            ("User", "example_fetch_user_response.json"),
+        ]:
+            with open(RESOURCES_DIR / file_name) as f:
+                records[table] = [
+                    Record(json_entity=r, slims_api=None) for r in json.load(f)
+                ]
+        mock_fetch.side_effect = lambda table, *args, **kwargs: (
+            records[table] if kwargs.get("start") == 0 else []
+        )
+        client = SlimsClient(
+            url="http://fake_url",
+            username="user",
+            password="pw",
+            preload_reference_data=True,
+        )
+        client.db
+        self.assertEqual(3, mock_fetch.call_count)
+        user = records["User"][0]
+        username = user.column("user_userName").value
+        self.assertEqual(user.pk(), client.fetch_model(SlimsUser, username=username).pk)
+        unit = client.fetch_model(SlimsUnit, pk=records["Unit"][0].pk())
+        self.assertEqual("picometer^3", unit.name)
+        instrument = records["Instrument"][0]
+        self.assertEqual(
+            instrument.pk(),
+            client.fetch_model(
+                SlimsInstrument, name=instrument.column("nstr_name").value
+            ).pk,
+        )
+        self.assertEqual(
+            [user.pk()],
+            [
+                u.pk
+                for u in client.fetch_models(SlimsUser, SlimsUser.pk.in_([user.pk()]))
+            ],
+        )
+        self.assertEqual(3, mock_fetch.call_count)
+        # misses, ranges, partial key sets, and criteria on columns models do
+        # not have, go to SLIMS
+        mock_fetch.side_effect = None
+        mock_fetch.return_value = []
+        with self.assertRaises(SlimsRecordNotFound):
+            client.fetch_model(SlimsUser, username="missing")
+        with self.assertRaises(SlimsRecordNotFound):
+            client.fetch_model(SlimsUser, equals("user_unknown", 1))
+        client.fetch_models(SlimsUser, SlimsUser.pk >= user.pk())
+        client.fetch_models(SlimsUser, SlimsUser.pk.in_([user.pk(), user.pk() + 1]))
+        self.assertEqual(7, mock_fetch.call_count)
+
+    @patch("slims.slims.Slims.fetch")
+    def test_load_failure(self, mock_fetch: MagicMock):
+        """Tests clients stay disconnected when reference tables fail to
+        load, so they are loaded again on next use"""
+        mock_fetch.side_effect = ConnectionError("down")
+        client = SlimsClient(
+            url="http://fake_url",
+            username="user",
+            password="pw",
+            preload_reference_data=True,
+        )
+        with self.assertRaises(ConnectionError):
+            client.db
+        self.assertIsNone(client._db)
+        mock_fetch.side_effect = None
+        mock_fetch.return_value = []
+        self.assertIsNotNone(client.db)
+        self.assertEqual(4, mock_fetch.call_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+"""Tests methods in references module"""
+
+import json
+import os
+import unittest
+from copy import deepcopy
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from slims.internal import Record
+
+from aind_slims_api.core import SlimsClient
+from aind_slims_api.exceptions import SlimsReferenceNotFound
+from aind_slims_api.models import (
+    SlimsBehaviorSession,
+    SlimsInstrument,
+    SlimsMouseContent,
+    SlimsUnit,
+    SlimsUser,
+)
+from aind_slims_api.references import KnownPks, references
+
+RESOURCES_DIR = Path(os.path.dirname(os.path.realpath(__file__))) / "resources"
+
+
+def _records(file_name: str) -> list[Record]:
+    """slims Records of a resource file"""
+    with open(RESOURCES_DIR / file_name) as f:
+        return [Record(json_entity=r, slims_api=None) for r in json.load(f)]
+
+
+def _session(mouse_pk, instrument_pk, trainer_pks) -> SlimsBehaviorSession:
+    """A behavior session referencing a mouse, instrument and trainers"""
+    return SlimsBehaviorSession(
+        cnvn_fk_content=mouse_pk,
+        cnvn_cf_fk_instrument=instrument_pk,
+        cnvn_cf_fk_trainer=trainer_pks,
+    )
+
+
+class TestReferences(unittest.TestCase):
+    """Tests references function"""
+
+    def test_references(self):
+        """Tests pks of foreign key fields are collected by model"""
+        self.assertEqual(
+            {
+                SlimsMouseContent: {1, 4},
+                SlimsInstrument: {2},
+                SlimsUser: {3, 5},
+            },
+            references([_session(1, 2, [3]), _session(4, None, [3, 5])]),
+        )
+        self.assertEqual({}, references([SlimsUnit(unit_name="g", unit_pk=1)]))
+
+
+class TestKnownPks(unittest.TestCase):
+    """Tests KnownPks class"""
+
+    def setUp(self):
+        """Known pks of a client whose users 1 to 3 exist"""
+        self.client = MagicMock()
+        self.client._fetch_models.side_effect = lambda model, args, kwargs, local: [
+            model.model_construct(pk=pk) for pk in args[0].to_dict()["value"] if pk <= 3
+        ]
+        self.known = KnownPks(self.client, chunk_size=2)
+
+    def test_missing(self):
+        """Tests unknown pks are looked up in chunks, and remembered"""
+        self.assertEqual({4}, self.known.missing(SlimsUser, [1, 2, 3, 4]))
+        self.assertEqual(2, self.client._fetch_models.call_count)
+        self.assertEqual(set(), self.known.missing(SlimsUser, [3, 2]))
+        self.assertEqual(2, self.client._fetch_models.call_count)
+        self.known.add_models([SlimsUser(user_pk=4, user_userName="d")])
+        self.assertEqual(set(), self.known.missing(SlimsUser, [4]))
+        self.assertEqual(2, self.client._fetch_models.call_count)
+
+    def test_check(self):
+        """Tests missing references are reported by model"""
+        self.known.add(SlimsMouseContent, [1])
+        self.known.add(SlimsInstrument, [2])
+        self.known.check([_session(1, 2, [3])])
+        with self.assertRaises(SlimsReferenceNotFound) as raised:
+            self.known.check([_session(1, 2, [3, 7, 6])])
+        self.assertIn("SlimsUser [6, 7]", str(raised.exception))
+
+
+class TestClientReferences(unittest.TestCase):
+    """Tests SlimsClient with check_references"""
+
+    @patch("slims.slims.Slims.add")
+    @patch("slims.slims.Slims.fetch")
+    def test_add_models(self, mock_fetch: MagicMock, mock_add: MagicMock):
+        """Tests references are looked up once per model before adding, and
+        models with references that do not exist are not added"""
+        records = {
+            "Content": _records("example_fetch_mouse_response.json"),
+            "Instrument": _records(
+                "example_fetch_instrument_response.json_entity.json"
+            ),
+            "User": _records("example_fetch_user_response.json"),
+        }
+        mock_fetch.side_effect = lambda table, *args, **kwargs: records[table]
+        mock_add.return_value = _records(
+            "example_write_behavior_session_content_events_response.json_entity.json"
+        )[0]
+        client = SlimsClient(
+            url="http://fake_url",
+            username="user",
+            password="pw",
+            check_references=True,
+        )
+        mouse, instrument, user = (records[t][0].pk() for t in records)
+        sessions = [_session(mouse, instrument, [user])] * 2
+        added = client.add_models(sessions, max_workers=2)
+        self.assertEqual(2, len(added))
+        self.assertEqual(3, mock_fetch.call_count)
+        self.assertEqual(2, mock_add.call_count)
+        client.add_model(sessions[0])
+        self.assertEqual(3, mock_fetch.call_count)
+        with self.assertRaises(SlimsReferenceNotFound):
+            client.add_model(_session(mouse, instrument, [user + 1]))
+        self.assertEqual(4, mock_fetch.call_count)
+        self.assertEqual(3, mock_add.call_count)
+
+    @patch("slims.slims.Slims.add")
+    @patch("slims.slims.Slims.fetch")
+    def test_reads_remembered(self, mock_fetch: MagicMock, mock_add: MagicMock):
+        """Tests records read, and added, are known to exist"""
+        units = _records("example_fetch_unit_response.json")
+        mock_fetch.return_value = units
+        mock_add.return_value = units[0]
+        client = SlimsClient(
+            url="http://fake_url",
+            username="user",
+            password="pw",
+            check_references=True,
+        )
+        client.fetch_models(SlimsUnit)
+        self.assertEqual(set(), client.known_pks.missing(SlimsUnit, [units[0].pk()]))
+        mock_fetch.assert_called_once()
+        client.add_models([SlimsUnit.model_validate(units[0])])
+        mock_fetch.assert_called_once()
+
+    @patch("slims.slims.Slims.fetch")
+    def test_reference_data(self, mock_fetch: MagicMock):
+        """Tests references are looked up in SLIMS, not in preloaded
+        reference data that may predate them"""
+        users = _records("example_fetch_user_response.json")
+        mock_fetch.side_effect = lambda table, *args, **kwargs: (
+            users if table == "User" and kwargs.get("start") == 0 else []
+        )
+        client = SlimsClient(
+            url="http://fake_url",
+            username="user",
+            password="pw",
+            check_references=True,
+            preload_reference_data=True,
+        )
+        client.db
+        loads = mock_fetch.call_count
+        user = users[0].pk()
+        mock_fetch.side_effect = None
+        new_user = deepcopy(users[0].json_entity)
+        for column in new_user["columns"]:
+            if column["name"] == "user_pk":
+                column["value"] = user + 1
+        mock_fetch.return_value = users + [Record(json_entity=new_user, slims_api=None)]
+        # unknown pks, as if the preloaded records were not read with client
+        known = KnownPks(client)
+        self.assertEqual(set(), known.missing(SlimsUser, [user, user + 1]))
+        self.assertEqual(loads + 1, mock_fetch.call_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
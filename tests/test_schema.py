@@ -0,0 +1,213 @@
+"""Tests methods in schema module"""
+
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Annotated, ClassVar
+from unittest.mock import MagicMock, patch
+
+from pydantic import Field
+
+from aind_slims_api.core import SlimsClient
+from aind_slims_api.exceptions import SlimsSchemaMismatch
+from aind_slims_api.models.base import SlimsBaseModel
+from aind_slims_api.models.mouse import SlimsMouseContent
+from aind_slims_api.models.utils import UnitSpec
+from aind_slims_api.schema import SchemaCache, default_cache_path
+
+RESOURCES_DIR = Path(os.path.dirname(os.path.realpath(__file__))) / "resources"
+TABLE_RESOURCES = {
+    "Attachment": "example_fetch_attachments_response.json_entity.json",
+    "Content": "example_fetch_mouse_response.json",
+    "ContentEvent": (
+        "example_fetch_behavior_session_content_events_response.json_entity.json"
+    ),
+    "Instrument": "example_fetch_instrument_response.json_entity.json",
+    "Unit": "example_fetch_unit_response.json",
+    "User": "example_fetch_user_response.json",
+}
+
+
+def _fetch_entities(table: str, **kwargs) -> list[dict]:
+    """Side effect for SlimsClient.fetch_entities returning example json
+    entities of table"""
+    with open(RESOURCES_DIR / TABLE_RESOURCES[table]) as f:
+        return json.load(f)[:1]
+
+
+class MismatchedMouse(SlimsBaseModel):
+    """Mouse model whose aliases and units do not match the schema"""
+
+    barcode: str = Field(..., alias="cntn_barCode")
+    missing: str | None = Field(None, alias="cntn_cf_missing")
+    volume: float | None = Field(None, alias="cntn_cf_volume")
+    mass: Annotated[float | None, UnitSpec("kg")] = Field(None, alias="cntn_cf_mass")
+    id: Annotated[int | None, UnitSpec("g")] = Field(None, alias="cntn_id")
+    _slims_table = "Content"
+    _base_fetch_filters: ClassVar[dict[str, str]] = {"cntp_name": "Mouse"}
+
+
+class TestSchemaCache(unittest.TestCase):
+    """Tests SchemaCache class"""
+
+    example_entities: list[dict]
+
+    @classmethod
+    def setUpClass(cls):
+        """Load the example mouse json entities"""
+        with open(RESOURCES_DIR / "example_fetch_mouse_response.json") as f:
+            cls.example_entities = json.load(f)
+
+    def setUp(self):
+        """Create a client that fetches the example mouse, and a cache path
+        in a temporary directory"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "cache" / "schema.json"
+        self.client = MagicMock(url="http://fake_url")
+        self.client.fetch_entities.return_value = self.example_entities
+        self.now = 1000.0
+
+    def _cache(self, **kwargs) -> SchemaCache:
+        """A cache of the example mouse schema"""
+        return SchemaCache(self.client, self.path, clock=lambda: self.now, **kwargs)
+
+    def test_check_model(self):
+        """Tests a model matching the schema has no problems, and decodes
+        json entities like from_json_entity"""
+        cache = self._cache()
+        self.assertIsNone(cache.decoder(SlimsMouseContent))
+        self.assertEqual([], cache.check_model(SlimsMouseContent))
+        self.client.fetch_entities.assert_called_once_with(
+            "Content", start=0, end=1, cntp_name="Mouse"
+        )
+        decoder = cache.decoder(SlimsMouseContent)
+        self.assertEqual({"cntn_cf_baselineWeight"}, decoder.quantities)
+        entity = self.example_entities[0]
+        self.assertEqual(SlimsMouseContent.from_json_entity(entity), decoder(entity))
+
+    def test_check_models(self):
+        """Tests problems with aliases and units are raised together"""
+        with self.assertRaises(SlimsSchemaMismatch) as raised:
+            self._cache().check_models([SlimsMouseContent, MismatchedMouse])
+        self.assertEqual(
+            [
+                "MismatchedMouse.missing: no column cntn_cf_missing in Content",
+                "MismatchedMouse.volume: QUANTITY column without a UnitSpec",
+                "MismatchedMouse.mass: unit g not in ('kg',)",
+                "MismatchedMouse.id: UnitSpec on STRING column",
+            ],
+            str(raised.exception).splitlines(),
+        )
+
+    def test_check_models_default(self):
+        """Tests every model is checked by default"""
+        self.client.fetch_entities.side_effect = _fetch_entities
+        self._cache().check_models()
+        self.assertEqual(6, self.client.fetch_entities.call_count)
+
+    def test_cached(self):
+        """Tests schemas are cached in the file until they expire"""
+        self._cache().table_schema(SlimsMouseContent)
+        self._cache(ttl=10).table_schema(SlimsMouseContent)
+        self.assertEqual(1, self.client.fetch_entities.call_count)
+        self.now += 10
+        self._cache(ttl=10).table_schema(SlimsMouseContent)
+        self.assertEqual(2, self.client.fetch_entities.call_count)
+
+    def test_no_records(self):
+        """Tests models without records to take a schema from are skipped"""
+        self.client.fetch_entities.return_value = []
+        cache = self._cache()
+        with self.assertLogs("aind_slims_api.schema", "WARNING"):
+            self.assertEqual([], cache.check_model(SlimsMouseContent))
+        self.assertIsNone(cache.decoder(SlimsMouseContent))
+        self.assertFalse(self.path.exists())
+
+    def test_invalid_cache(self):
+        """Tests an unreadable cache file is ignored"""
+        self.path.parent.mkdir()
+        self.path.write_text("{")
+        with self.assertLogs("aind_slims_api.schema", "WARNING"):
+            cache = self._cache()
+        cache.table_schema(SlimsMouseContent)
+        self.client.fetch_entities.assert_called_once()
+
+    def test_unwritable_cache(self):
+        """Tests cache files that cannot be read or written are skipped, with
+        schemas still cached in memory"""
+        self.path.mkdir(parents=True)
+        with self.assertLogs("aind_slims_api.schema", "WARNING") as logs:
+            cache = self._cache()
+            cache.table_schema(SlimsMouseContent)
+        self.assertEqual(2, len(logs.output))
+        cache.table_schema(SlimsMouseContent)
+        self.client.fetch_entities.assert_called_once()
+
+    def test_default_cache_path(self):
+        """Tests the cache is in the user's cache directory"""
+        with patch.dict(os.environ, {"XDG_CACHE_HOME": "/cache"}):
+            self.assertEqual(
+                Path("/cache/aind-slims-api/schema.json"), default_cache_path()
+            )
+
+    @patch("slims.slims.Slims.fetch")
+    def test_client(self, mock_slims_fetch: MagicMock):
+        """Tests clients check models on connecting, and decode fetched json
+        entities with checked schemas"""
+        client = SlimsClient(
+            url="http://fake_url",
+            username="user",
+            password="pw",
+            raw_entities=True,
+            check_schema=True,
+            schema_cache_path=self.path,
+        )
+        with patch.object(client, "fetch_entities", side_effect=_fetch_entities):
+            db = client.db
+        self.assertIsNotNone(client.schema.decoder(SlimsMouseContent))
+        db.slims_api.get_json = MagicMock(
+            return_value={"entities": self.example_entities}
+        )
+        decoder = MagicMock(side_effect=SlimsMouseContent.from_json_entity)
+        with patch.object(client.schema, "decoder", return_value=decoder):
+            mice = client.fetch_models(SlimsMouseContent)
+        decoder.assert_called_once_with(self.example_entities[0])
+        self.assertEqual(["123456"], [mouse.barcode for mouse in mice])
+        mock_slims_fetch.assert_not_called()
+
+    def test_client_mismatch(self):
+        """Tests clients stay disconnected when models do not match, so the
+        check runs again on next use"""
+        client = SlimsClient(
+            url="http://fake_url",
+            username="user",
+            password="pw",
+            check_schema=True,
+            schema_cache_path=self.path,
+        )
+        with patch.object(
+            client.schema,
+            "check_models",
+            side_effect=[SlimsSchemaMismatch("mismatch"), None],
+        ) as mock_check:
+            with self.assertRaises(SlimsSchemaMismatch):
+                client.db
+            self.assertIsNone(client._db)
+            self.assertIsNotNone(client.db)
+        self.assertEqual(2, mock_check.call_count)
+
+    def test_client_unchecked(self):
+        """Tests clients decode with from_json_entity without a schema"""
+        client = SlimsClient(
+            url="http://fake_url", username="user", password="pw", raw_entities=True
+        )
+        self.assertIsNone(client._decoder(SlimsMouseContent))
+        client._schema = SchemaCache(client, self.path)
+        self.assertIsNone(client._decoder(SlimsMouseContent))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""Tests methods in serialization module"""
+
+import json
+import os
+import unittest
+from pathlib import Path
+
+from slims.internal import Record
+
+from aind_slims_api.models import (
+    SlimsAttachment,
+    SlimsBehaviorSession,
+    SlimsMouseContent,
+    SlimsUnit,
+    SlimsUser,
+    dump_many,
+)
+from aind_slims_api.models.serialization import ADD_EXCLUDE, serialization_plan
+
+RESOURCES_DIR = Path(os.path.dirname(os.path.realpath(__file__))) / "resources"
+
+
+def load_models(model: type, file_name: str) -> list:
+    """Validate the records of a resource file as model"""
+    with open(RESOURCES_DIR / file_name) as f:
+        return [
+            model.model_validate(Record(json_entity=r, slims_api=None))
+            for r in json.load(f)
+        ]
+
+
+class TestSerialization(unittest.TestCase):
+    """Tests serialization plans and dump_many"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Load example models of each kind of field"""
+        cls.models = (
+            load_models(SlimsMouseContent, "example_fetch_mouse_response.json")
+            + load_models(SlimsUnit, "example_fetch_unit_response.json")
+            + load_models(SlimsUser, "example_fetch_user_response.json")
+            + load_models(
+                SlimsBehaviorSession,
+                "example_fetch_behavior_session_content_events_response"
+                ".json_entity.json",
+            )
+            + load_models(
+                SlimsAttachment, "example_fetch_attachments_response.json_entity.json"
+            )
+        )
+
+    def test_plan_matches_model_dump(self):
+        """Tests plans serialize like model_dump, including quantities and
+        datetimes"""
+        for model in self.models:
+            plan = serialization_plan(type(model))
+            self.assertEqual(model.model_dump(by_alias=True), plan.dump(model))
+            self.assertEqual(
+                model.model_dump(by_alias=True, include={"pk"}),
+                plan.dump(model, include=["pk"]),
+            )
+        mouse = self.models[0]
+        self.assertEqual(
+            {"amount": mouse.baseline_weight_g, "unit_display": "g"},
+            serialization_plan(SlimsMouseContent).dump(mouse)["cntn_cf_baselineWeight"],
+        )
+
+    def test_plan_cached(self):
+        """Tests plans are compiled once per model"""
+        self.assertIs(serialization_plan(SlimsUnit), serialization_plan(SlimsUnit))
+
+    def test_dump_many(self):
+        """Tests dump_many returns add_model payloads, or their json"""
+        payloads = dump_many(self.models)
+        self.assertEqual(
+            [
+                m.model_dump(by_alias=True, exclude=set(ADD_EXCLUDE))
+                for m in self.models
+            ],
+            payloads,
+        )
+        self.assertEqual(payloads, json.loads(dump_many(self.models, as_json=True)))
+
+
+if __name__ == "__main__":
+    unittest.main()
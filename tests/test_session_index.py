@@ -0,0 +1,63 @@
+"""Tests methods in session_index module"""
+
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+from aind_slims_api.models.behavior_session import SlimsBehaviorSession
+from aind_slims_api.session_index import LatestBehaviorSessionIndex
+
+
+def _session(pk: int, mouse_pk: int | None, day: int | None) -> SlimsBehaviorSession:
+    """A session of a mouse on a day of January 2021"""
+    date = None if day is None else datetime(2021, 1, day, tzinfo=timezone.utc)
+    return SlimsBehaviorSession(
+        cnvn_pk=pk, cnvn_fk_content=mouse_pk, cnvn_cf_scheduledDate=date
+    )
+
+
+class TestLatestBehaviorSessionIndex(unittest.TestCase):
+    """Tests LatestBehaviorSessionIndex class"""
+
+    def setUp(self):
+        """Create an index with a client that scans example sessions"""
+        self.client = MagicMock()
+        self.client.scan_models.return_value = [
+            [_session(3, 1, 2), _session(1, 1, 1), _session(2, 2, None)],
+            [_session(5, 2, 1), _session(4, 1, 2), _session(6, None, 3)],
+        ]
+        self.index = LatestBehaviorSessionIndex(self.client)
+
+    def test_build(self):
+        """Tests the latest session of each mouse is indexed, by date then pk"""
+        self.assertIsNone(self.index.get(1))
+        self.assertEqual(6, self.index.build())
+        self.assertEqual(6, self.index.max_pk)
+        self.assertEqual(4, self.index[1].pk)
+        self.assertEqual(5, self.index.get(2).pk)
+        self.assertIsNone(self.index.get(3))
+        self.assertIn(1, self.index)
+        self.assertEqual(2, len(self.index))
+        self.assertEqual([1, 2], sorted(self.index))
+        self.client.scan_models.assert_called_once_with(
+            SlimsBehaviorSession, partitions=4, page_size=100
+        )
+
+    def test_refresh(self):
+        """Tests refresh builds an empty index, then only fetches sessions
+        added since"""
+        self.assertEqual(6, self.index.refresh())
+        self.client.scan_models.return_value = [[_session(7, 2, 3), _session(8, 3, 1)]]
+        self.assertEqual(2, self.index.refresh())
+        self.assertEqual(7, self.index[2].pk)
+        self.assertEqual(8, self.index[3].pk)
+        self.assertEqual(8, self.index.max_pk)
+        args = self.client.scan_models.call_args
+        self.assertEqual(
+            (SlimsBehaviorSession.pk > 6).to_dict(), args.args[1].to_dict()
+        )
+        self.assertEqual(1, args.kwargs["partitions"])
+
+
+if __name__ == "__main__":
+    unittest.main()
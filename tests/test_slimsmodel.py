@@ -4,7 +4,7 @@ import unittest
 from datetime import datetime
 from typing import Annotated
 
-from pydantic import Field
+from pydantic import Field, ValidationError
 from slims.internal import Column, Record
 
 from aind_slims_api.core import SlimsBaseModel
@@ -66,6 +66,27 @@ class TestSlimsModel(unittest.TestCase):
                 }
             )
 
+    def test_from_json_entity(self):
+        """Test validation from a json entity, checking quantity units"""
+        json_entity = {
+            "columns": [
+                {"datatype": "STRING", "name": "stringfield", "value": "value"},
+                {
+                    "datatype": "QUANTITY",
+                    "name": "quantfield",
+                    "value": 28.28,
+                    "unit": "nm",
+                },
+            ]
+        }
+        obj = self.TestModel.from_json_entity(json_entity)
+        self.assertEqual("value", obj.stringfield)
+        self.assertEqual(28.28, obj.quantfield)
+        self.assertEqual(json_entity, obj.json_entity)
+        json_entity["columns"][1]["unit"] = "erg"
+        with self.assertRaises(ValidationError):
+            self.TestModel.from_json_entity(json_entity)
+
     def test_alias(self):
         """Test aliasing of fields"""
 
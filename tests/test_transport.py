@@ -0,0 +1,126 @@
+"""Tests methods in transport module"""
+
+import json
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+from requests import Response
+from slims.internal import Attachment, Record, _SlimsApiException
+
+from aind_slims_api.core import SlimsClient
+from aind_slims_api.transport import SlimsTransport, default_json_loads
+
+
+def _response(status_code: int, content: bytes) -> Response:
+    """A requests.Response with status_code and content"""
+    response = Response()
+    response.status_code = status_code
+    response._content = content
+    return response
+
+
+class TestSlimsTransport(unittest.TestCase):
+    """Tests SlimsTransport class"""
+
+    def test_default_json_loads(self):
+        """Tests orjson is used when it is installed"""
+        orjson = MagicMock()
+        with patch.dict(sys.modules, {"orjson": orjson}):
+            self.assertIs(orjson.loads, default_json_loads())
+        with patch.dict(sys.modules, {"orjson": None}):
+            self.assertIs(json.loads, default_json_loads())
+
+    def test_session(self):
+        """Tests the session authenticates and accepts compressed responses"""
+        transport = SlimsTransport("http://fake_url", "user", "pw")
+        self.assertEqual(("user", "pw"), transport.session.auth)
+        self.assertEqual("gzip, deflate", transport.session.headers["Accept-Encoding"])
+        self.assertIs(
+            transport.session.get_adapter("http://fake_url"),
+            transport.session.get_adapter("https://fake_url"),
+        )
+
+    @patch("requests.Session.request")
+    def test_get_entities(self, mock_request: MagicMock):
+        """Tests entities are decoded with json_loads on the session"""
+        body = {
+            "entities": [
+                {"tableName": "Content", "pk": 1, "columns": []},
+                {"tableName": "Attachment", "pk": 2, "columns": []},
+            ]
+        }
+        mock_request.return_value = _response(200, json.dumps(body).encode())
+        json_loads = MagicMock(side_effect=json.loads)
+        transport = SlimsTransport(
+            "http://fake_url", "user", "pw", json_loads=json_loads, verify=False
+        )
+        records = transport.get_entities("Content/advanced", {"criteria": None})
+        self.assertEqual([Record, Attachment], [type(r) for r in records])
+        json_loads.assert_called_once_with(mock_request.return_value.content)
+        mock_request.assert_called_once_with(
+            "GET",
+            "http://fake_url/rest/Content/advanced",
+            headers={},
+            verify=False,
+            json={"criteria": None},
+        )
+
+    @patch("requests.Session.request")
+    def test_get_entities_error(self, mock_request: MagicMock):
+        """Tests an error response raises"""
+        mock_request.return_value = _response(500, b"Server error")
+        transport = SlimsTransport("http://fake_url", "user", "pw")
+        with self.assertRaises(_SlimsApiException) as e:
+            transport.get_entities("Content")
+        self.assertEqual("Could not fetch entities: Server error", str(e.exception))
+
+    @patch("requests.Session.request")
+    def test_methods(self, mock_request: MagicMock):
+        """Tests get, post, put and delete, and absolute urls"""
+        transport = SlimsTransport("https://fake_url", "user", "pw")
+        transport.get("http://fake_url/rest/repo/1")
+        transport.post("Content", {"a": 1})
+        transport.put("Content/1", {"a": 2})
+        transport.delete("Content/1")
+        self.assertEqual(
+            [
+                ("GET", "https://fake_url/rest/repo/1", None),
+                ("POST", "https://fake_url/rest/Content", {"a": 1}),
+                ("PUT", "https://fake_url/rest/Content/1", {"a": 2}),
+                ("DELETE", "https://fake_url/rest/Content/1", None),
+            ],
+            [(*c.args, c.kwargs.get("json")) for c in mock_request.mock_calls],
+        )
+
+    @patch("requests.Session.request")
+    def test_post_stream(self, mock_request: MagicMock):
+        """Tests streamed bodies are passed to requests as an iterable"""
+        transport = SlimsTransport("http://fake_url", "user", "pw")
+        chunks = iter([b"{", b"}"])
+        transport.post_stream("repo", chunks)
+        mock_request.assert_called_once_with(
+            "POST",
+            "http://fake_url/rest/repo",
+            data=chunks,
+            headers={"Content-Type": "application/json"},
+        )
+
+    def test_client_transport(self):
+        """Tests SlimsClient connects through a SlimsTransport"""
+        json_loads = MagicMock()
+        client = SlimsClient(
+            url="http://fake_url",
+            username="user",
+            password="pw",
+            compress_responses=False,
+            json_loads=json_loads,
+        )
+        transport = client.db.slims_api
+        self.assertIsInstance(transport, SlimsTransport)
+        self.assertIs(json_loads, transport.json_loads)
+        self.assertEqual("identity", transport.session.headers["Accept-Encoding"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Tests methods in validation module"""
+
+import unittest
+from unittest.mock import MagicMock
+
+from pydantic import ValidationError
+
+from aind_slims_api.models.unit import SlimsUnit
+from aind_slims_api.validation import ValidationReport
+
+
+def _validation_error(**data) -> ValidationError:
+    """The error raised validating a SlimsUnit from data"""
+    try:
+        SlimsUnit.model_validate(data)
+    except ValidationError as e:
+        return e
+
+
+class TestValidationReport(unittest.TestCase):
+    """Tests ValidationReport class"""
+
+    def test_counts(self):
+        """Tests failures are counted per field and error type"""
+        report = ValidationReport(SlimsUnit, max_samples=2)
+        for pk in range(3):
+            report.add_failure(pk, _validation_error(unit_name=1, unit_pk=pk))
+        report.add_failure(3, _validation_error(unit_pk="x"))
+        report.add_validated(6)
+        self.assertEqual(4, report.failed)
+        self.assertEqual(6, report.validated)
+        self.assertEqual(
+            {
+                ("unit_name", "string_type"): 3,
+                ("unit_name", "missing"): 1,
+                ("unit_pk", "int_parsing"): 1,
+            },
+            dict(report.errors),
+        )
+        self.assertEqual([0, 1], report.sample_pks)
+        self.assertEqual(
+            "SLIMS data validation failed for 4 of 10 SlimsUnit records: "
+            "unit_name string_type x3, unit_pk int_parsing x1, "
+            "unit_name missing x1; pks [0, 1]",
+            report.summary(),
+        )
+
+    def test_update(self):
+        """Tests reports are combined, keeping at most max_samples pks"""
+        call_report = ValidationReport(SlimsUnit)
+        call_report.add_failure(1, _validation_error(unit_pk=1))
+        call_report.add_failure(2, _validation_error(unit_pk=2))
+        report = ValidationReport(max_samples=3)
+        self.assertIn(" SLIMS records", report.summary())
+        report.update(call_report)
+        report.update(call_report)
+        self.assertIs(SlimsUnit, report.model)
+        self.assertEqual(4, report.failed)
+        self.assertEqual({("unit_name", "missing"): 4}, dict(report.errors))
+        self.assertEqual([1, 2, 1], report.sample_pks)
+
+    def test_log(self):
+        """Tests one error is logged, only if records failed"""
+        logger = MagicMock()
+        report = ValidationReport(SlimsUnit)
+        report.log(logger)
+        logger.error.assert_not_called()
+        report.add_failure(1, _validation_error(unit_pk=1))
+        report.log(logger)
+        logger.error.assert_called_once_with(report.summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,206 @@
+"""Tests methods in write_behind module"""
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from typing import Optional
+from unittest.mock import MagicMock, patch
+
+import requests
+from slims.slims import _SlimsApiException
+
+from aind_slims_api.core import SlimsClient
+from aind_slims_api.models.unit import SlimsUnit
+from aind_slims_api.write_behind import WriteBehindQueue
+
+RESOURCES_DIR = Path(os.path.dirname(os.path.realpath(__file__))) / "resources"
+
+
+def _unit(name: str) -> SlimsUnit:
+    """A unit to add"""
+    return SlimsUnit(unit_name=name, unit_pk=0)
+
+
+def _response(status_code: int, entity: Optional[dict] = None) -> requests.Response:
+    """A response to an add, with the added json entity"""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps({"entities": [entity]} if entity else {}).encode()
+    return response
+
+
+class TestWriteBehindQueue(unittest.TestCase):
+    """Tests WriteBehindQueue class"""
+
+    example_client: SlimsClient
+    example_entity: dict
+
+    @classmethod
+    def setUpClass(cls):
+        """Create a client and the json entity returned by adds"""
+        cls.example_client = SlimsClient(
+            url="http://fake_url", username="user", password="pass"
+        )
+        with open(RESOURCES_DIR / "example_fetch_unit_response.json") as f:
+            cls.example_entity = json.load(f)[0]
+
+    def _added(self) -> requests.Response:
+        """A response to a successful add"""
+        return _response(200, self.example_entity)
+
+    def setUp(self):
+        """Create a spool path in a temporary directory"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.spool_path = Path(directory.name) / "spool" / "writes.jsonl"
+
+    def _spool_lines(self) -> list[dict]:
+        """Entries of the spool file"""
+        return [json.loads(line) for line in self.spool_path.read_text().splitlines()]
+
+    @patch("aind_slims_api.transport.SlimsTransport.put")
+    def test_add_model(self, mock_put: MagicMock):
+        """Tests models are added in the background and acknowledged"""
+        mock_put.return_value = self._added()
+        with WriteBehindQueue(self.example_client, self.spool_path) as queue:
+            future = queue.add_model(_unit("g"), exclude=["json_entity"])
+            self.assertEqual(31, future.result(timeout=5).pk)
+        mock_put.assert_called_once_with(
+            url="Unit", body={"unit_name": "g", "unit_abbreviation": ""}
+        )
+        write, ack = self._spool_lines()
+        self.assertEqual({"ack": write["id"]}, ack)
+        # acknowledged writes are not replayed, and the spool is compacted
+        WriteBehindQueue(self.example_client, self.spool_path, fsync=False).close()
+        self.assertEqual("", self.spool_path.read_text())
+        with self.assertRaises(RuntimeError):
+            queue.add_model(_unit("g"))
+
+    @patch("aind_slims_api.transport.SlimsTransport.put")
+    def test_retry(self, mock_put: MagicMock):
+        """Tests writes that failed with transport errors, 429 or 5xx
+        responses are retried"""
+        mock_put.side_effect = [
+            requests.ConnectionError(),
+            requests.Timeout(),
+            _response(429),
+            _response(503),
+            self._added(),
+        ]
+        queue = WriteBehindQueue(self.example_client, self.spool_path, retry_interval=0)
+        future = queue.add_model(_unit("g"))
+        self.assertEqual(31, future.result(timeout=5).pk)
+        self.assertTrue(queue.close(timeout=5))
+        self.assertEqual(5, mock_put.call_count)
+
+    @patch("aind_slims_api.transport.SlimsTransport.put")
+    def test_rejected(self, mock_put: MagicMock):
+        """Tests writes SLIMS rejects fail without retrying, and are dropped
+        from the spool, while other errors keep them in the spool"""
+        mock_put.side_effect = [_response(400), ValueError()]
+        with WriteBehindQueue(self.example_client, self.spool_path) as queue:
+            with self.assertLogs("aind_slims_api.write_behind", "ERROR"):
+                rejected = queue.add_model(_unit("g"))
+                with self.assertRaises(_SlimsApiException):
+                    rejected.result(timeout=5)
+                failed = queue.add_model(_unit("h"))
+                with self.assertRaises(ValueError):
+                    failed.result(timeout=5)
+        self.assertEqual(2, mock_put.call_count)
+        write, ack, _ = self._spool_lines()
+        self.assertEqual({"ack": write["id"]}, ack)
+
+    @patch("aind_slims_api.transport.SlimsTransport.put")
+    def test_replay(self, mock_put: MagicMock):
+        """Tests writes that failed every attempt are replayed on restart"""
+        mock_put.side_effect = requests.ConnectionError()
+        queue = WriteBehindQueue(
+            self.example_client, self.spool_path, max_attempts=2, retry_interval=0
+        )
+        future = queue.add_model(_unit("g"))
+        with self.assertRaises(requests.ConnectionError):
+            future.result(timeout=5)
+        queue.close()
+        self.assertEqual(2, mock_put.call_count)
+        # an interrupted append is skipped
+        with open(self.spool_path, "a") as f:
+            f.write('{"id": "incompl')
+        mock_put.side_effect = None
+        mock_put.return_value = self._added()
+        queue = WriteBehindQueue(self.example_client, self.spool_path)
+        self.assertTrue(queue.flush(timeout=5))
+        queue.close()
+        self.assertEqual(mock_put.mock_calls[0], mock_put.mock_calls[-1])
+        write, ack = self._spool_lines()
+        self.assertEqual({"ack": write["id"]}, ack)
+
+    @patch("aind_slims_api.transport.SlimsTransport.put")
+    def test_close_timeout(self, mock_put: MagicMock):
+        """Tests close gives up waiting on writes, which stay in the spool"""
+        slow = threading.Event()
+        mock_put.side_effect = lambda **kwargs: slow.wait(0.2) or _response(503)
+        queue = WriteBehindQueue(self.example_client, self.spool_path)
+        future = queue.add_model(_unit("g"))
+        with self.assertLogs("aind_slims_api.write_behind", "WARNING"):
+            self.assertFalse(queue.close(timeout=0.01))
+        self.assertTrue(future.done())
+        self.assertEqual(1, len(self._spool_lines()))
+
+    @patch("aind_slims_api.transport.SlimsTransport.put")
+    def test_close_outage(self, mock_put: MagicMock):
+        """Tests closing during an outage stops retrying, rather than waiting
+        out every attempt, and keeps the writes in the spool"""
+        mock_put.side_effect = requests.ConnectionError()
+        queue = WriteBehindQueue(self.example_client, self.spool_path)
+        future = queue.add_model(_unit("g"))
+        with self.assertLogs("aind_slims_api.write_behind", "WARNING"):
+            with queue:
+                while not mock_put.call_count:
+                    threading.Event().wait(0.01)
+        with self.assertRaises(requests.ConnectionError):
+            future.result(timeout=0)
+        self.assertEqual(1, mock_put.call_count)
+        self.assertEqual(0, queue.pending)
+        self.assertEqual(1, len(self._spool_lines()))
+
+    @patch("aind_slims_api.transport.SlimsTransport.put")
+    def test_batches(self, mock_put: MagicMock):
+        """Tests writes are taken from the queue in batches"""
+        release = threading.Event()
+        mock_put.side_effect = lambda **kwargs: release.wait() and self._added()
+        queue = WriteBehindQueue(
+            self.example_client, self.spool_path, max_workers=2, batch_size=2
+        )
+        futures = [queue.add_model(_unit(str(i))) for i in range(5)]
+        self.assertEqual(5, queue.pending)
+        release.set()
+        self.assertTrue(queue.close(timeout=5))
+        self.assertTrue(all(f.done() for f in futures))
+        self.assertEqual(0, queue.pending)
+
+    @patch("aind_slims_api.transport.SlimsTransport.put")
+    def test_invalid_result(self, mock_put: MagicMock):
+        """Tests a record that fails validation fails the Future"""
+        mock_put.return_value = _response(
+            200,
+            {
+                "pk": 1,
+                "columns": [{"name": "unit_pk", "datatype": "INTEGER", "value": "x"}],
+            },
+        )
+        with WriteBehindQueue(self.example_client, self.spool_path) as queue:
+            future = queue.add_model(_unit("g"))
+        with self.assertRaises(ValueError):
+            future.result()
+
+    def test_invalid(self):
+        """Tests non-positive sizes are rejected"""
+        with self.assertRaises(ValueError):
+            WriteBehindQueue(self.example_client, self.spool_path, max_workers=0)
+
+
+if __name__ == "__main__":
+    unittest.main()